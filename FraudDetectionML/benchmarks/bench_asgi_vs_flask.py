@@ -0,0 +1,130 @@
+"""
+Benchmark: ASGI front end vs the Flask app under concurrent load
+================================================================
+Starts each front end as a single server process (Flask under the gunicorn
+gthread entry point, asgi_app under uvicorn), opens --connections
+keep-alive connections from an asyncio load generator, and reports
+throughput, p50/p99 latency and the server's OS thread count under load.
+
+Both servers run standalone (no Kafka/Redis) unless the usual
+REDIS_ENABLED / KAFKA_ENABLED variables are exported, in which case both
+use them.
+
+Usage:
+    python benchmarks/bench_asgi_vs_flask.py [--connections 64 512] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+from synthetic_model import SRC_DIR, ensure_model_dir, make_transactions
+
+
+def server_command(front_end, port):
+    if front_end == 'flask':
+        return [sys.executable, '-m', 'gunicorn', '--config', os.path.join(SRC_DIR, 'gunicorn_conf.py')]
+    return [sys.executable, '-m', 'uvicorn', 'asgi_app:app', '--app-dir', SRC_DIR,
+            '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning']
+
+
+def wait_until_up(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def thread_count(pid):
+    """OS threads of a process and its children"""
+    pids = [pid] + [int(p) for p in subprocess.run(['pgrep', '-P', str(pid)], capture_output=True,
+                                                     text=True).stdout.split()]
+    total = 0
+    for p in pids:
+        with open(f'/proc/{p}/status') as f:
+            total += next(int(line.split()[1]) for line in f if line.startswith('Threads:'))
+    return total
+
+
+async def connection(port, requests, offset, deadline, latencies):
+    reader = writer = None
+    i = offset
+    while time.monotonic() < deadline:
+        if writer is None:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        started_at = time.perf_counter()
+        try:
+            writer.write(requests[i % len(requests)])
+            await writer.drain()
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = next(int(line.split(b':')[1]) for line in head.split(b'\r\n')
+                          if line.lower().startswith(b'content-length'))
+            await reader.readexactly(length)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - started_at)
+        i += 1
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, requests, connections, seconds, server_pid):
+    latencies = []
+    deadline = time.monotonic() + seconds
+    tasks = [asyncio.create_task(connection(port, requests, k * 97, deadline, latencies))
+             for k in range(connections)]
+    await asyncio.sleep(seconds / 2)
+    threads = thread_count(server_pid)
+    await asyncio.gather(*tasks)
+    return latencies, threads
+
+
+def run(front_end, connections, args, requests, model_dir):
+    env = dict(os.environ, WEB_CONCURRENCY='1', PORT=str(args.port), MODEL_DIR=model_dir)
+    server = subprocess.Popen(server_command(front_end, args.port), env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(args.port)
+        latencies, threads = asyncio.run(load(args.port, requests, connections, args.seconds, server.pid))
+        latencies = np.array(latencies) * 1000
+        return len(latencies) / args.seconds, np.percentile(latencies, 50), np.percentile(latencies, 99), threads
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(30)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ASGI vs Flask load test')
+    parser.add_argument('--connections', type=int, nargs='+', default=[64, 512], help='Concurrent connections')
+    parser.add_argument('--seconds', type=float, default=10, help='Load duration per run')
+    parser.add_argument('--port', type=int, default=5056, help='Port to bind the servers to')
+    parser.add_argument('--model-dir', type=str, default=None, help='Model directory (default: trained or synthetic)')
+    args = parser.parse_args()
+
+    model_dir = ensure_model_dir(args.model_dir)
+    transactions, _ = make_transactions(20000)
+    requests = []
+    for tx in transactions:
+        body = json.dumps(tx).encode()
+        requests.append(b'POST /predict HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                        b'Content-Length: %d\r\n\r\n%s' % (len(body), body))
+
+    print(f"{'front end':>10} {'conns':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'threads':>8}")
+    for connections in args.connections:
+        for front_end in ('flask', 'asgi'):
+            throughput, p50, p99, threads = run(front_end, connections, args, requests, model_dir)
+            print(f"{front_end:>10} {connections:>6} {throughput:>9.0f} {p50:>8.2f} {p99:>8.2f} {threads:>8}")
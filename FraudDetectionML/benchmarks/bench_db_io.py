@@ -0,0 +1,114 @@
+"""
+Benchmark: database loading and extraction
+==========================================
+Loads a synthetic creditcard-style frame into a local SQLite database in
+--loads successive calls (as a chunked pipeline would), then reads it
+back, once the original way and once through FraudDetectionETL's bulk
+I/O layer (db_io):
+
+- original load: a new engine and a default DataFrame.to_sql per call
+- bulk load: load_to_database, pooled engine and batched executemany
+- original extract: a new DBAPI connection and pd.read_sql of the whole
+  result
+- bulk extract: extract_database_chunks, streamed in --fetch-size chunks
+
+Reports rows/sec for both directions and the peak Python memory of each
+extract (measured in a separate, untimed run), and checks that both paths
+read back the same rows. SQLite stands in for the SQL Server database:
+there are no network round trips, so the gains here are client side only.
+
+Usage:
+    python benchmarks/bench_db_io.py [--rows 500000] [--loads 10] [--fetch-size 50000]
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from synthetic_model import SRC_DIR, make_creditcard_frame
+
+
+def original_load(df, connection_string, table_name):
+    from sqlalchemy import create_engine
+    engine = create_engine(connection_string)
+    df.to_sql(table_name, engine, if_exists='append', index=False)
+
+
+def original_extract(database_path, query):
+    conn = sqlite3.connect(database_path)
+    df = pd.read_sql(query, conn)
+    conn.close()
+    return df
+
+
+def timed(fn, *args):
+    started_at = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started_at, result
+
+
+def peak_mb(fn, *args):
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def count_rows(chunks):
+    return sum(len(chunk) for chunk in chunks)
+
+
+def load_in_calls(load, df, calls):
+    for part in np.array_split(np.arange(len(df)), calls):
+        load(df.iloc[part])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Database loading / extraction benchmark (SQLite)')
+    parser.add_argument('--rows', type=int, default=500000, help='Rows in the synthetic frame')
+    parser.add_argument('--loads', type=int, default=10, help='Load calls the frame is split into')
+    parser.add_argument('--fetch-size', type=int, default=50000, help='Rows per fetch of the bulk extract')
+    parser.add_argument('--batch-rows', type=int, default=10000, help='Rows per executemany of the bulk load')
+    args = parser.parse_args()
+
+    sys.path.insert(0, SRC_DIR)
+    from etl_pipeline import CSV_DTYPES, FraudDetectionETL
+    logging.disable(logging.INFO)
+
+    df = make_creditcard_frame(args.rows).astype(CSV_DTYPES)
+    work_dir = tempfile.mkdtemp(prefix='fraudguard-db-')
+    database_path = os.path.join(work_dir, 'fraudguard.db')
+    connection_string = f'sqlite:///{database_path}'
+    query = 'SELECT * FROM {table}'
+    etl = FraudDetectionETL({'db_fetch_size': args.fetch_size, 'db_batch_rows': args.batch_rows})
+    print(f"Frame                : {len(df):,} rows x {len(df.columns)} columns, {args.loads} load calls")
+
+    original_seconds, _ = timed(load_in_calls, lambda part: original_load(part, connection_string, 'original'),
+                                df, args.loads)
+    bulk_seconds, _ = timed(load_in_calls, lambda part: etl.load_to_database(part, connection_string, 'bulk'),
+                            df, args.loads)
+    print(f"Load, original       : {original_seconds:7.2f} s   {len(df) / original_seconds:10,.0f} rows/s")
+    print(f"Load, bulk           : {bulk_seconds:7.2f} s   {len(df) / bulk_seconds:10,.0f} rows/s   "
+          f"speedup {original_seconds / bulk_seconds:4.1f}x")
+
+    original_query, bulk_query = query.format(table='original'), query.format(table='bulk')
+    original_seconds, original_df = timed(original_extract, database_path, original_query)
+    bulk_seconds, chunks = timed(lambda: list(etl.extract_database_chunks(connection_string, bulk_query)))
+    bulk_df = pd.concat(chunks, ignore_index=True)
+    matches = original_df.astype(CSV_DTYPES).equals(bulk_df)
+    original_mb = peak_mb(lambda: len(original_extract(database_path, original_query)))
+    bulk_mb = peak_mb(lambda: count_rows(etl.extract_database_chunks(connection_string, bulk_query)))
+    print(f"Extract, original    : {original_seconds:7.2f} s   {len(original_df) / original_seconds:10,.0f} rows/s   "
+          f"peak {original_mb:6.0f} MB")
+    print(f"Extract, bulk        : {bulk_seconds:7.2f} s   {len(bulk_df) / bulk_seconds:10,.0f} rows/s   "
+          f"peak {bulk_mb:6.0f} MB   speedup {original_seconds / bulk_seconds:4.1f}x   {len(chunks)} chunks   "
+          f"{'identical' if matches else 'ROWS DIFFER'}")
@@ -0,0 +1,69 @@
+"""
+Benchmark: partitioned ETL scaling
+==================================
+Writes a synthetic creditcard-style extract, runs FraudDetectionETL (CSV
+sink, for byte comparisons) in memory on one core for reference, then
+with run_pipeline(workers=N) for each --workers count. Reports wall time
+and speedup over one worker, and checks the outputs: the row-level files
+(transformed, rejected, Power BI transactions) must be byte-identical to
+the single-core run and every output, summaries included, byte-identical
+across worker counts.
+
+Usage:
+    python benchmarks/bench_etl_parallel.py [--rows 1000000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import filecmp
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from synthetic_model import SRC_DIR, write_creditcard_csv
+
+ROW_LEVEL_OUTPUTS = ('transformed_data.csv', 'rejected_records.csv', 'powerbi/transactions.csv')
+ALL_OUTPUTS = ROW_LEVEL_OUTPUTS + ('powerbi/hourly_summary.csv', 'powerbi/fraud_summary.csv')
+
+
+def run(source, output_dir, partition_bytes, **kwargs):
+    started_at = time.perf_counter()
+    FraudDetectionETL({'partition_bytes': partition_bytes, 'output_format': 'csv'}).run_pipeline(source, output_dir, **kwargs)
+    return time.perf_counter() - started_at
+
+
+def identical(left_dir, right_dir, names):
+    return all(filecmp.cmp(os.path.join(left_dir, name), os.path.join(right_dir, name), shallow=False)
+               for name in names)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Partitioned ETL scaling benchmark')
+    parser.add_argument('--rows', type=int, default=1000000, help='Rows in the synthetic extract')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='Worker counts to run')
+    parser.add_argument('--partition-mb', type=float, default=16, help='Partition size')
+    parser.add_argument('--source', type=str, default=None, help='Existing CSV extract (default: synthetic)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, SRC_DIR)
+    from etl_pipeline import FraudDetectionETL
+    logging.disable(logging.INFO)
+
+    work_dir = tempfile.mkdtemp(prefix='fraudguard-etl-')
+    source = args.source or write_creditcard_csv(os.path.join(work_dir, 'extract.csv'), args.rows)
+    partition_bytes = int(args.partition_mb * 1024 * 1024)
+    print(f"Extract              : {source} ({os.path.getsize(source) / 1e6:,.0f} MB, {os.cpu_count()} CPUs)")
+
+    reference_dir = os.path.join(work_dir, 'single-core')
+    print(f"Single core, in memory : {run(source, reference_dir, partition_bytes):7.2f} s")
+
+    baseline = None
+    for workers in args.workers:
+        output_dir = os.path.join(work_dir, f'workers-{workers}')
+        elapsed = run(source, output_dir, partition_bytes, workers=workers)
+        baseline = baseline or (elapsed, output_dir)
+        matches = identical(reference_dir, output_dir, ROW_LEVEL_OUTPUTS) and \
+            identical(baseline[1], output_dir, ALL_OUTPUTS)
+        print(f"{workers:2d} worker(s)           : {elapsed:7.2f} s   speedup {baseline[0] / elapsed:4.2f}x   "
+              f"{'identical' if matches else 'OUTPUT DIFFERS'}")
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark: per-row feature construction
+=============================================
+Compares the original request-path feature code (sklearn scaler.transform
+plus a Python list built from 28 formatted key lookups) with
+FeatureBuilder.build_row.
+
+Usage:
+    python benchmarks/bench_feature_builder.py [--rows 20000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+import warnings
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from synthetic_model import SRC_DIR, make_transactions
+
+sys.path.insert(0, SRC_DIR)
+from features import FeatureBuilder
+
+warnings.filterwarnings('ignore')
+
+
+def legacy_build_row(scaler, data):
+    """Feature construction as previously done in process_transaction"""
+    amount = data.get('amount', 0)
+    time_value = data.get('time', 0)
+    amount_scaled = scaler.transform([[amount]])[0][0]
+    hour = (time_value / 3600) % 24
+    day = (time_value / 86400)
+    features = []
+    for i in range(1, 29):
+        features.append(data.get(f'v{i}', 0))
+    features.append(amount)
+    features.append(amount_scaled)
+    features.append(hour)
+    features.append(day)
+    features.append(amount_scaled * hour)
+    return np.array([features])
+
+
+def time_per_row(fn, transactions, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for tx in transactions:
+            fn(tx)
+        best = min(best, (time.perf_counter_ns() - start) / len(transactions))
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Feature builder micro-benchmark')
+    parser.add_argument('--rows', type=int, default=20000, help='Transactions per run')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs (best is reported)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scaler = StandardScaler().fit(rng.exponential(50, (10000, 1)))
+    builder = FeatureBuilder.from_scaler(scaler)
+    transactions, _ = make_transactions(args.rows)
+
+    # Both paths must produce the same float32 model input
+    for tx in transactions[:100]:
+        expected = legacy_build_row(scaler, tx).astype(np.float32)
+        assert np.array_equal(expected, builder.build_row(tx)), "feature mismatch"
+
+    legacy_ns = time_per_row(lambda tx: legacy_build_row(scaler, tx), transactions, args.repeat)
+    builder_ns = time_per_row(builder.build_row, transactions, args.repeat)
+
+    print(f"Rows per run         : {args.rows:,}")
+    print(f"Legacy (sklearn)     : {legacy_ns / 1000:8.2f} us/row")
+    print(f"FeatureBuilder       : {builder_ns / 1000:8.2f} us/row")
+    print(f"Speed-up             : {legacy_ns / builder_ns:8.1f}x")
@@ -0,0 +1,124 @@
+"""
+Benchmark: batched Kafka consumer throughput
+============================================
+Drives kafka_consumer_loop from app_enhanced.py with an in-memory broker
+stand-in (same poll/commit interface as kafka-python's KafkaConsumer) and
+reports messages/sec for several poll batch sizes and worker counts.
+
+Usage:
+    python benchmarks/bench_kafka_consumer.py [--messages 20000] [--model-dir models]
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import warnings
+
+from synthetic_model import SRC_DIR, ensure_model_dir, make_transactions
+
+warnings.filterwarnings('ignore')
+
+Record = collections.namedtuple('Record', 'topic partition offset value')
+
+
+class InMemoryBroker:
+    """Holds the transactions topic and hands out messages to consumers"""
+
+    def __init__(self, payloads):
+        self._messages = collections.deque(
+            Record('transactions', 0, offset, payload) for offset, payload in enumerate(payloads))
+        self._lock = threading.Lock()
+        self.total = len(payloads)
+        self.committed = 0
+        self.done = threading.Event()
+
+    def take(self, max_records):
+        with self._lock:
+            n = min(max_records, len(self._messages))
+            return [self._messages.popleft() for _ in range(n)]
+
+    def commit(self, count):
+        with self._lock:
+            self.committed += count
+            if self.committed >= self.total:
+                self.done.set()
+
+
+class InMemoryConsumer:
+    """KafkaConsumer stand-in backed by an InMemoryBroker"""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self._uncommitted = 0
+
+    def poll(self, timeout_ms=0, max_records=500):
+        records = self.broker.take(max_records)
+        if not records:
+            time.sleep(timeout_ms / 1000.0)
+            return {}
+        self._uncommitted += len(records)
+        return {('transactions', 0): records}
+
+    def commit(self):
+        self.broker.commit(self._uncommitted)
+        self._uncommitted = 0
+
+
+class InMemoryProducer:
+    """KafkaProducer stand-in that counts sent alerts"""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, topic, value):
+        self.sent += 1
+
+    def flush(self, timeout=None):
+        pass
+
+
+def run(app, payloads, batch_size, workers):
+    app.config['KAFKA_MAX_POLL_RECORDS'] = batch_size
+    app.config['KAFKA_POLL_TIMEOUT_MS'] = 1
+    broker = InMemoryBroker(payloads)
+    stop = threading.Event()
+    threads = [threading.Thread(target=app.kafka_consumer_loop,
+                                args=(InMemoryConsumer(broker), stop), daemon=True)
+               for _ in range(workers)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    broker.done.wait()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return broker.total / elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Batched Kafka consumer benchmark')
+    parser.add_argument('--messages', type=int, default=20000, help='Messages per run')
+    parser.add_argument('--model-dir', type=str, default=None, help='Model directory')
+    parser.add_argument('--batch-sizes', type=str, default='1,100,500', help='Poll batch sizes')
+    parser.add_argument('--workers', type=str, default='1,2,4', help='Consumer worker counts')
+    args = parser.parse_args()
+
+    os.environ['MODEL_DIR'] = ensure_model_dir(args.model_dir)
+    sys.path.insert(0, SRC_DIR)
+    import app_enhanced
+
+    transactions, _ = make_transactions(args.messages)
+    payloads = [json.dumps({'id': i, **tx}).encode('utf-8') for i, tx in enumerate(transactions)]
+    app_enhanced.kafka_producer = InMemoryProducer()
+
+    print(f"\n{'batch':>6} {'workers':>8} {'messages/sec':>14}")
+    for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+        for workers in [int(w) for w in args.workers.split(',')]:
+            throughput = run(app_enhanced, payloads, batch_size, workers)
+            print(f"{batch_size:>6} {workers:>8} {throughput:>14,.0f}")
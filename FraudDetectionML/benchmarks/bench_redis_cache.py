@@ -0,0 +1,196 @@
+"""
+Benchmark: Redis cache tier against a local stand-in
+====================================================
+Points the Redis tier of app_enhanced.py at FakeRedis, a dict-backed
+stand-in for the redis-py calls it makes (ping, mget, pipelined setex)
+with a configurable round-trip latency, socket timeout and connection
+pool, then checks and times:
+
+- write path: set_cached_predictions queues, the writer thread stores
+  every entry with one pipelined SETEX batch and the cache TTL
+- hit path: a batch lookup is answered by a single MGET
+- time box: with Redis slower than REDIS_TIMEOUT_MS, a lookup gives up
+  after the budget and returns misses
+- back-off: after that failure Redis is skipped (no round trip at all)
+  for REDIS_RETRY_SECONDS, then used again
+- pool wait: more concurrent lookups than pooled connections never wait
+  longer than the budget for a connection
+
+Exits with status 1 when a check fails.
+
+Usage:
+    python benchmarks/bench_redis_cache.py [--keys 500] [--timeout-ms 20] [--lookups 2000]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+from synthetic_model import SRC_DIR, ensure_model_dir
+
+
+class FakeRedis:
+    """
+    redis.Redis stand-in backed by a dict. Every round trip holds one of
+    pool_size connections for latency_ms; a round trip longer than
+    timeout_ms raises TimeoutError after timeout_ms, and waiting more than
+    timeout_ms for a connection raises ConnectionError, as redis-py does
+    with socket_timeout and a BlockingConnectionPool.
+    """
+
+    def __init__(self, timeout_ms=20, pool_size=16):
+        self.timeout = timeout_ms / 1000.0
+        self.latency = 0.0
+        self.store = {}
+        self.ttls = {}
+        self.calls = {'ping': 0, 'mget': 0, 'pipeline': 0}
+        self._pool = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+
+    def set_latency_ms(self, latency_ms):
+        self.latency = latency_ms / 1000.0
+
+    def _round_trip(self, command):
+        if not self._pool.acquire(timeout=self.timeout):
+            raise ConnectionError('No connection available.')
+        try:
+            with self._lock:
+                self.calls[command] += 1
+            if self.latency > self.timeout:
+                time.sleep(self.timeout)
+                raise TimeoutError('Timeout reading from socket')
+            time.sleep(self.latency)
+        finally:
+            self._pool.release()
+
+    def ping(self):
+        self._round_trip('ping')
+        return True
+
+    def mget(self, keys):
+        self._round_trip('mget')
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Buffers SETEX commands and applies them in one round trip on execute()"""
+
+    def __init__(self, client):
+        self.client = client
+        self._commands = []
+
+    def setex(self, key, ttl, value):
+        self._commands.append((key, ttl, value))
+        return self
+
+    def execute(self):
+        self.client._round_trip('pipeline')
+        for key, ttl, value in self._commands:
+            self.client.store[key] = value
+            self.client.ttls[key] = ttl
+        results = [True] * len(self._commands)
+        self._commands = []
+        return results
+
+
+def timed_lookup(app, keys):
+    started_at = time.perf_counter()
+    results = app.get_cached_predictions(keys)
+    return time.perf_counter() - started_at, results
+
+
+def check(label, ok, detail):
+    print(f"{'✅' if ok else '❌'} {label:<11}: {detail}")
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Redis cache tier checks against a local stand-in')
+    parser.add_argument('--keys', type=int, default=500, help='Keys per batch lookup')
+    parser.add_argument('--timeout-ms', type=float, default=20, help='REDIS_TIMEOUT_MS')
+    parser.add_argument('--retry-seconds', type=float, default=0.5, help='REDIS_RETRY_SECONDS')
+    parser.add_argument('--lookups', type=int, default=2000, help='Single-key lookups timed on the hit path')
+    parser.add_argument('--model-dir', type=str, default=None, help='Model directory')
+    args = parser.parse_args()
+
+    os.environ['MODEL_DIR'] = ensure_model_dir(args.model_dir)
+    sys.path.insert(0, SRC_DIR)
+    import app_enhanced as app
+    from cache import LRUCache
+
+    app.config['REDIS_TIMEOUT_MS'] = args.timeout_ms
+    app.config['REDIS_RETRY_SECONDS'] = args.retry_seconds
+    app.local_cache = LRUCache(ttl=0)  # every lookup goes past the local tier
+    budget = args.timeout_ms / 1000.0
+    fake = FakeRedis(timeout_ms=args.timeout_ms, pool_size=4)
+    app.init_redis(fake)
+    passed = True
+
+    # Write path: one pipelined SETEX batch per writer drain
+    keys = [f"bench:{i}" for i in range(args.keys)]
+    results = {key: {'is_fraud': False, 'probability': i / args.keys, 'risk_level': 'LOW'}
+               for i, key in enumerate(keys)}
+    app.set_cached_predictions(results)
+    app.cache_write_queue.join()
+    stored = all(fake.ttls.get(f"pred:{key}") == app.config['CACHE_TTL_SECONDS'] for key in keys)
+    passed &= check('write path', stored and fake.calls['pipeline'] == 1,
+                    f"{len(fake.store):,} keys in {fake.calls['pipeline']} pipelined batch(es)")
+
+    # Hit path: one MGET per batch lookup
+    mgets = fake.calls['mget']
+    elapsed, found = timed_lookup(app, keys)
+    hits = sum(1 for result in found if result is not None)
+    passed &= check('hit path', hits == len(keys) and fake.calls['mget'] == mgets + 1,
+                    f"{hits:,}/{len(keys):,} hits with {fake.calls['mget'] - mgets} MGET, {elapsed * 1000:.2f} ms")
+    started_at = time.perf_counter()
+    for i in range(args.lookups):
+        app.get_cached_prediction(keys[i % len(keys)])
+    per_lookup_us = (time.perf_counter() - started_at) / args.lookups * 1e6
+    print(f"   single-key lookup: {per_lookup_us:.1f} µs")
+
+    # Time box: a slow Redis costs at most the budget, then reads as misses
+    fake.set_latency_ms(args.timeout_ms * 10)
+    elapsed, found = timed_lookup(app, keys)
+    passed &= check('time box', all(result is None for result in found) and elapsed < budget * 2,
+                    f"gave up after {elapsed * 1000:.1f} ms (budget {args.timeout_ms:.0f} ms, "
+                    f"Redis {args.timeout_ms * 10:.0f} ms)")
+
+    # Back-off: no round trips until REDIS_RETRY_SECONDS have passed
+    fake.set_latency_ms(0)
+    mgets = fake.calls['mget']
+    elapsed, found = timed_lookup(app, keys)
+    skipped = fake.calls['mget'] == mgets and all(result is None for result in found)
+    time.sleep(args.retry_seconds)
+    _, found = timed_lookup(app, keys)
+    resumed = fake.calls['mget'] == mgets + 1 and all(result is not None for result in found)
+    passed &= check('back-off', skipped and resumed,
+                    f"skipped for {args.retry_seconds:.1f} s ({elapsed * 1000:.2f} ms lookup), then resumed")
+
+    # Pool wait: 16 concurrent lookups on 4 connections, each round trip
+    # under the budget; no lookup may wait past the budget for a connection
+    fake.set_latency_ms(args.timeout_ms * 0.8)
+    app.redis_retry_at = 0.0
+    durations = []
+    lock = threading.Lock()
+
+    def lookup():
+        elapsed, _ = timed_lookup(app, keys[:10])
+        with lock:
+            durations.append(elapsed)
+
+    threads = [threading.Thread(target=lookup) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    slowest = max(durations)
+    passed &= check('pool wait', slowest < budget * 2.5,
+                    f"slowest of 16 lookups on 4 connections: {slowest * 1000:.1f} ms "
+                    f"(budget {args.timeout_ms:.0f} ms wait + {args.timeout_ms * 0.8:.0f} ms round trip)")
+
+    sys.exit(0 if passed else 1)
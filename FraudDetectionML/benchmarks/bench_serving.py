@@ -0,0 +1,109 @@
+"""
+Benchmark: multi-process serving throughput and memory
+======================================================
+Starts the production gunicorn entry point (src/gunicorn_conf.py) with an
+increasing number of workers, drives /predict from several client
+processes over keep-alive connections, and reports requests/sec together
+with the resident (RSS) and proportional (PSS) memory of the server
+processes. PSS counts shared copy-on-write pages once, so it shows how much
+of the preloaded model the workers actually share.
+
+Usage:
+    python benchmarks/bench_serving.py [--workers 1 2 4] [--clients 8] [--seconds 10]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from synthetic_model import SRC_DIR, ensure_model_dir, make_transactions
+
+
+def wait_until_up(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def client(port, payloads, seconds, counts):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    headers = {'Content-Type': 'application/json'}
+    done = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        conn.request('POST', '/predict', payloads[done % len(payloads)], headers)
+        conn.getresponse().read()
+        done += 1
+    counts.put(done)
+
+
+def memory_kb(pid):
+    """(rss, pss) in kB for a process and its children"""
+    pids = [pid] + [int(p) for p in subprocess.run(['pgrep', '-P', str(pid)], capture_output=True,
+                                                     text=True).stdout.split()]
+    rss = pss = 0
+    for p in pids:
+        with open(f'/proc/{p}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Rss:'):
+                    rss += int(line.split()[1])
+                elif line.startswith('Pss:'):
+                    pss += int(line.split()[1])
+    return rss, pss
+
+
+def run(workers, args, payloads, model_dir):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(args.port), MODEL_DIR=model_dir)
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--config',
+                               os.path.join(SRC_DIR, 'gunicorn_conf.py')],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(args.port)
+        counts = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=client, args=(args.port, payloads, args.seconds, counts))
+                   for _ in range(args.clients)]
+        for c in clients:
+            c.start()
+        total = sum(counts.get() for _ in clients)
+        for c in clients:
+            c.join()
+        rss, pss = memory_kb(server.pid)
+        return total / args.seconds, rss, pss
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(30)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Multi-process serving benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts to compare')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent client processes')
+    parser.add_argument('--seconds', type=float, default=10, help='Load duration per run')
+    parser.add_argument('--port', type=int, default=5055, help='Port to bind the server to')
+    parser.add_argument('--model-dir', type=str, default=None, help='Model directory (default: trained or synthetic)')
+    args = parser.parse_args()
+
+    model_dir = ensure_model_dir(args.model_dir)
+    transactions, _ = make_transactions(5000)
+    payloads = [json.dumps(tx) for tx in transactions]
+
+    print(f"Cores available: {os.cpu_count()}, clients: {args.clients}")
+    print(f"{'workers':>8} {'req/s':>10} {'scaling':>8} {'RSS MB':>9} {'PSS MB':>9}")
+    baseline = None
+    for workers in args.workers:
+        throughput, rss, pss = run(workers, args, payloads, model_dir)
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>10.0f} {throughput / baseline:>7.2f}x "
+              f"{rss / 1024:>9.1f} {pss / 1024:>9.1f}")
@@ -0,0 +1,75 @@
+"""
+Benchmark: /predict latency with and without shadow scoring
+===========================================================
+Publishes the model twice into a temporary registry (champion and
+challenger), then sends the same /predict requests to the Flask app
+(in-process test client, cache disabled) with no challenger and with a
+challenger shadow-scoring --shadow-percent of the traffic. Reports p50/p99
+request latency for both runs and what the shadow thread scored or
+dropped, so any latency the shadow path adds to the primary response
+shows up directly.
+
+Usage:
+    python benchmarks/bench_shadow.py [--requests 5000] [--shadow-percent 100]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+from synthetic_model import SRC_DIR, ensure_model_dir, make_transactions
+
+warnings.filterwarnings('ignore')
+
+
+def latencies_ms(client, transactions):
+    latencies = []
+    for tx in transactions:
+        started_at = time.perf_counter()
+        response = client.post('/predict', json=tx)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+        assert response.status_code == 200
+    return np.array(latencies)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Shadow scoring latency benchmark')
+    parser.add_argument('--requests', type=int, default=5000, help='/predict requests per run')
+    parser.add_argument('--shadow-percent', type=float, default=100, help='Share of traffic shadow-scored')
+    parser.add_argument('--model-dir', type=str, default=None, help='Model directory (default: trained or synthetic)')
+    args = parser.parse_args()
+
+    model_dir = ensure_model_dir(args.model_dir)
+    registry_dir = tempfile.mkdtemp(prefix='fraudguard-registry-')
+    os.environ['MODEL_DIR'] = model_dir
+    os.environ['MODEL_REGISTRY_DIR'] = registry_dir
+    os.environ['LOCAL_CACHE_SIZE'] = '0'  # score every request
+    sys.path.insert(0, SRC_DIR)
+    from model_registry import ModelRegistry
+
+    model_registry = ModelRegistry(registry_dir)
+    model_registry.publish('champion', model_dir, activate=True)
+    model_registry.publish('challenger', model_dir)
+
+    import app_enhanced
+    app_enhanced.init_shadow_scorer()
+    client = app_enhanced.app.test_client()
+    transactions, _ = make_transactions(args.requests)
+    latencies_ms(client, transactions[:500])  # warm up
+
+    baseline = latencies_ms(client, transactions)
+    app_enhanced.set_challenger({'version': 'challenger', 'shadow_percent': args.shadow_percent})
+    shadowed = latencies_ms(client, transactions)
+    time.sleep(0.5)
+    stats = app_enhanced.shadow_scorer.stats()
+
+    print(f"Requests per run     : {args.requests:,}")
+    print(f"No challenger        : p50 {np.percentile(baseline, 50):6.3f} ms   p99 {np.percentile(baseline, 99):6.3f} ms")
+    print(f"Shadow {args.shadow_percent:>5.1f}%       : p50 {np.percentile(shadowed, 50):6.3f} ms   "
+          f"p99 {np.percentile(shadowed, 99):6.3f} ms")
+    print(f"Shadow rows          : {stats['scored']:,} scored, {stats['dropped']:,} dropped")
@@ -0,0 +1,97 @@
+"""
+Benchmark: cold start, pickle vs lean model artifact
+====================================================
+Exports the lean artifact (booster JSON + manifest.json) next to the
+pickled model, then starts fresh interpreters that import app_enhanced
+and send one /predict through the test client, once per model format.
+Reports import time, time to first prediction and whether sklearn /
+xgboost ended up imported. Lean XGBoost artifacts load into the native
+booster by default; "lean + compiled" (INFERENCE_BACKEND=compiled) is
+the opt-in start without xgboost. With --budget-seconds the script
+exits with status 1 when that start's time to first prediction exceeds
+the budget, so it can gate a CI job.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 3] [--budget-seconds 1.0]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from synthetic_model import SRC_DIR, ensure_model_dir, make_transactions
+
+CHILD = """
+import json, sys, time
+started_at = time.perf_counter()
+sys.path.insert(0, {src_dir!r})
+import app_enhanced
+imported_at = time.perf_counter()
+response = app_enhanced.app.test_client().post('/predict', json={transaction!r})
+assert response.status_code == 200, response.get_data(as_text=True)
+print(json.dumps({{
+    'import_seconds': imported_at - started_at,
+    'first_prediction_seconds': time.perf_counter() - started_at,
+    'artifact': app_enhanced.models.current.describe()['artifact'],
+    'heavy_modules': sorted(m for m in ('sklearn', 'xgboost', 'joblib', 'pandas') if m in sys.modules)
+}}))
+"""
+
+RUNS = (
+    ('pickle', {'MODEL_FORMAT': 'pickle'}),
+    ('lean', {'MODEL_FORMAT': 'lean'}),
+    ('lean + compiled', {'MODEL_FORMAT': 'lean', 'INFERENCE_BACKEND': 'compiled'}),
+)
+
+
+def cold_start(model_dir, registry_dir, transaction, extra_env):
+    env = dict(os.environ, MODEL_DIR=model_dir, MODEL_REGISTRY_DIR=registry_dir, **extra_env)
+    env.pop('MODEL_VERSION', None)
+    script = CHILD.format(src_dir=SRC_DIR, transaction=transaction)
+    output = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cold start benchmark (pickle vs lean artifact)')
+    parser.add_argument('--runs', type=int, default=3, help='Cold starts per format (best is reported)')
+    parser.add_argument('--budget-seconds', type=float, default=None,
+                        help='Fail when the lean + compiled time to first prediction exceeds this')
+    parser.add_argument('--model-dir', type=str, default=None, help='Model directory (default: trained or synthetic)')
+    args = parser.parse_args()
+
+    source_dir = ensure_model_dir(args.model_dir)
+    model_dir = tempfile.mkdtemp(prefix='fraudguard-startup-')
+    registry_dir = tempfile.mkdtemp(prefix='fraudguard-registry-')
+    for name in ('fraud_model.pkl', 'scaler.pkl', 'fraud_model_threshold.pkl'):
+        if os.path.exists(os.path.join(source_dir, name)):
+            shutil.copy2(os.path.join(source_dir, name), os.path.join(model_dir, name))
+
+    sys.path.insert(0, SRC_DIR)
+    import joblib
+    from model_registry import export_lean_artifact
+    from scoring import load_threshold
+    export_lean_artifact(joblib.load(os.path.join(model_dir, 'fraud_model.pkl')),
+                         joblib.load(os.path.join(model_dir, 'scaler.pkl')),
+                         load_threshold(os.path.join(model_dir, 'fraud_model.pkl')), model_dir)
+
+    transactions, _ = make_transactions(1)
+    results = {}
+    for label, extra_env in RUNS:
+        samples = [cold_start(model_dir, registry_dir, transactions[0], extra_env) for _ in range(args.runs)]
+        results[label] = min(samples, key=lambda sample: sample['first_prediction_seconds'])
+
+    print(f"{'Format':<15} {'Artifact':<10} {'Import':>9} {'1st predict':>12}  Heavy modules")
+    for label, result in results.items():
+        print(f"{label:<15} {result['artifact']:<10} {result['import_seconds']:8.3f}s "
+              f"{result['first_prediction_seconds']:11.3f}s  {', '.join(result['heavy_modules']) or '-'}")
+
+    lean_seconds = results['lean + compiled']['first_prediction_seconds']
+    if args.budget_seconds is not None and lean_seconds > args.budget_seconds:
+        print(f"❌ Lean cold start {lean_seconds:.3f}s exceeds the {args.budget_seconds:.3f}s budget")
+        sys.exit(1)
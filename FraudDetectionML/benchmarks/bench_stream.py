@@ -0,0 +1,106 @@
+"""
+Benchmark: streaming NDJSON scoring
+===================================
+Starts the gunicorn entry point with one worker and streams --rows
+transactions to /predict/stream as a chunked request while reading the
+NDJSON results concurrently on the same connection. Reports time to first
+result, rows/sec and the worker's peak RSS, which stays flat as --rows
+grows.
+
+Usage:
+    python benchmarks/bench_stream.py [--rows 200000]
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from synthetic_model import SRC_DIR, ensure_model_dir, make_transactions
+
+
+def wait_until_up(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def peak_rss_mb(pid):
+    """Peak RSS of the server's worker processes"""
+    children = subprocess.run(['pgrep', '-P', str(pid)], capture_output=True, text=True).stdout.split()
+    peak = 0
+    for child in children:
+        with open(f'/proc/{child}/status') as f:
+            peak = max(peak, next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')))
+    return peak / 1024
+
+
+def send_rows(sock, lines, rows):
+    sock.sendall(b'POST /predict/stream HTTP/1.1\r\nHost: localhost\r\n'
+                 b'Content-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n')
+    batch = 1000
+    for start in range(0, rows, batch):
+        payload = b''.join(lines[i % len(lines)] for i in range(start, min(start + batch, rows)))
+        sock.sendall(b'%x\r\n%s\r\n' % (len(payload), payload))
+    sock.sendall(b'0\r\n\r\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Streaming NDJSON benchmark')
+    parser.add_argument('--rows', type=int, default=200000, help='Transactions to stream')
+    parser.add_argument('--port', type=int, default=5057, help='Port to bind the server to')
+    parser.add_argument('--model-dir', type=str, default=None, help='Model directory (default: trained or synthetic)')
+    args = parser.parse_args()
+
+    model_dir = ensure_model_dir(args.model_dir)
+    transactions, _ = make_transactions(10000)
+    lines = [json.dumps(tx).encode() + b'\n' for tx in transactions]
+
+    env = dict(os.environ, WEB_CONCURRENCY='1', PORT=str(args.port), MODEL_DIR=model_dir)
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--config',
+                               os.path.join(SRC_DIR, 'gunicorn_conf.py')],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(args.port)
+        baseline_mb = peak_rss_mb(server.pid)
+
+        sock = socket.create_connection(('127.0.0.1', args.port))
+        started_at = time.perf_counter()
+        sender = threading.Thread(target=send_rows, args=(sock, lines, args.rows))
+        sender.start()
+
+        first_result_at = None
+        results = 0
+        summary = None
+        reader = sock.makefile('rb')
+        for line in reader:
+            if first_result_at is None and line.startswith(b'{"index"'):
+                first_result_at = time.perf_counter()
+            if line.startswith(b'{"index"'):
+                results += 1
+            elif line.startswith(b'{"summary"'):
+                summary = json.loads(line)['summary']
+                break
+        elapsed = time.perf_counter() - started_at
+        sender.join()
+        reader.close()
+        sock.close()
+
+        print(f"Rows streamed        : {args.rows:,} ({results:,} results, summary {summary})")
+        print(f"First result after   : {(first_result_at - started_at) * 1000:8.1f} ms")
+        print(f"Throughput           : {args.rows / elapsed:8.0f} rows/s")
+        print(f"Worker peak RSS      : {peak_rss_mb(server.pid):8.1f} MB (idle: {baseline_mb:.1f} MB)")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(30)
@@ -0,0 +1,80 @@
+"""
+Benchmark: JSON vs binary wire format on /predict/batch
+=======================================================
+Sends the same batch of transactions to the Flask app (in-process test
+client, so no network) as a JSON document and as an
+application/x-fraudguard-f32 matrix, and reports request size and
+milliseconds per batch for each, plus the model call alone for reference.
+
+Usage:
+    python benchmarks/bench_wire_format.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from synthetic_model import SRC_DIR, ensure_model_dir, make_transactions
+
+warnings.filterwarnings('ignore')
+
+
+def best_ms(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Wire format benchmark')
+    parser.add_argument('--rows', type=int, default=10000, help='Transactions per batch')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs (best is reported)')
+    parser.add_argument('--model-dir', type=str, default=None, help='Model directory (default: trained or synthetic)')
+    args = parser.parse_args()
+
+    os.environ['MODEL_DIR'] = ensure_model_dir(args.model_dir)
+    os.environ['LOCAL_CACHE_SIZE'] = '0'  # score every row on every run
+    sys.path.insert(0, SRC_DIR)
+    import app_enhanced
+    import wire_format
+    from features import RAW_INPUT_NAMES
+
+    client = app_enhanced.app.test_client()
+    transactions, _ = make_transactions(args.rows)
+    raw = np.array([[tx[name] for name in RAW_INPUT_NAMES] for tx in transactions], dtype=np.float32)
+
+    json_body = json.dumps({'transactions': transactions}).encode()
+    binary_body = wire_format.encode_matrix(raw)
+
+    def post_json():
+        response = client.post('/predict/batch', data=json_body, content_type='application/json')
+        assert response.status_code == 200
+        return [result['probability'] for result in response.get_json()['results']]
+
+    def post_binary():
+        response = client.post('/predict/batch', data=binary_body, content_type=wire_format.CONTENT_TYPE)
+        assert response.status_code == 200
+        return wire_format.decode_scores(response.data)[0]
+
+    deviation = np.max(np.abs(np.array(post_json()) - post_binary()))
+    bundle = app_enhanced.models.current
+    X = bundle.feature_builder.build_from_raw(raw)
+
+    json_ms = best_ms(post_json, args.repeat)
+    binary_ms = best_ms(post_binary, args.repeat)
+    model_ms = best_ms(lambda: bundle.engine.predict_proba(X), args.repeat)
+
+    print(f"Rows per batch       : {args.rows:,}")
+    print(f"JSON request         : {len(json_body) / 1e6:8.2f} MB, {json_ms:8.2f} ms/batch")
+    print(f"Binary request       : {len(binary_body) / 1e6:8.2f} MB, {binary_ms:8.2f} ms/batch")
+    print(f"Model call alone     : {model_ms:8.2f} ms")
+    print(f"Speed-up             : {json_ms / binary_ms:8.1f}x")
+    print(f"Max |JSON - binary|  : {deviation:.2e}")
@@ -0,0 +1,92 @@
+"""
+Shared fixtures for the benchmarks: synthetic transactions and, when no
+trained model is available, a small XGBoost model and scaler trained on
+synthetic data (same feature layout as the ETL).
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+DEFAULT_MODEL_DIR = os.path.join(SRC_DIR, '..', 'models')
+
+
+def make_transactions(rows, seed=42, fraud_ratio=0.03):
+    """Synthetic /predict payloads (v1..v28, amount, time)"""
+    rng = np.random.default_rng(seed)
+    is_fraud = rng.random(rows) < fraud_ratio
+    V = rng.normal(0, 1, (rows, 28))
+    V[is_fraud] += rng.normal(2, 2, (int(is_fraud.sum()), 28))
+    amounts = np.where(is_fraud, rng.exponential(200, rows), rng.exponential(50, rows)).round(2)
+    times = rng.integers(0, 172800, rows).astype(float)
+
+    transactions = []
+    for i in range(rows):
+        tx = {f'v{j}': float(v) for j, v in enumerate(V[i], start=1)}
+        tx['amount'] = float(amounts[i])
+        tx['time'] = float(times[i])
+        transactions.append(tx)
+    return transactions, is_fraud
+
+
+def make_creditcard_frame(rows, seed=42, fraud_ratio=0.002, duplicate_ratio=0.005, negative_amounts=30):
+    """
+    Synthetic extract in the creditcard.csv layout (Time, V1..V28, Amount,
+    Class) with some duplicated rows and negative amounts for the ETL
+    validation to reject.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'Time': np.sort(rng.integers(0, 172800, rows)).astype(float)})
+    for i in range(1, 29):
+        df[f'V{i}'] = rng.normal(size=rows)
+    df['Amount'] = rng.exponential(88, rows).round(2)
+    df['Class'] = (rng.random(rows) < fraud_ratio).astype(int)
+
+    duplicates = df.iloc[rng.choice(rows, int(rows * duplicate_ratio), replace=False)]
+    df = pd.concat([df, duplicates]).sample(frac=1, random_state=seed).reset_index(drop=True)
+    df.loc[rng.choice(len(df), negative_amounts, replace=False), 'Amount'] *= -1
+    return df
+
+
+def write_creditcard_csv(path, rows, **kwargs):
+    """make_creditcard_frame written to path as CSV"""
+    make_creditcard_frame(rows, **kwargs).to_csv(path, index=False)
+    return path
+
+
+def train_synthetic_model(model_dir, rows=10000, seed=42):
+    """Train and save fraud_model.pkl / scaler.pkl into model_dir"""
+    import joblib
+    from sklearn.preprocessing import StandardScaler
+    from xgboost import XGBClassifier
+
+    transactions, y = make_transactions(rows, seed)
+    amounts = np.array([[tx['amount']] for tx in transactions])
+    scaler = StandardScaler().fit(amounts)
+
+    sys.path.insert(0, SRC_DIR)
+    from features import FeatureBuilder
+    X, _, _ = FeatureBuilder.from_scaler(scaler).build_matrix(transactions)
+
+    model = XGBClassifier(n_estimators=150, max_depth=5, learning_rate=0.05,
+                          tree_method='hist', eval_metric='logloss', random_state=seed)
+    model.fit(X, y)
+
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(model_dir, 'fraud_model.pkl'))
+    joblib.dump(scaler, os.path.join(model_dir, 'scaler.pkl'))
+    return model_dir
+
+
+def ensure_model_dir(model_dir=None):
+    """Return a directory holding a model: the given/default one, or a synthetic one"""
+    model_dir = model_dir or DEFAULT_MODEL_DIR
+    if os.path.exists(os.path.join(model_dir, 'fraud_model.pkl')):
+        return model_dir
+    print(f"ℹ️ No model in {model_dir} - training a synthetic one for the benchmark")
+    return train_synthetic_model(tempfile.mkdtemp(prefix='fraudguard-bench-'))
@@ -1,7 +1,8 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import joblib
-import numpy as np
+from scoring import InferenceEngine, load_threshold, score, get_risk_level
+from features import FeatureBuilder
 
 app = Flask(__name__)
 CORS(app)
@@ -14,8 +15,11 @@ scaler_path = os.path.join(model_dir, 'scaler.pkl')
 
 model = joblib.load(model_path)
 scaler = joblib.load(scaler_path)
+threshold = load_threshold(model_path)
+feature_builder = FeatureBuilder.from_scaler(scaler)
+engine = InferenceEngine(model)
 
-print("✅ Modèle chargé avec succès")
+print(f"✅ Modèle chargé avec succès (seuil de décision : {threshold:.4f})")
 
 
 @app.route('/health', methods=['GET'])
@@ -41,65 +45,18 @@ def predict():
     try:
         data = request.get_json()
 
-        # ----- Extraire les valeurs -----
-        amount = data.get('amount', 0)
-        time_value = data.get('time', 0)
-
-        # Normaliser le montant
-        amount_scaled = scaler.transform([[amount]])[0][0]
-
-        # Features temporelles
-        hour = (time_value / 3600) % 24
-        day = (time_value / 86400)
-
         # ----- Construire le vecteur de features dans le même ordre que ton ETL -----
-        features = []
-
-        # 1. V1 .. V28 (28 features)
-        for i in range(1, 29):
-            features.append(data.get(f'v{i}', 0))
-
-        # 2. Amount (brut)
-        features.append(amount)
-
-        # 3. Amount_scaled
-        features.append(amount_scaled)
-
-        # 4. Hour
-        features.append(hour)
-
-        # 5. Day
-        features.append(day)
-
-        # 6. Amount_Hour (feature d'interaction)
-        features.append(amount_scaled * hour)
-
-        # Vérification du nombre de features
-        if len(features) != 33:
-            return jsonify({
-                "error": f"Bad feature count: expected 33, got {len(features)}",
-                "details": features
-            }), 400
-
-        # ----- Conversion en array -----
-        X = np.array([features])
-
-        # ----- Prédictions -----
-        prediction = model.predict(X)[0]
-        probability = model.predict_proba(X)[0][1]
+        X = feature_builder.build_row(data)
 
-        # Niveau de risque
-        if probability >= 0.8:
-            risk_level = "HIGH"
-        elif probability >= 0.5:
-            risk_level = "MEDIUM"
-        else:
-            risk_level = "LOW"
+        # ----- Prédiction (une seule inférence, seuil issu de l'entraînement) -----
+        probabilities, predictions = score(engine, X, threshold)
+        prediction = predictions[0]
+        probability = probabilities[0]
 
         response = {
             "is_fraud": bool(prediction),
             "probability": float(probability),
-            "risk_level": risk_level
+            "risk_level": get_risk_level(probability)
         }
 
         return jsonify(response), 200
@@ -7,18 +7,32 @@ Enterprise-grade fraud detection service with:
 - Redis caching
 - Prometheus metrics
 - Batch processing capabilities
+- Hot model reload from a versioned model registry
+- Challenger models: A/B traffic split and asynchronous shadow scoring
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import joblib
-import numpy as np
 import os
 import json
+import atexit
+import hmac
+import queue
 import threading
 import time
 from datetime import datetime
 from functools import wraps
+from scoring import get_risk_level
+from features import FEATURE_COUNT, feature_digest
+from model_registry import ModelRegistry, ModelManager
+from shadow import ShadowScorer
+from coalescer import RequestCoalescer
+from cache import LRUCache
+from event_publisher import AsyncEventPublisher
+import wire_format
+from metrics import MetricsRegistry, COUNTER
+from tracing import Trace
+from profiler import SamplingProfiler, ProfilerBusy
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -30,85 +44,272 @@ CORS(app)
 config = {
     'KAFKA_ENABLED': os.getenv('KAFKA_ENABLED', 'false').lower() == 'true',
     'KAFKA_BOOTSTRAP_SERVERS': os.getenv('KAFKA_BOOTSTRAP_SERVERS', 'localhost:29092'),
+    'KAFKA_ACKS': os.getenv('KAFKA_ACKS', 'all'),
+    'KAFKA_LINGER_MS': int(os.getenv('KAFKA_LINGER_MS', 5)),
+    'KAFKA_BATCH_SIZE': int(os.getenv('KAFKA_BATCH_SIZE', 65536)),
+    'KAFKA_PUBLISH_QUEUE_SIZE': int(os.getenv('KAFKA_PUBLISH_QUEUE_SIZE', 10000)),
+    'KAFKA_OVERFLOW_POLICY': os.getenv('KAFKA_OVERFLOW_POLICY', 'drop'),
+    'KAFKA_SPILL_PATH': os.getenv('KAFKA_SPILL_PATH', '/tmp/fraudguard-kafka-spill.ndjson'),
+    'KAFKA_CONSUMER_WORKERS': int(os.getenv('KAFKA_CONSUMER_WORKERS', 1)),
+    'KAFKA_MAX_POLL_RECORDS': int(os.getenv('KAFKA_MAX_POLL_RECORDS', 500)),
+    'KAFKA_POLL_TIMEOUT_MS': int(os.getenv('KAFKA_POLL_TIMEOUT_MS', 100)),
+    'KAFKA_RETRY_BACKOFF_MS': int(os.getenv('KAFKA_RETRY_BACKOFF_MS', 1000)),
     'REDIS_ENABLED': os.getenv('REDIS_ENABLED', 'false').lower() == 'true',
     'REDIS_HOST': os.getenv('REDIS_HOST', 'localhost'),
     'REDIS_PORT': int(os.getenv('REDIS_PORT', 6379)),
-    'MODEL_VERSION': '2.0.0',
+    'REDIS_POOL_SIZE': int(os.getenv('REDIS_POOL_SIZE', os.getenv('WORKER_THREADS', 16))),
+    'REDIS_TIMEOUT_MS': float(os.getenv('REDIS_TIMEOUT_MS', 20)),
+    'REDIS_RETRY_SECONDS': float(os.getenv('REDIS_RETRY_SECONDS', 5)),
+    'REDIS_WRITE_QUEUE_SIZE': int(os.getenv('REDIS_WRITE_QUEUE_SIZE', 10000)),
+    'CACHE_TTL_SECONDS': int(os.getenv('CACHE_TTL_SECONDS', 3600)),
+    'LOCAL_CACHE_SIZE': int(os.getenv('LOCAL_CACHE_SIZE', 10000)),
+    'LOCAL_CACHE_TTL_SECONDS': int(os.getenv('LOCAL_CACHE_TTL_SECONDS', 300)),
+    'MODEL_DIR': os.getenv('MODEL_DIR', os.path.join(os.path.dirname(__file__), '..', 'models')),
+    'MODEL_VERSION': os.getenv('MODEL_VERSION', '2.0.0'),
+    'MODEL_REGISTRY_DIR': os.getenv('MODEL_REGISTRY_DIR', ''),
+    'MODEL_WATCH_SECONDS': float(os.getenv('MODEL_WATCH_SECONDS', 10)),
+    'SHADOW_QUEUE_SIZE': int(os.getenv('SHADOW_QUEUE_SIZE', 1000)),
+    'SHADOW_MAX_BATCH': int(os.getenv('SHADOW_MAX_BATCH', 256)),
+    'SHADOW_MAX_WAIT_MS': float(os.getenv('SHADOW_MAX_WAIT_MS', 50)),
+    'INFERENCE_BACKEND': os.getenv('INFERENCE_BACKEND', 'auto'),
+    'MODEL_FORMAT': os.getenv('MODEL_FORMAT', 'auto'),
+    'STREAM_CHUNK_ROWS': int(os.getenv('STREAM_CHUNK_ROWS', 1000)),
+    'COALESCER_ENABLED': os.getenv('COALESCER_ENABLED', 'false').lower() == 'true',
+    'COALESCER_MAX_BATCH': int(os.getenv('COALESCER_MAX_BATCH', 64)),
+    'COALESCER_MAX_WAIT_MS': float(os.getenv('COALESCER_MAX_WAIT_MS', 2)),
+    'METRICS_MULTIPROC_DIR': os.getenv('METRICS_MULTIPROC_DIR', ''),
+    'METRICS_FLUSH_SECONDS': float(os.getenv('METRICS_FLUSH_SECONDS', 1)),
+    'SERVER_TIMING_ENABLED': os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true',
+    'SLOW_REQUEST_MS': float(os.getenv('SLOW_REQUEST_MS', 0)),
+    'ADMIN_TOKEN': os.getenv('ADMIN_TOKEN', ''),
     'SERVICE_NAME': 'fraudguard-ml'
 }
 
 # ============================================================================
-# METRICS (Prometheus-compatible)
+# METRICS (Prometheus text exposition)
 # ============================================================================
+STAGES = ('parse', 'features', 'cache', 'model', 'kafka')
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+SCORE_DELTA_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+registry = MetricsRegistry('fraudguard')
+
 class Metrics:
+    """
+    Service metrics on top of the sharded registry.
+    
+    Request threads record into their own shard, so nothing here takes a
+    lock; values are merged (across gunicorn workers too, when
+    METRICS_MULTIPROC_DIR is set) when /metrics is scraped.
+    """
     def __init__(self):
-        self.predictions_total = 0
-        self.fraud_detected = 0
-        self.prediction_latency_sum = 0
-        self.prediction_latency_count = 0
-        self.errors_total = 0
-        self.kafka_messages_processed = 0
-        self.cache_hits = 0
-        self.cache_misses = 0
         self.start_time = time.time()
+        self.predictions = registry.counter('predictions_total', 'Transactions scored')
+        self.fraud_detected = registry.counter('fraud_detected_total', 'Transactions flagged as fraud')
+        self.errors = registry.counter('errors_total', 'Failed predictions and malformed transactions')
+        self.kafka_messages = registry.counter('kafka_messages_processed_total',
+                                               'Transaction messages consumed from Kafka')
+        self.prediction_latency = registry.histogram('prediction_latency_seconds',
+                                                     'End-to-end scoring latency per prediction call')
+        stage_latency = registry.histogram('stage_latency_seconds', 'Latency per request stage',
+                                           labelnames=('stage',))
+        self.stage_latency = {stage: stage_latency.labels(stage) for stage in STAGES}
+        cache_lookups = registry.counter('cache_lookups_total', 'Prediction cache lookups',
+                                         labelnames=('tier', 'result'))
+        self.cache_hits = cache_lookups.labels('all', 'hit')
+        self.cache_misses = cache_lookups.labels('all', 'miss')
+        self.redis_cache_hits = cache_lookups.labels('redis', 'hit')
+        self.redis_cache_misses = cache_lookups.labels('redis', 'miss')
+        self.redis_cache_errors = registry.counter('redis_errors_total', 'Redis failures and timeouts')
+        self.redis_cache_write_drops = registry.counter('redis_write_drops_total',
+                                                        'Cache writes dropped because the writer queue was full')
+        self.coalescer_batch_size = registry.histogram('coalescer_batch_size', 'Rows per coalesced model call',
+                                                       buckets=BATCH_SIZE_BUCKETS)
+        self.coalescer_queue_wait = registry.histogram('coalescer_queue_wait_seconds',
+                                                       'Time a row waited for its coalesced batch')
+        self.model_reloads = registry.counter('model_reloads_total', 'Model versions swapped in')
+        self.model_warmup = registry.histogram('model_warmup_seconds', 'Warm-up time of a newly loaded model')
+        self.model_inference = registry.histogram('model_inference_seconds', 'Model call latency per version',
+                                                  labelnames=('version', 'traffic'))
+        self.model_rows = registry.counter('model_rows_scored_total', 'Rows scored per model version',
+                                           labelnames=('version', 'traffic'))
+        self.shadow_delta = registry.histogram('shadow_score_delta',
+                                               'Absolute challenger - champion probability per shadowed row',
+                                               buckets=SCORE_DELTA_BUCKETS, labelnames=('champion', 'challenger'))
+        self.shadow_disagreements = registry.counter('shadow_disagreements_total',
+                                                     'Shadowed rows whose challenger verdict differs',
+                                                     labelnames=('champion', 'challenger'))
+        
+        registry.callback('uptime_seconds', 'Seconds since the service started',
+                          lambda: time.time() - self.start_time, aggregate='max')
+        registry.callback('local_cache_entries', 'Entries in the in-process cache',
+                          lambda: len(local_cache))
+        registry.callback('local_cache_evictions_total', 'In-process cache LRU evictions',
+                          lambda: local_cache.evictions, kind=COUNTER)
+        registry.callback('kafka_publish_queue_depth', 'Events waiting to be published',
+                          lambda: event_publisher.stats()['queued'] if event_publisher else None)
+        registry.callback('kafka_events_total', 'Kafka publisher events by outcome',
+                          lambda: {(outcome,): value
+                                   for outcome, value in event_publisher.stats().items()
+                                   if outcome != 'queued'} if event_publisher else {},
+                          kind=COUNTER, labelnames=('outcome',))
+        registry.callback('model_info', 'Model version being served (value is always 1)',
+                          lambda: {(models.current.version,): 1} if models.loaded else {},
+                          labelnames=('version',), aggregate='max')
+        registry.callback('shadow_dropped_total', 'Rows not shadowed because the shadow queue was full',
+                          lambda: shadow_scorer.dropped if shadow_scorer else None, kind=COUNTER)
     
     def record_prediction(self, is_fraud, latency):
-        self.predictions_total += 1
+        self.predictions.inc()
         if is_fraud:
-            self.fraud_detected += 1
-        self.prediction_latency_sum += latency
-        self.prediction_latency_count += 1
+            self.fraud_detected.inc()
+        self.prediction_latency.observe(latency)
+    
+    def record_batch(self, size, fraud_count, latency):
+        self.predictions.inc(size)
+        self.fraud_detected.inc(fraud_count)
+        self.prediction_latency.observe(latency)
+    
+    def record_stage(self, stage, seconds):
+        self.stage_latency[stage].observe(seconds)
+    
+    def record_coalesced_batch(self, size, queue_waits):
+        self.coalescer_batch_size.observe(size)
+        for wait in queue_waits:
+            self.coalescer_queue_wait.observe(wait)
     
     def record_error(self):
-        self.errors_total += 1
+        self.errors.inc()
+    
+    def record_model_reload(self, bundle):
+        self.model_reloads.inc()
+        self.model_warmup.observe(bundle.warmup_ms / 1000)
+    
+    def record_model_call(self, version, traffic, rows, seconds):
+        self.model_inference.labels(version, traffic).observe(seconds)
+        self.model_rows.labels(version, traffic).inc(rows)
+    
+    def record_shadow(self, champion, challenger, deltas, disagreements):
+        delta = self.shadow_delta.labels(champion, challenger)
+        for value in deltas.tolist():
+            delta.observe(value)
+        self.shadow_disagreements.labels(champion, challenger).inc(disagreements)
     
     def get_metrics(self):
-        uptime = time.time() - self.start_time
-        avg_latency = (self.prediction_latency_sum / self.prediction_latency_count 
-                       if self.prediction_latency_count > 0 else 0)
-        fraud_rate = (self.fraud_detected / self.predictions_total 
-                      if self.predictions_total > 0 else 0)
+        """JSON summary of the collected metrics"""
+        snapshot = registry.collect()
+        counters = snapshot['counters']
+        count = lambda name, *labels: counters.get((name, labels), 0)
+        latency = snapshot['histograms'].get(('prediction_latency_seconds', ()))
+        
+        predictions = count('predictions_total')
+        fraud_detected = count('fraud_detected_total')
+        latency_count = sum(latency[:-1]) if latency else 0
+        avg_latency = latency[-1] / latency_count if latency_count else 0
+        quantile_ms = lambda q: round((registry.histogram_quantile(
+            snapshot, 'prediction_latency_seconds', q) or 0) * 1000, 3)
         
         return {
-            'predictions_total': self.predictions_total,
-            'fraud_detected_total': self.fraud_detected,
-            'fraud_rate': round(fraud_rate, 4),
+            'predictions_total': predictions,
+            'fraud_detected_total': fraud_detected,
+            'fraud_rate': round(fraud_detected / predictions, 4) if predictions else 0,
             'avg_prediction_latency_ms': round(avg_latency * 1000, 2),
-            'errors_total': self.errors_total,
-            'kafka_messages_processed': self.kafka_messages_processed,
-            'cache_hits': self.cache_hits,
-            'cache_misses': self.cache_misses,
-            'uptime_seconds': round(uptime, 2)
+            'p50_prediction_latency_ms': quantile_ms(0.5),
+            'p99_prediction_latency_ms': quantile_ms(0.99),
+            'stage_p99_latency_ms': {
+                stage: round((registry.histogram_quantile(
+                    snapshot, 'stage_latency_seconds', 0.99, (stage,)) or 0) * 1000, 3)
+                for stage in STAGES
+            },
+            'errors_total': count('errors_total'),
+            'kafka_messages_processed': count('kafka_messages_processed_total'),
+            'kafka_publisher': event_publisher.stats() if event_publisher else None,
+            'cache_hits': count('cache_lookups_total', 'all', 'hit'),
+            'cache_misses': count('cache_lookups_total', 'all', 'miss'),
+            'cache_tiers': {
+                'local': local_cache.stats(),
+                'redis': {
+                    'hits': count('cache_lookups_total', 'redis', 'hit'),
+                    'misses': count('cache_lookups_total', 'redis', 'miss'),
+                    'errors': count('redis_errors_total'),
+                    'write_drops': count('redis_write_drops_total')
+                }
+            },
+            'uptime_seconds': round(time.time() - self.start_time, 2)
         }
 
 metrics = Metrics()
 
+def init_metrics():
+    """Share metrics between worker processes through METRICS_MULTIPROC_DIR"""
+    if not config['METRICS_MULTIPROC_DIR']:
+        return
+    registry.enable_multiprocess(config['METRICS_MULTIPROC_DIR'], config['METRICS_FLUSH_SECONDS'])
+    print(f"✅ Metrics aggregated across workers via {config['METRICS_MULTIPROC_DIR']}")
+
+# ============================================================================
+# TRACING & PROFILING
+# ============================================================================
+profiler = SamplingProfiler()
+
+def new_trace():
+    """Trace whose stage timings feed the stage latency histograms"""
+    return Trace(metrics.record_stage)
+
+def finish_trace(trace, response, endpoint):
+    """Attach the Server-Timing header and log the stages of slow requests"""
+    if config['SERVER_TIMING_ENABLED']:
+        response.headers['Server-Timing'] = trace.server_timing()
+    if config['SLOW_REQUEST_MS'] and trace.elapsed_ms >= config['SLOW_REQUEST_MS']:
+        print(f"🐢 Slow {endpoint}: {trace.elapsed_ms:.2f} ms ({trace.summary()})")
+    return response
+
 # ============================================================================
 # MODEL LOADING
 # ============================================================================
-model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
-model_path = os.path.join(model_dir, 'fraud_model.pkl')
-scaler_path = os.path.join(model_dir, 'scaler.pkl')
+# MODEL_VERSION names the flat MODEL_DIR layout, served until a registry
+# version is activated (see model_registry.py)
+model_registry = ModelRegistry(
+    config['MODEL_REGISTRY_DIR'] or os.path.join(config['MODEL_DIR'], 'registry'),
+    legacy_dir=config['MODEL_DIR'],
+    legacy_version=config['MODEL_VERSION'],
+    model_format=config['MODEL_FORMAT']
+)
+
+def on_model_swap(previous, bundle):
+    metrics.record_model_reload(bundle)
+    if previous is not None:
+        print(f"🔄 Model {previous.version} replaced by {bundle.version} "
+              f"(warm-up {bundle.warmup_ms:.1f} ms)")
+
+models = ModelManager(model_registry, config['INFERENCE_BACKEND'], on_swap=on_model_swap,
+                      on_score=metrics.record_model_call)
 
 try:
-    model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
-    model_loaded = True
-    print("✅ Model loaded successfully")
+    models.reload()
+    print(f"✅ Model {models.current.version} loaded successfully "
+          f"(decision threshold: {models.current.threshold:.4f}, "
+          f"inference path: {models.current.engine.path})")
 except Exception as e:
     print(f"⚠️ Model loading failed: {e}")
-    model = None
-    scaler = None
-    model_loaded = False
+
+try:
+    if models.reload_challenger() is not None:
+        print(f"✅ Challenger {models.experiment.bundle.version} loaded "
+              f"({models.experiment.traffic_percent}% of traffic, "
+              f"{models.experiment.shadow_percent}% shadowed)")
+except Exception as e:
+    print(f"⚠️ Challenger loading failed: {e}")
 
 # ============================================================================
 # OPTIONAL: KAFKA INTEGRATION
 # ============================================================================
 kafka_producer = None
 kafka_consumer = None
+event_publisher = None
 
 def init_kafka():
-    global kafka_producer, kafka_consumer
+    global kafka_producer, kafka_consumer, event_publisher
     if not config['KAFKA_ENABLED']:
         print("ℹ️ Kafka disabled - running in standalone mode")
         return
@@ -116,171 +317,397 @@ def init_kafka():
     try:
         from kafka import KafkaProducer, KafkaConsumer
         
+        acks = config['KAFKA_ACKS']
         kafka_producer = KafkaProducer(
             bootstrap_servers=config['KAFKA_BOOTSTRAP_SERVERS'],
             value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-            acks='all'
+            acks=acks if acks == 'all' else int(acks),
+            linger_ms=config['KAFKA_LINGER_MS'],
+            batch_size=config['KAFKA_BATCH_SIZE']
         )
         
+        # Sends happen on a background thread; request threads only enqueue
+        event_publisher = AsyncEventPublisher(
+            kafka_producer,
+            max_queue=config['KAFKA_PUBLISH_QUEUE_SIZE'],
+            policy=config['KAFKA_OVERFLOW_POLICY'],
+            spill_path=config['KAFKA_SPILL_PATH']
+        )
+        event_publisher.start()
+        atexit.register(event_publisher.close)
+        
         print(f"✅ Kafka producer connected to {config['KAFKA_BOOTSTRAP_SERVERS']}")
         
-        # Start consumer in background thread
-        consumer_thread = threading.Thread(target=kafka_consumer_loop, daemon=True)
-        consumer_thread.start()
+        # Start consumer workers in background threads (same consumer group)
+        for worker in range(config['KAFKA_CONSUMER_WORKERS']):
+            consumer_thread = threading.Thread(target=kafka_consumer_loop,
+                                               name=f'kafka-consumer-{worker}', daemon=True)
+            consumer_thread.start()
         
     except Exception as e:
         print(f"⚠️ Kafka initialization failed: {e}")
 
-def kafka_consumer_loop():
-    """Background consumer for transaction events"""
+def create_kafka_consumer():
+    """Consumer for the transactions topic; offsets are committed manually"""
+    from kafka import KafkaConsumer
+    
+    return KafkaConsumer(
+        'transactions',
+        bootstrap_servers=config['KAFKA_BOOTSTRAP_SERVERS'],
+        group_id='fraudguard-ml-consumers',
+        auto_offset_reset='latest',
+        enable_auto_commit=False,
+        max_poll_records=config['KAFKA_MAX_POLL_RECORDS']
+    )
+
+def kafka_consumer_loop(consumer=None, stop_event=None):
+    """
+    Background consumer for transaction events.
+    
+    Each poll returns up to KAFKA_MAX_POLL_RECORDS messages, which are
+    scored with one vectorized model call. Fraud alerts for the batch are
+    sent in bulk and offsets are committed only once the batch is done; a
+    batch that fails is rewound and polled again after KAFKA_RETRY_BACKOFF_MS.
+    """
     try:
-        from kafka import KafkaConsumer
+        if consumer is None:
+            consumer = create_kafka_consumer()
         
-        consumer = KafkaConsumer(
-            'transactions',
-            bootstrap_servers=config['KAFKA_BOOTSTRAP_SERVERS'],
-            value_deserializer=lambda m: json.loads(m.decode('utf-8')),
-            group_id='fraudguard-ml-consumers',
-            auto_offset_reset='latest'
-        )
-        
-        print("✅ Kafka consumer started - listening for transactions")
+        print(f"✅ Kafka consumer started - listening for transactions "
+              f"(batches of up to {config['KAFKA_MAX_POLL_RECORDS']})")
         
-        for message in consumer:
+        while stop_event is None or not stop_event.is_set():
+            polled = consumer.poll(timeout_ms=config['KAFKA_POLL_TIMEOUT_MS'],
+                                   max_records=config['KAFKA_MAX_POLL_RECORDS'])
+            messages = [message for records in polled.values() for message in records]
+            if not messages:
+                continue
+            
             try:
-                transaction = message.value
-                result = process_transaction(transaction)
-                
-                # Publish fraud alert if detected
-                if result['is_fraud'] and kafka_producer:
-                    kafka_producer.send('fraud-alerts', {
-                        'transaction_id': transaction.get('id'),
-                        'risk_score': result['probability'],
-                        'risk_level': result['risk_level'],
-                        'detected_at': datetime.utcnow().isoformat()
-                    })
-                    kafka_producer.flush()
-                
-                metrics.kafka_messages_processed += 1
-                
+                process_message_batch(messages)
+                consumer.commit()
             except Exception as e:
-                print(f"Error processing Kafka message: {e}")
+                print(f"Error processing Kafka batch: {e}")
                 metrics.record_error()
+                rewind_batch(consumer, polled)
+                time.sleep(config['KAFKA_RETRY_BACKOFF_MS'] / 1000.0)
                 
     except Exception as e:
         print(f"Kafka consumer error: {e}")
 
-def publish_event(topic, event):
-    """Publish event to Kafka topic"""
-    if kafka_producer:
-        try:
-            kafka_producer.send(topic, event)
+def rewind_batch(consumer, polled):
+    """
+    Seek every partition of a failed batch back to the batch's first
+    offset, so the next poll returns it again instead of moving past it
+    (the next commit would otherwise skip the failed messages).
+    """
+    for partition, records in polled.items():
+        if records:
+            consumer.seek(partition, records[0].offset)
+
+def process_message_batch(messages):
+    """Score a batch of transaction messages and send fraud alerts in bulk"""
+    trace = new_trace()
+    transactions, results = score_messages(messages, trace)
+    alerts = fraud_alerts(transactions, results)
+    
+    # Alerts must reach the broker before the batch offsets are committed
+    if alerts and kafka_producer:
+        with trace.span('kafka'):
+            for alert in alerts:
+                kafka_producer.send('fraud-alerts', alert)
             kafka_producer.flush()
-        except Exception as e:
-            print(f"Failed to publish event: {e}")
+    
+    metrics.kafka_messages.inc(len(messages))
+    if config['SLOW_REQUEST_MS'] and trace.elapsed_ms >= config['SLOW_REQUEST_MS']:
+        print(f"🐢 Slow Kafka batch of {len(messages)}: {trace.elapsed_ms:.2f} ms ({trace.summary()})")
+    return results
+
+def score_messages(messages, trace=None):
+    """Decode and score a batch of transaction messages; returns (transactions, results)"""
+    trace = trace or new_trace()
+    transactions = []
+    with trace.span('parse'):
+        for message in messages:
+            try:
+                transactions.append(json.loads(message.value))
+            except (TypeError, ValueError):
+                transactions.append(None)  # reported as a malformed row by score_batch
+    
+    return transactions, score_batch(transactions, trace=trace)
+
+def fraud_alerts(transactions, results):
+    """Alert events for the fraudulent transactions of a scored batch"""
+    detected_at = datetime.utcnow().isoformat()
+    return [{
+        'transaction_id': transaction.get('id'),
+        'risk_score': result['probability'],
+        'risk_level': result['risk_level'],
+        'detected_at': detected_at
+    } for transaction, result in zip(transactions, results) if result.get('is_fraud')]
+
+def publish_event(topic, event):
+    """Queue an event for asynchronous publishing to a Kafka topic"""
+    if event_publisher:
+        event_publisher.publish(topic, event)
 
 # ============================================================================
-# OPTIONAL: REDIS CACHING
+# CACHING (in-process LRU tier + optional Redis tier)
 # ============================================================================
+local_cache = LRUCache(config['LOCAL_CACHE_SIZE'], config['LOCAL_CACHE_TTL_SECONDS'])
 redis_client = None
+redis_retry_at = 0.0
+cache_write_queue = queue.Queue(maxsize=config['REDIS_WRITE_QUEUE_SIZE'])
 
-def init_redis():
+def init_redis(client=None):
+    """
+    Connect the Redis tier.
+    
+    Reads are bounded by REDIS_TIMEOUT_MS and writes are pipelined by a
+    background thread, so a slow Redis never adds more than that budget
+    to a prediction. A pre-built client can be injected for testing, e.g.
+    the FakeRedis stand-in of benchmarks/bench_redis_cache.py.
+    """
     global redis_client
-    if not config['REDIS_ENABLED']:
+    if client is None and not config['REDIS_ENABLED']:
         print("ℹ️ Redis disabled - running without cache")
         return
     
     try:
-        import redis
-        redis_client = redis.Redis(
-            host=config['REDIS_HOST'],
-            port=config['REDIS_PORT'],
-            decode_responses=True
-        )
-        redis_client.ping()
-        print(f"✅ Redis connected to {config['REDIS_HOST']}:{config['REDIS_PORT']}")
+        if client is None:
+            import redis
+            timeout = config['REDIS_TIMEOUT_MS'] / 1000.0
+            pool = redis.BlockingConnectionPool(
+                host=config['REDIS_HOST'],
+                port=config['REDIS_PORT'],
+                max_connections=config['REDIS_POOL_SIZE'] + 1,  # +1 for the writer thread
+                timeout=timeout,
+                socket_timeout=timeout,
+                socket_connect_timeout=timeout,
+                decode_responses=True
+            )
+            client = redis.Redis(connection_pool=pool)
+        client.ping()
+        redis_client = client
+        threading.Thread(target=cache_writer_loop, name='redis-cache-writer', daemon=True).start()
+        print(f"✅ Redis connected to {config['REDIS_HOST']}:{config['REDIS_PORT']} "
+              f"(pool: {config['REDIS_POOL_SIZE']}, budget: {config['REDIS_TIMEOUT_MS']} ms)")
     except Exception as e:
         print(f"⚠️ Redis initialization failed: {e}")
 
+def redis_available():
+    """False while Redis is backing off after a failure or timeout"""
+    return redis_client is not None and time.monotonic() >= redis_retry_at
+
+def redis_failed():
+    """Skip Redis for REDIS_RETRY_SECONDS after a failure or timeout"""
+    global redis_retry_at
+    metrics.redis_cache_errors.inc()
+    redis_retry_at = time.monotonic() + config['REDIS_RETRY_SECONDS']
+
 def get_cached_prediction(cache_key):
-    """Get prediction from cache"""
-    if redis_client:
+    """Get prediction from cache (local tier first, then Redis)"""
+    return get_cached_predictions([cache_key])[0]
+
+def get_cached_predictions(cache_keys):
+    """
+    Look up several predictions at once.
+    
+    The local tier is checked first; the remaining keys are fetched from
+    Redis with a single MGET. Returns a list aligned with cache_keys
+    holding a result dict or None.
+    """
+    results = [local_cache.get(key) for key in cache_keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    
+    if missing and redis_available():
         try:
-            cached = redis_client.get(f"pred:{cache_key}")
-            if cached:
-                metrics.cache_hits += 1
-                return json.loads(cached)
-        except:
-            pass
-    metrics.cache_misses += 1
-    return None
-
-def set_cached_prediction(cache_key, result, ttl=3600):
-    """Cache prediction result"""
-    if redis_client:
+            values = redis_client.mget([f"pred:{cache_keys[i]}" for i in missing])
+            for i, value in zip(missing, values):
+                if value:
+                    results[i] = json.loads(value)
+                    local_cache.set(cache_keys[i], results[i])
+                    metrics.redis_cache_hits.inc()
+                else:
+                    metrics.redis_cache_misses.inc()
+        except Exception:
+            redis_failed()
+    
+    hits = sum(1 for result in results if result is not None)
+    metrics.cache_hits.inc(hits)
+    metrics.cache_misses.inc(len(results) - hits)
+    return [dict(result) if result is not None else None for result in results]
+
+def set_cached_prediction(cache_key, result):
+    """Cache prediction result in both tiers"""
+    set_cached_predictions({cache_key: result})
+
+def set_cached_predictions(results):
+    """
+    Cache several {cache_key: result} entries.
+    
+    The local tier is filled immediately; Redis writes are queued for the
+    writer thread (and dropped if its queue is full).
+    """
+    for cache_key, result in results.items():
+        local_cache.set(cache_key, dict(result))
+    if redis_client is not None and results:
         try:
-            redis_client.setex(f"pred:{cache_key}", ttl, json.dumps(result))
-        except:
-            pass
+            cache_write_queue.put_nowait({key: json.dumps(result) for key, result in results.items()})
+        except queue.Full:
+            metrics.redis_cache_write_drops.inc(len(results))
+
+def cache_writer_loop():
+    """Write queued predictions to Redis with one pipelined SETEX batch per drain"""
+    while True:
+        pending = [cache_write_queue.get()]
+        while True:
+            try:
+                pending.append(cache_write_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        if redis_available():
+            try:
+                pipe = redis_client.pipeline(transaction=False)
+                for entries in pending:
+                    for cache_key, value in entries.items():
+                        pipe.setex(f"pred:{cache_key}", config['CACHE_TTL_SECONDS'], value)
+                pipe.execute()
+            except Exception:
+                redis_failed()
+        
+        for _ in pending:
+            cache_write_queue.task_done()
 
 # ============================================================================
-# CORE PREDICTION LOGIC
+# OPTIONAL: REQUEST COALESCING
 # ============================================================================
-def process_transaction(data):
-    """Process a single transaction and return fraud prediction"""
-    start_time = time.time()
+coalescer = None
+
+def init_coalescer(buffer=None):
+    """
+    Batch concurrent /predict calls into vectorized model calls.
     
-    try:
-        # Extract values
-        amount = data.get('amount', 0)
-        time_value = data.get('time', 0)
+    buffer optionally provides the (COALESCER_MAX_BATCH, FEATURE_COUNT)
+    float32 batch buffer, e.g. this worker's slot of the shared-memory
+    block handed out by gunicorn_conf.py.
+    """
+    global coalescer
+    if not config['COALESCER_ENABLED']:
+        print("ℹ️ Request coalescing disabled - scoring each request individually")
+        return
+    
+    coalescer = RequestCoalescer(
+        lambda bundle, X: bundle.score(X),
+        FEATURE_COUNT,
+        max_batch_size=config['COALESCER_MAX_BATCH'],
+        max_wait_ms=config['COALESCER_MAX_WAIT_MS'],
+        on_batch=metrics.record_coalesced_batch,
+        buffer=buffer
+    )
+    coalescer.start()
+    print(f"✅ Request coalescing enabled (max {config['COALESCER_MAX_BATCH']} rows / "
+          f"{config['COALESCER_MAX_WAIT_MS']} ms)")
 
-        # Normalize amount
-        amount_scaled = scaler.transform([[amount]])[0][0]
+# ============================================================================
+# OPTIONAL: CHALLENGER SHADOW SCORING
+# ============================================================================
+shadow_scorer = None
 
-        # Temporal features
-        hour = (time_value / 3600) % 24
-        day = (time_value / 86400)
+def init_shadow_scorer():
+    """Start the background thread that scores shadow samples with the challenger"""
+    global shadow_scorer
+    shadow_scorer = ShadowScorer(max_queue=config['SHADOW_QUEUE_SIZE'],
+                                 max_batch_size=config['SHADOW_MAX_BATCH'],
+                                 max_wait_ms=config['SHADOW_MAX_WAIT_MS'],
+                                 on_result=metrics.record_shadow)
+    shadow_scorer.start()
 
+def shadow_sample(bundle, X, probabilities, predictions):
+    """
+    Queue a sample (shadow_percent) of rows the champion just scored for
+    the challenger. Only copies and enqueues: the challenger runs on the
+    shadow thread, never on the request path.
+    """
+    experiment = models.experiment
+    if experiment is None or shadow_scorer is None or bundle is experiment.bundle:
+        return
+    sample = experiment.shadow_sample(X, probabilities, predictions)
+    if sample is not None:
+        shadow_scorer.submit(bundle, experiment.bundle, *sample)
+
+def init_services(scoring_buffer=None):
+    """
+    Start the per-process integrations.
+    
+    Background threads and connections do not survive fork(), so under
+    gunicorn this runs in every worker (post_fork) rather than at import.
+    """
+    init_metrics()
+    init_kafka()
+    init_redis()
+    init_coalescer(scoring_buffer)
+    init_shadow_scorer()
+    models.start_watcher(config['MODEL_WATCH_SECONDS'])
+
+# ============================================================================
+# CORE PREDICTION LOGIC
+# ============================================================================
+def route_transaction(data):
+    """
+    Pick the model serving one /predict transaction (the champion, or the
+    challenger for its traffic share) and build the feature row with it.
+    Returns (bundle, X, cache_key); X is the thread's reusable row buffer.
+    """
+    bundle = models.current
+    X = bundle.feature_builder.build_row(data)
+    digest = feature_digest(X)
+    if models.experiment is not None:
+        routed = models.route(digest)
+        if routed is not bundle:
+            bundle = routed
+            X = bundle.feature_builder.build_row(data)
+            return bundle, X, bundle.cache_key(X)
+    return bundle, X, f"{bundle.version}:{digest}"
+
+def process_transaction(data, X=None, trace=None, bundle=None):
+    """
+    Process a single transaction and return fraud prediction.
+    
+    X may carry the feature row already built by the caller for this data,
+    with the caller's model bundle; stage timings are added to the
+    caller's trace when one is given.
+    """
+    start_time = time.perf_counter()
+    trace = trace or new_trace()
+    bundle = bundle or models.current
+    
+    try:
         # Build feature vector (same order as training)
-        features = []
-        
-        # V1 to V28 (PCA components)
-        for i in range(1, 29):
-            features.append(data.get(f'v{i}', 0))
-        
-        # Additional features
-        features.append(amount)           # Raw amount
-        features.append(amount_scaled)    # Scaled amount
-        features.append(hour)             # Hour of day
-        features.append(day)              # Day
-        features.append(amount_scaled * hour)  # Interaction term
-
-        # Validate feature count
-        if len(features) != 33:
-            raise ValueError(f"Bad feature count: expected 33, got {len(features)}")
-
-        # Make prediction
-        X = np.array([features])
-        prediction = model.predict(X)[0]
-        probability = model.predict_proba(X)[0][1]
-
-        # Determine risk level
-        if probability >= 0.8:
-            risk_level = "HIGH"
-        elif probability >= 0.5:
-            risk_level = "MEDIUM"
-        else:
-            risk_level = "LOW"
+        if X is None:
+            with trace.span('features'):
+                X = bundle.feature_builder.build_row(data)
+
+        # Make prediction (batched with concurrent requests when coalescing)
+        with trace.span('model'):
+            # Scored by the bundle X was built with, even if a reload swaps models.current meanwhile
+            if coalescer is not None:
+                probability, prediction = coalescer.submit(X[0], bundle)
+            else:
+                probabilities, predictions = bundle.score(X)
+                prediction = predictions[0]
+                probability = probabilities[0]
+        shadow_sample(bundle, X, [probability], [prediction])
 
         result = {
             "is_fraud": bool(prediction),
             "probability": float(probability),
-            "risk_level": risk_level
+            "risk_level": get_risk_level(probability)
         }
         
         # Record metrics
-        latency = time.time() - start_time
+        latency = time.perf_counter() - start_time
         metrics.record_prediction(result['is_fraud'], latency)
         
         return result
@@ -289,25 +716,152 @@ def process_transaction(data):
         metrics.record_error()
         raise e
 
+def score_batch(transactions, use_cache=False, trace=None):
+    """
+    Score a batch of transactions with a single model call.
+    
+    With use_cache, cached rows are answered from the cache (one MGET for
+    the whole batch) and only the remaining rows are scored and cached.
+    Returns one entry per input transaction, in input order: either a
+    prediction dict or {"error": ...} for malformed rows.
+    """
+    start_time = time.perf_counter()
+    trace = trace or new_trace()
+    bundle = models.current
+    
+    with trace.span('features'):
+        X, row_index, errors = bundle.feature_builder.build_matrix(transactions)
+    results = [None] * len(transactions)
+    
+    if use_cache and len(row_index):
+        with trace.span('cache'):
+            cache_keys = [bundle.cache_key(row) for row in X]
+            cached = get_cached_predictions(cache_keys)
+        for i, result in zip(row_index, cached):
+            if result is not None:
+                result['cached'] = True
+                results[i] = result
+        to_score = [j for j, result in enumerate(cached) if result is None]
+        if len(to_score) < len(row_index):
+            X = X[to_score]
+            row_index = [row_index[j] for j in to_score]
+            cache_keys = [cache_keys[j] for j in to_score]
+    
+    if len(row_index):
+        with trace.span('model'):
+            probabilities, predictions = bundle.score(X)
+        shadow_sample(bundle, X, probabilities, predictions)
+        fraud_count = int(predictions.sum())
+        
+        for i, probability, prediction in zip(row_index, probabilities.tolist(), predictions.tolist()):
+            results[i] = {
+                "is_fraud": prediction,
+                "probability": probability,
+                "risk_level": get_risk_level(probability)
+            }
+        
+        metrics.record_batch(len(row_index), fraud_count, time.perf_counter() - start_time)
+        
+        if use_cache:
+            with trace.span('cache'):
+                set_cached_predictions({key: results[i] for key, i in zip(cache_keys, row_index)})
+            for i in row_index:
+                results[i]['cached'] = False
+    
+    for i, error in errors.items():
+        results[i] = {"error": error}
+        metrics.record_error()
+    
+    return results
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
-@app.route('/health', methods=['GET'])
-def health():
-    """Health check endpoint"""
-    return jsonify({
+def score_raw_matrix(raw, trace=None):
+    """
+    Score an (n, 30) matrix of raw inputs (binary batch format) with one
+    model call and return the fraud probabilities and the decision
+    threshold they were scored against. No caching: this path is meant
+    for bulk scoring, where the rows are rarely repeated.
+    """
+    start_time = time.perf_counter()
+    trace = trace or new_trace()
+    bundle = models.current
+    
+    with trace.span('features'):
+        X = bundle.feature_builder.build_from_raw(raw)
+    with trace.span('model'):
+        probabilities, predictions = bundle.score(X)
+    
+    metrics.record_batch(len(X), int(predictions.sum()), time.perf_counter() - start_time)
+    return probabilities, bundle.threshold
+
+def ndjson_chunks(lines, chunk_rows):
+    """Group the non-blank lines of an NDJSON stream into lists of chunk_rows"""
+    chunk = []
+    for line in lines:
+        if line.strip():
+            chunk.append(line)
+            if len(chunk) == chunk_rows:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def score_ndjson_chunk(lines, first_index):
+    """
+    Score a chunk of NDJSON transaction lines (bytes, one JSON object
+    each). Returns the NDJSON result lines, one per input line and tagged
+    with its stream index, and the number of frauds in the chunk.
+    """
+    transactions = []
+    parse_errors = {}
+    for i, line in enumerate(lines):
+        try:
+            transactions.append(json.loads(line))
+        except ValueError as e:
+            transactions.append(None)
+            parse_errors[i] = f"Invalid JSON: {e}"
+    
+    output = []
+    fraud_count = 0
+    for i, result in enumerate(score_batch(transactions)):
+        if i in parse_errors:
+            result = {"error": parse_errors[i]}
+        fraud_count += bool(result.get('is_fraud'))
+        output.append(json.dumps({"index": first_index + i, **result}))
+    return ('\n'.join(output) + '\n').encode(), fraud_count
+
+def health_status():
+    """Health payload shared by the Flask and ASGI front ends"""
+    return {
         "status": "healthy",
-        "model_loaded": model_loaded,
-        "model_version": config['MODEL_VERSION'],
+        "model_loaded": models.loaded,
+        "model_version": models.current.version if models.loaded else None,
+        "challenger_version": models.experiment.bundle.version if models.experiment else None,
         "service": config['SERVICE_NAME'],
         "kafka_enabled": config['KAFKA_ENABLED'],
         "redis_enabled": config['REDIS_ENABLED'],
         "timestamp": datetime.utcnow().isoformat()
-    }), 200
+    }
+
+def describe_model():
+    """Model information payload shared by the Flask and ASGI front ends"""
+    return {**models.current.describe(), "classes": ["legitimate", "fraud"]}
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Health check endpoint"""
+    return jsonify(health_status()), 200
 
 @app.route('/metrics', methods=['GET'])
 def get_metrics():
-    """Prometheus-compatible metrics endpoint"""
+    """Prometheus metrics endpoint (text exposition format)"""
+    return Response(registry.render_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/metrics/json', methods=['GET'])
+def get_metrics_json():
+    """Metrics summary as JSON"""
     return jsonify(metrics.get_metrics()), 200
 
 @app.route('/predict', methods=['POST'])
@@ -330,37 +884,47 @@ def predict():
     }
     """
     try:
-        if not model_loaded:
+        if not models.loaded:
             return jsonify({"error": "Model not loaded"}), 503
         
-        data = request.get_json()
+        trace = new_trace()
+        with trace.span('parse'):
+            data = request.get_json()
         
-        # Generate cache key from transaction data
-        cache_key = hash(json.dumps(data, sort_keys=True))
+        # Generate a stable cache key from the canonical feature vector
+        try:
+            with trace.span('features'):
+                bundle, X, cache_key = route_transaction(data)
+        except Exception:
+            metrics.record_error()
+            raise
         
         # Check cache
-        cached_result = get_cached_prediction(cache_key)
+        with trace.span('cache'):
+            cached_result = get_cached_prediction(cache_key)
         if cached_result:
             cached_result['cached'] = True
-            return jsonify(cached_result), 200
+            return finish_trace(trace, jsonify(cached_result), '/predict'), 200
         
         # Process transaction
-        result = process_transaction(data)
+        result = process_transaction(data, X, trace, bundle)
         
         # Cache result
-        set_cached_prediction(cache_key, result)
+        with trace.span('cache'):
+            set_cached_prediction(cache_key, result)
         
         # Publish to Kafka if fraud detected
-        if result['is_fraud'] and kafka_producer:
-            publish_event('fraud-detected', {
-                'amount': data.get('amount'),
-                'risk_score': result['probability'],
-                'risk_level': result['risk_level'],
-                'detected_at': datetime.utcnow().isoformat()
-            })
+        if result['is_fraud']:
+            with trace.span('kafka'):
+                publish_event('fraud-detected', {
+                    'amount': data.get('amount'),
+                    'risk_score': result['probability'],
+                    'risk_level': result['risk_level'],
+                    'detected_at': datetime.utcnow().isoformat()
+                })
         
         result['cached'] = False
-        return jsonify(result), 200
+        return finish_trace(trace, jsonify(result), '/predict'), 200
         
     except Exception as e:
         return jsonify({"error": str(e)}), 400
@@ -378,61 +942,92 @@ def predict_batch():
             ...
         ]
     }
+    
+    Bulk callers can instead send Content-Type
+    application/x-fraudguard-f32: a float32 matrix of raw inputs, answered
+    with a float32 vector of probabilities (layout in wire_format.py).
     """
     try:
-        if not model_loaded:
+        if not models.loaded:
             return jsonify({"error": "Model not loaded"}), 503
         
-        data = request.get_json()
+        trace = new_trace()
+        if request.mimetype == wire_format.CONTENT_TYPE:
+            return predict_batch_binary(trace)
+        
+        with trace.span('parse'):
+            data = request.get_json()
         transactions = data.get('transactions', [])
         
         if not transactions:
             return jsonify({"error": "No transactions provided"}), 400
         
-        results = []
-        fraud_count = 0
+        results = [{"index": i, **result}
+                   for i, result in enumerate(score_batch(transactions, use_cache=True, trace=trace))]
+        fraud_count = sum(1 for result in results if result.get('is_fraud'))
         
-        for tx in transactions:
-            try:
-                result = process_transaction(tx)
-                if result['is_fraud']:
-                    fraud_count += 1
-                results.append({
-                    "index": len(results),
-                    **result
-                })
-            except Exception as e:
-                results.append({
-                    "index": len(results),
-                    "error": str(e)
-                })
-        
-        return jsonify({
+        return finish_trace(trace, jsonify({
             "total": len(transactions),
             "processed": len(results),
             "fraud_detected": fraud_count,
             "fraud_rate": fraud_count / len(transactions) if transactions else 0,
             "results": results
-        }), 200
+        }), '/predict/batch'), 200
         
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+def predict_batch_binary(trace):
+    """Binary /predict/batch: the request body is scored in place, without copying"""
+    with trace.span('parse'):
+        raw = wire_format.decode_matrix(request.get_data(cache=False))
+    if not len(raw):
+        return jsonify({"error": "No transactions provided"}), 400
+    
+    probabilities, threshold = score_raw_matrix(raw, trace)
+    response = Response(wire_format.encode_scores(probabilities, threshold),
+                        mimetype=wire_format.CONTENT_TYPE)
+    return finish_trace(trace, response, '/predict/batch'), 200
+
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    """
+    Streaming prediction for arbitrarily large batches.
+    
+    The request body is NDJSON (one transaction object per line) and is
+    read incrementally; every STREAM_CHUNK_ROWS lines are scored with one
+    model call and their results are written back immediately as NDJSON:
+        {"index": 0, "is_fraud": false, "probability": 0.01, "risk_level": "LOW"}
+        {"index": 1, "error": "Invalid JSON: ..."}
+        ...
+        {"summary": {"total": 2, "fraud_detected": 0}}
+    Memory use is bounded by the chunk size, not the request size.
+    """
+    if not models.loaded:
+        return jsonify({"error": "Model not loaded"}), 503
+    
+    chunk_rows = config['STREAM_CHUNK_ROWS']
+    stream = request.stream
+    
+    def generate():
+        total = 0
+        fraud_detected = 0
+        for chunk in ndjson_chunks(stream, chunk_rows):
+            output, fraud_count = score_ndjson_chunk(chunk, total)
+            total += len(chunk)
+            fraud_detected += fraud_count
+            yield output
+        yield json.dumps({"summary": {"total": total, "fraud_detected": fraud_detected}}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/model/info', methods=['GET'])
 def model_info():
     """Get information about the loaded model"""
-    if not model_loaded:
+    if not models.loaded:
         return jsonify({"error": "Model not loaded"}), 503
     
-    return jsonify({
-        "model_type": type(model).__name__,
-        "model_version": config['MODEL_VERSION'],
-        "features_expected": 33,
-        "feature_names": [f"v{i}" for i in range(1, 29)] + 
-                         ["amount", "amount_scaled", "hour", "day", "amount_hour"],
-        "classes": ["legitimate", "fraud"],
-        "loaded_at": datetime.utcnow().isoformat()
-    }), 200
+    return jsonify(describe_model()), 200
 
 @app.route('/analytics/summary', methods=['GET'])
 def analytics_summary():
@@ -454,6 +1049,141 @@ def analytics_summary():
         }
     }), 200
 
+# ============================================================================
+# ADMIN ENDPOINTS
+# ============================================================================
+def admin_token_valid(token):
+    """True when token matches ADMIN_TOKEN (constant-time); always False while ADMIN_TOKEN is unset"""
+    expected = config['ADMIN_TOKEN']
+    return bool(expected) and token is not None and hmac.compare_digest(token.encode(), expected.encode())
+
+def admin_required(f):
+    """
+    Require the X-Admin-Token header to match ADMIN_TOKEN. The admin
+    endpoints are disabled (404) until ADMIN_TOKEN is configured.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not config['ADMIN_TOKEN']:
+            return jsonify({"error": "Not found"}), 404
+        if not admin_token_valid(request.headers.get('X-Admin-Token')):
+            return jsonify({"error": "Unauthorized"}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+@app.route('/admin/profile', methods=['POST'])
+@admin_required
+def admin_profile():
+    """
+    Sample all threads for ?seconds=N (default 10, max 60) every
+    ?interval_ms=M (default 5) and return the collapsed stacks, ready for
+    flamegraph.pl or speedscope.
+    """
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval_ms = float(request.args.get('interval_ms', 5))
+    except ValueError:
+        return jsonify({"error": "seconds and interval_ms must be numbers"}), 400
+    
+    try:
+        stacks, samples = profiler.profile(seconds, interval_ms)
+    except ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    
+    response = Response(stacks, mimetype='text/plain; charset=utf-8')
+    response.headers['X-Profile-Samples'] = str(samples)
+    return response, 200
+
+def reload_model(version=None):
+    """
+    Swap in a model version (default: the one named by the registry's
+    CURRENT file). Naming a version also activates it in the registry, so
+    the watchers of the other workers follow within MODEL_WATCH_SECONDS.
+    Returns (payload, status) for the admin endpoints of both front ends.
+    """
+    try:
+        if version:
+            model_registry.activate(version)
+    except KeyError as e:
+        return {"error": e.args[0]}, 404
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    
+    try:
+        previous, bundle = models.reload(version)
+    except Exception as e:
+        return {"error": f"Model reload failed, still serving "
+                         f"{models.current.version if models.loaded else 'no model'}: {e}"}, 500
+    return {
+        "previous_version": previous.version if previous else None,
+        "model_version": bundle.version,
+        "loaded_at": bundle.loaded_at.isoformat(),
+        "warmup_ms": round(bundle.warmup_ms, 2)
+    }, 200
+
+def model_versions():
+    """Registry listing shared by the Flask and ASGI front ends"""
+    return {
+        "registry": model_registry.root,
+        "active_version": model_registry.active_version(),
+        "serving_version": models.current.version if models.loaded else None,
+        "challenger": models.experiment.describe() if models.experiment else None,
+        "shadow": shadow_scorer.stats() if shadow_scorer else None,
+        "versions": model_registry.list_versions()
+    }
+
+@app.route('/admin/model/reload', methods=['POST'])
+@admin_required
+def admin_model_reload():
+    """
+    Load, warm up and swap in a model without a restart. Optional JSON
+    body {"version": "2.1.0"}; without it the registry's active version is
+    reloaded. Requests in flight finish on the previous model.
+    """
+    data = request.get_json(silent=True) or {}
+    payload, status = reload_model(data.get('version'))
+    return jsonify(payload), status
+
+def set_challenger(data):
+    """
+    Set ({"version", "traffic_percent", "shadow_percent"}) or remove
+    ({"version": null}) the challenger in the registry and apply it here;
+    the other workers follow within MODEL_WATCH_SECONDS.
+    Returns (payload, status) for the admin endpoints of both front ends.
+    """
+    try:
+        model_registry.set_challenger(data.get('version'),
+                                      float(data.get('traffic_percent', 0)),
+                                      float(data.get('shadow_percent', 0)))
+    except KeyError as e:
+        return {"error": e.args[0]}, 404
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}, 400
+    
+    try:
+        experiment = models.reload_challenger()
+    except Exception as e:
+        return {"error": f"Challenger loading failed: {e}"}, 500
+    return {"challenger": experiment.describe() if experiment else None}, 200
+
+@app.route('/admin/model/challenger', methods=['POST'])
+@admin_required
+def admin_model_challenger():
+    """
+    Route traffic_percent of /predict to a challenger version and shadow
+    score shadow_percent of the rest with it, e.g.
+    {"version": "2.2.0", "traffic_percent": 10, "shadow_percent": 50};
+    {"version": null} removes the challenger.
+    """
+    payload, status = set_challenger(request.get_json(silent=True) or {})
+    return jsonify(payload), status
+
+@app.route('/admin/model/versions', methods=['GET'])
+@admin_required
+def admin_model_versions():
+    """Published model versions and the one being served"""
+    return jsonify(model_versions()), 200
+
 # ============================================================================
 # STARTUP
 # ============================================================================
@@ -461,14 +1191,14 @@ if __name__ == '__main__':
     print("=" * 60)
     print("  FraudGuard ML Service - Enterprise Edition")
     print("=" * 60)
-    print(f"  Model Version: {config['MODEL_VERSION']}")
+    print(f"  Model Version: {models.current.version if models.loaded else 'not loaded'}")
     print(f"  Kafka Enabled: {config['KAFKA_ENABLED']}")
     print(f"  Redis Enabled: {config['REDIS_ENABLED']}")
+    print(f"  Request Coalescing: {config['COALESCER_ENABLED']}")
     print("=" * 60)
     
     # Initialize integrations
-    init_kafka()
-    init_redis()
+    init_services()
     
     print("\n🚀 Starting Flask server on http://0.0.0.0:5000")
     app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
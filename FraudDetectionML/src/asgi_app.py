@@ -0,0 +1,529 @@
+"""
+FraudGuard ML Service - ASGI Front End
+======================================
+Asyncio-native alternative to the Flask endpoints of app_enhanced, with the
+same /predict, /predict/batch, /predict/stream, /health, /metrics,
+/model/info and /admin/model/* contract:
+- One event loop serves every connection; an in-flight request that waits
+  on Redis or Kafka costs a coroutine, not an OS thread
+- Redis (redis.asyncio) lookups are bounded by REDIS_TIMEOUT_MS and cache
+  writes run as background tasks
+- Kafka events and alerts go through aiokafka, whose sends only append to
+  the producer's batch; the transactions consumer runs as a loop task
+- Model scoring runs on a bounded thread pool (ASGI_SCORING_THREADS) and
+  at most ASGI_MAX_PENDING_SCORES calls may wait for it
+
+Model, feature builder, local cache tier and metrics are shared with
+app_enhanced, so both front ends score identically.
+
+Usage:
+    python src/asgi_app.py
+    uvicorn asgi_app:app --app-dir src --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+import app_enhanced as core
+from app_enhanced import config, metrics, registry
+from scoring import get_risk_level
+import wire_format
+
+config.update({
+    'ASGI_SCORING_THREADS': int(os.getenv('ASGI_SCORING_THREADS', min(4, os.cpu_count() or 1))),
+    'ASGI_MAX_PENDING_SCORES': int(os.getenv('ASGI_MAX_PENDING_SCORES', 256)),
+    'PORT': int(os.getenv('PORT', 5000))
+})
+
+scoring_executor = ThreadPoolExecutor(max_workers=config['ASGI_SCORING_THREADS'],
+                                      thread_name_prefix='asgi-scoring')
+scoring_slots = None
+redis_client = None
+redis_retry_at = 0.0
+kafka_producer = None
+background_tasks = set()
+
+# ============================================================================
+# SCORING
+# ============================================================================
+async def run_scoring(fn, *args):
+    """Run CPU-bound work on the bounded scoring pool"""
+    async with scoring_slots:
+        return await asyncio.get_running_loop().run_in_executor(scoring_executor, fn, *args)
+
+def spawn(coro):
+    """Fire-and-forget task that is kept referenced until it finishes"""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+# ============================================================================
+# CACHING (shared in-process LRU tier + async Redis tier)
+# ============================================================================
+def redis_available():
+    return redis_client is not None and time.monotonic() >= redis_retry_at
+
+def redis_failed():
+    global redis_retry_at
+    metrics.redis_cache_errors.inc()
+    redis_retry_at = time.monotonic() + config['REDIS_RETRY_SECONDS']
+
+async def get_cached_predictions(cache_keys):
+    """Local tier first, then one MGET bounded by REDIS_TIMEOUT_MS"""
+    results = [core.local_cache.get(key) for key in cache_keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if missing and redis_available():
+        try:
+            values = await asyncio.wait_for(
+                redis_client.mget([f"pred:{cache_keys[i]}" for i in missing]),
+                config['REDIS_TIMEOUT_MS'] / 1000.0)
+            for i, value in zip(missing, values):
+                if value:
+                    results[i] = json.loads(value)
+                    core.local_cache.set(cache_keys[i], results[i])
+                    metrics.redis_cache_hits.inc()
+                else:
+                    metrics.redis_cache_misses.inc()
+        except Exception:
+            redis_failed()
+
+    hits = sum(1 for result in results if result is not None)
+    metrics.cache_hits.inc(hits)
+    metrics.cache_misses.inc(len(results) - hits)
+    return [dict(result) if result is not None else None for result in results]
+
+def set_cached_predictions(results):
+    """Fill the local tier now and write Redis in a background task"""
+    for cache_key, result in results.items():
+        core.local_cache.set(cache_key, dict(result))
+    if redis_client is not None and results:
+        spawn(write_redis({key: json.dumps(result) for key, result in results.items()}))
+
+async def write_redis(entries):
+    if not redis_available():
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for cache_key, value in entries.items():
+            pipe.setex(f"pred:{cache_key}", config['CACHE_TTL_SECONDS'], value)
+        await pipe.execute()
+    except Exception:
+        redis_failed()
+
+# ============================================================================
+# KAFKA
+# ============================================================================
+async def publish_event(topic, event):
+    """Append an event to the producer's batch; never waits for the broker"""
+    if kafka_producer is None:
+        return
+    try:
+        await kafka_producer.send(topic, event)
+    except Exception as e:
+        print(f"Failed to publish event: {e}")
+
+async def kafka_consumer_loop():
+    """
+    Batched transactions consumer: score, send alerts, then commit offsets.
+    A failed batch is rewound and polled again after KAFKA_RETRY_BACKOFF_MS.
+    """
+    from aiokafka import AIOKafkaConsumer
+
+    consumer = AIOKafkaConsumer(
+        'transactions',
+        bootstrap_servers=config['KAFKA_BOOTSTRAP_SERVERS'],
+        group_id='fraudguard-ml-consumers',
+        auto_offset_reset='latest',
+        enable_auto_commit=False
+    )
+    await consumer.start()
+    print("✅ Kafka consumer started - listening for transactions")
+    try:
+        while True:
+            polled = await consumer.getmany(timeout_ms=config['KAFKA_POLL_TIMEOUT_MS'],
+                                            max_records=config['KAFKA_MAX_POLL_RECORDS'])
+            messages = [message for records in polled.values() for message in records]
+            if not messages:
+                continue
+            try:
+                transactions, results = await run_scoring(core.score_messages, messages)
+                alerts = core.fraud_alerts(transactions, results)
+                # Alerts must reach the broker before the batch offsets are committed
+                if alerts and kafka_producer is not None:
+                    for alert in alerts:
+                        await kafka_producer.send('fraud-alerts', alert)
+                    await kafka_producer.flush()
+                await consumer.commit()
+                metrics.kafka_messages.inc(len(messages))
+            except Exception as e:
+                print(f"Error processing Kafka batch: {e}")
+                metrics.record_error()
+                # Poll the failed batch again rather than committing past it
+                core.rewind_batch(consumer, polled)
+                await asyncio.sleep(config['KAFKA_RETRY_BACKOFF_MS'] / 1000.0)
+    finally:
+        await consumer.stop()
+
+# ============================================================================
+# LIFECYCLE
+# ============================================================================
+@asynccontextmanager
+async def lifespan(app):
+    global scoring_slots, redis_client, kafka_producer
+    scoring_slots = asyncio.Semaphore(config['ASGI_MAX_PENDING_SCORES'])
+    core.init_metrics()
+    core.init_shadow_scorer()
+    core.models.start_watcher(config['MODEL_WATCH_SECONDS'])
+
+    if config['REDIS_ENABLED']:
+        try:
+            import redis.asyncio as aioredis
+            timeout = config['REDIS_TIMEOUT_MS'] / 1000.0
+            client = aioredis.Redis(host=config['REDIS_HOST'], port=config['REDIS_PORT'],
+                                    max_connections=config['REDIS_POOL_SIZE'],
+                                    socket_timeout=timeout, socket_connect_timeout=timeout,
+                                    decode_responses=True)
+            await client.ping()
+            redis_client = client
+            print(f"✅ Redis connected to {config['REDIS_HOST']}:{config['REDIS_PORT']} (asyncio)")
+        except Exception as e:
+            print(f"⚠️ Redis initialization failed: {e}")
+
+    if config['KAFKA_ENABLED']:
+        try:
+            from aiokafka import AIOKafkaProducer
+            acks = config['KAFKA_ACKS']
+            kafka_producer = AIOKafkaProducer(
+                bootstrap_servers=config['KAFKA_BOOTSTRAP_SERVERS'],
+                value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+                acks=acks if acks == 'all' else int(acks),
+                linger_ms=config['KAFKA_LINGER_MS'],
+                max_batch_size=config['KAFKA_BATCH_SIZE']
+            )
+            await kafka_producer.start()
+            print(f"✅ Kafka producer connected to {config['KAFKA_BOOTSTRAP_SERVERS']} (asyncio)")
+            spawn(kafka_consumer_loop())
+        except Exception as e:
+            kafka_producer = None
+            print(f"⚠️ Kafka initialization failed: {e}")
+
+    yield
+
+    for task in list(background_tasks):
+        task.cancel()
+    if kafka_producer is not None:
+        await kafka_producer.stop()
+    if redis_client is not None:
+        await redis_client.aclose()
+    scoring_executor.shutdown(wait=False)
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+def error(message, status):
+    return JSONResponse({"error": message}, status_code=status)
+
+def finish_trace(trace, response, endpoint):
+    if config['SERVER_TIMING_ENABLED']:
+        response.headers['Server-Timing'] = trace.server_timing()
+    if config['SLOW_REQUEST_MS'] and trace.elapsed_ms >= config['SLOW_REQUEST_MS']:
+        print(f"🐢 Slow {endpoint}: {trace.elapsed_ms:.2f} ms ({trace.summary()})")
+    return response
+
+async def health(request):
+    return JSONResponse(core.health_status())
+
+async def get_metrics(request):
+    text = await asyncio.get_running_loop().run_in_executor(None, registry.render_prometheus)
+    return PlainTextResponse(text, media_type='text/plain; version=0.0.4; charset=utf-8')
+
+async def get_metrics_json(request):
+    return JSONResponse(await asyncio.get_running_loop().run_in_executor(None, metrics.get_metrics))
+
+async def model_info(request):
+    if not core.models.loaded:
+        return error("Model not loaded", 503)
+    return JSONResponse(core.describe_model())
+
+def score_row(bundle, X):
+    """Score one feature row; returns the result dict"""
+    started_at = time.perf_counter()
+    probabilities, predictions = bundle.score(X)
+    core.shadow_sample(bundle, X, probabilities, predictions)
+    probability = float(probabilities[0])
+    result = {
+        "is_fraud": bool(predictions[0]),
+        "probability": probability,
+        "risk_level": get_risk_level(probability)
+    }
+    metrics.record_prediction(result['is_fraud'], time.perf_counter() - started_at)
+    return result
+
+async def predict(request):
+    """Predict if a transaction is fraudulent (same contract as the Flask app)"""
+    if not core.models.loaded:
+        return error("Model not loaded", 503)
+    try:
+        trace = core.new_trace()
+        with trace.span('parse'):
+            data = json.loads(await request.body())
+
+        try:
+            with trace.span('features'):
+                # build_row returns a per-thread buffer; other coroutines on this
+                # thread reuse it while this one awaits, so keep a copy
+                bundle, X, cache_key = core.route_transaction(data)
+                X = X.copy()
+        except Exception:
+            metrics.record_error()
+            raise
+
+        with trace.span('cache'):
+            cached_result = (await get_cached_predictions([cache_key]))[0]
+        if cached_result:
+            cached_result['cached'] = True
+            return finish_trace(trace, JSONResponse(cached_result), '/predict')
+
+        try:
+            with trace.span('model'):
+                result = await run_scoring(score_row, bundle, X)
+        except Exception:
+            metrics.record_error()
+            raise
+
+        with trace.span('cache'):
+            set_cached_predictions({cache_key: result})
+
+        if result['is_fraud']:
+            with trace.span('kafka'):
+                await publish_event('fraud-detected', {
+                    'amount': data.get('amount'),
+                    'risk_score': result['probability'],
+                    'risk_level': result['risk_level'],
+                    'detected_at': datetime.utcnow().isoformat()
+                })
+
+        result['cached'] = False
+        return finish_trace(trace, JSONResponse(result), '/predict')
+
+    except Exception as e:
+        return error(str(e), 400)
+
+def score_rows(bundle, X, row_index, results):
+    """Score the uncached rows of a batch into results (in place)"""
+    started_at = time.perf_counter()
+    probabilities, predictions = bundle.score(X)
+    core.shadow_sample(bundle, X, probabilities, predictions)
+    for i, probability, prediction in zip(row_index, probabilities.tolist(), predictions.tolist()):
+        results[i] = {
+            "is_fraud": prediction,
+            "probability": probability,
+            "risk_level": get_risk_level(probability)
+        }
+    metrics.record_batch(len(row_index), int(predictions.sum()), time.perf_counter() - started_at)
+
+async def predict_batch(request):
+    """Batch prediction (same contract as the Flask app)"""
+    if not core.models.loaded:
+        return error("Model not loaded", 503)
+    try:
+        trace = core.new_trace()
+        bundle = core.models.current
+        if request.headers.get('content-type', '').split(';')[0] == wire_format.CONTENT_TYPE:
+            return await predict_batch_binary(request, trace)
+
+        with trace.span('parse'):
+            data = json.loads(await request.body())
+        transactions = data.get('transactions', [])
+        if not transactions:
+            return error("No transactions provided", 400)
+
+        with trace.span('features'):
+            X, row_index, errors = await run_scoring(bundle.feature_builder.build_matrix, transactions)
+        results = [None] * len(transactions)
+
+        if len(row_index):
+            with trace.span('cache'):
+                cache_keys = [bundle.cache_key(row) for row in X]
+                cached = await get_cached_predictions(cache_keys)
+            for i, result in zip(row_index, cached):
+                if result is not None:
+                    result['cached'] = True
+                    results[i] = result
+            to_score = [j for j, result in enumerate(cached) if result is None]
+            if len(to_score) < len(row_index):
+                X = X[to_score]
+                row_index = [row_index[j] for j in to_score]
+                cache_keys = [cache_keys[j] for j in to_score]
+
+        if len(row_index):
+            with trace.span('model'):
+                await run_scoring(score_rows, bundle, X, row_index, results)
+            with trace.span('cache'):
+                set_cached_predictions({key: results[i] for key, i in zip(cache_keys, row_index)})
+            for i in row_index:
+                results[i]['cached'] = False
+
+        for i, message in errors.items():
+            results[i] = {"error": message}
+            metrics.record_error()
+
+        results = [{"index": i, **result} for i, result in enumerate(results)]
+        fraud_count = sum(1 for result in results if result.get('is_fraud'))
+        return finish_trace(trace, JSONResponse({
+            "total": len(transactions),
+            "processed": len(results),
+            "fraud_detected": fraud_count,
+            "fraud_rate": fraud_count / len(transactions),
+            "results": results
+        }), '/predict/batch')
+
+    except Exception as e:
+        return error(str(e), 400)
+
+async def predict_batch_binary(request, trace):
+    """Binary /predict/batch (layout in wire_format.py)"""
+    with trace.span('parse'):
+        raw = wire_format.decode_matrix(await request.body())
+    if not len(raw):
+        return error("No transactions provided", 400)
+
+    probabilities, threshold = await run_scoring(core.score_raw_matrix, raw, trace)
+    response = Response(wire_format.encode_scores(probabilities, threshold),
+                        media_type=wire_format.CONTENT_TYPE)
+    return finish_trace(trace, response, '/predict/batch')
+
+async def ndjson_chunks(receive, chunk_rows):
+    """Group the non-blank lines of the request body into lists of chunk_rows"""
+    pending = b''
+    chunk = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+        more_body = message.get('more_body', False)
+        *lines, pending = (pending + message.get('body', b'')).split(b'\n')
+        for line in lines:
+            if line.strip():
+                chunk.append(line)
+                if len(chunk) == chunk_rows:
+                    yield chunk
+                    chunk = []
+    if pending.strip():
+        chunk.append(pending)
+    if chunk:
+        yield chunk
+
+class PredictStream:
+    """
+    Streaming NDJSON prediction (same contract as the Flask app).
+
+    A raw ASGI endpoint: the request body is read and the response written
+    chunk by chunk on the same connection, which Starlette's
+    StreamingResponse does not allow (it consumes receive() itself).
+    """
+
+    async def __call__(self, scope, receive, send):
+        if not core.models.loaded:
+            await error("Model not loaded", 503)(scope, receive, send)
+            return
+
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'application/x-ndjson')]})
+        total = 0
+        fraud_detected = 0
+        async for chunk in ndjson_chunks(receive, config['STREAM_CHUNK_ROWS']):
+            output, fraud_count = await run_scoring(core.score_ndjson_chunk, chunk, total)
+            total += len(chunk)
+            fraud_detected += fraud_count
+            await send({'type': 'http.response.body', 'body': output, 'more_body': True})
+        summary = json.dumps({"summary": {"total": total, "fraud_detected": fraud_detected}}) + '\n'
+        await send({'type': 'http.response.body', 'body': summary.encode()})
+
+def admin_denied(request):
+    """
+    Error response for a request not allowed on the admin endpoints, None
+    when allowed: they are disabled (404) until ADMIN_TOKEN is configured,
+    then require a matching X-Admin-Token header (constant-time compare)
+    """
+    if not config['ADMIN_TOKEN']:
+        return error("Not found", 404)
+    if not core.admin_token_valid(request.headers.get('x-admin-token')):
+        return error("Unauthorized", 401)
+    return None
+
+async def admin_body(request):
+    """JSON object body of an admin request ({} when empty), or None if invalid"""
+    try:
+        data = json.loads(await request.body() or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+async def admin_model_reload(request):
+    """Hot model reload (same contract as the Flask app); loading runs off the loop"""
+    denied = admin_denied(request)
+    if denied is not None:
+        return denied
+    data = await admin_body(request)
+    if data is None:
+        return error("Body must be a JSON object", 400)
+    payload, status = await asyncio.get_running_loop().run_in_executor(None, core.reload_model,
+                                                                       data.get('version'))
+    return JSONResponse(payload, status_code=status)
+
+async def admin_model_challenger(request):
+    """Set or remove the challenger (same contract as the Flask app)"""
+    denied = admin_denied(request)
+    if denied is not None:
+        return denied
+    data = await admin_body(request)
+    if data is None:
+        return error("Body must be a JSON object", 400)
+    payload, status = await asyncio.get_running_loop().run_in_executor(None, core.set_challenger, data)
+    return JSONResponse(payload, status_code=status)
+
+async def admin_model_versions(request):
+    denied = admin_denied(request)
+    if denied is not None:
+        return denied
+    return JSONResponse(core.model_versions())
+
+app = Starlette(routes=[
+    Route('/health', health, methods=['GET']),
+    Route('/metrics', get_metrics, methods=['GET']),
+    Route('/metrics/json', get_metrics_json, methods=['GET']),
+    Route('/model/info', model_info, methods=['GET']),
+    Route('/predict', predict, methods=['POST']),
+    Route('/predict/batch', predict_batch, methods=['POST']),
+    Route('/predict/stream', PredictStream(), methods=['POST']),
+    Route('/admin/model/reload', admin_model_reload, methods=['POST']),
+    Route('/admin/model/challenger', admin_model_challenger, methods=['POST']),
+    Route('/admin/model/versions', admin_model_versions, methods=['GET']),
+], lifespan=lifespan)
+
+# ============================================================================
+# STARTUP
+# ============================================================================
+if __name__ == '__main__':
+    import uvicorn
+
+    print("=" * 60)
+    print("  FraudGuard ML Service - ASGI Edition")
+    print("=" * 60)
+    print(f"  Scoring threads: {config['ASGI_SCORING_THREADS']}")
+    print(f"  Max pending scores: {config['ASGI_MAX_PENDING_SCORES']}")
+    print("=" * 60)
+
+    uvicorn.run(app, host='0.0.0.0', port=config['PORT'], log_level='warning')
@@ -0,0 +1,130 @@
+"""
+FraudGuard Request Coalescer
+============================
+Micro-batching for concurrent single-row predictions.
+
+Request threads hand their feature row to the coalescer and block. A single
+scoring thread drains the queue into a batch of up to max_batch_size rows,
+waiting at most max_wait_ms after the first row arrived, scores the whole
+batch with one vectorized model call and hands each caller its own result.
+
+Each row is submitted with the model that is to score it, the one its
+caller built the features with: a batch holding rows for several models
+(e.g. across a hot reload) makes one call per model, so a row is never
+scored by a model its caller did not choose.
+"""
+
+import queue
+import threading
+import time
+import numpy as np
+
+
+class _PendingPrediction:
+    __slots__ = ('row', 'model', 'enqueued_at', 'done', 'probability', 'is_fraud', 'error')
+
+    def __init__(self, row, model):
+        self.row = row
+        self.model = model
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.probability = None
+        self.is_fraud = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """
+    Collects single-row predictions into vectorized batches.
+
+    score_fn takes the model rows were submitted with and an
+    (n, n_features) float32 matrix of those rows, and returns
+    (probabilities, is_fraud) arrays. on_batch, if given, is called after
+    each batch with the batch size and the queue wait (seconds) of each row.
+    buffer, if given, is a preallocated (max_batch_size, n_features) float32
+    array (e.g. a view on shared memory) that batches are assembled in.
+    """
+
+    def __init__(self, score_fn, n_features, max_batch_size=64, max_wait_ms=2.0,
+                 on_batch=None, buffer=None):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.on_batch = on_batch
+        self._queue = queue.Queue()
+        if buffer is None:
+            buffer = np.zeros((max_batch_size, n_features), dtype=np.float32)
+        elif buffer.shape != (max_batch_size, n_features) or buffer.dtype != np.float32:
+            raise ValueError(f"Expected a ({max_batch_size}, {n_features}) float32 buffer, "
+                             f"got {buffer.shape} {buffer.dtype}")
+        self._buffer = buffer
+        self._thread = None
+
+    def start(self):
+        """Start the scoring thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='request-coalescer', daemon=True)
+            self._thread.start()
+
+    def submit(self, row, model):
+        """
+        Score one feature row with model; blocks until its batch has been scored.
+
+        The row is only read by the scoring thread while the caller is
+        blocked here, so a reusable buffer may be passed in.
+        Returns (probability, is_fraud).
+        """
+        pending = _PendingPrediction(row, model)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.probability, pending.is_fraud
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started_at = time.perf_counter()
+            n = len(batch)
+            groups = {}
+            for pending in batch:
+                groups.setdefault(id(pending.model), []).append(pending)
+            start = 0
+            for group in groups.values():
+                self._score_group(group, self._buffer[start:start + len(group)])
+                start += len(group)
+
+            if self.on_batch is not None:
+                self.on_batch(n, [started_at - pending.enqueued_at for pending in batch])
+
+    def _score_group(self, group, X):
+        """Score rows submitted with the same model in one call"""
+        try:
+            for i, pending in enumerate(group):
+                X[i] = pending.row
+            probabilities, predictions = self.score_fn(group[0].model, X)
+            for pending, probability, prediction in zip(group, probabilities.tolist(),
+                                                        predictions.tolist()):
+                pending.probability = probability
+                pending.is_fraud = prediction
+        except Exception as e:
+            for pending in group:
+                pending.error = e
+        finally:
+            for pending in group:
+                pending.done.set()
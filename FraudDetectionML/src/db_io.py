@@ -0,0 +1,161 @@
+"""
+FraudGuard Database I/O
+=======================
+Bulk SQL extraction and loading for the ETL
+(FraudDetectionETL.extract_from_database / load_to_database):
+
+- One pooled SQLAlchemy engine per connection string, shared by every
+  pipeline stage and ETL instance of the process (get_engine)
+- ODBC connection strings (the pyodbc form of the SQL Server database)
+  are accepted as well as SQLAlchemy URLs, and run with pyodbc's
+  fast_executemany: a batch of parameters goes to the server in one round
+  trip instead of one INSERT per row (execute_batch on psycopg2)
+- Loads convert each batch of batch_rows rows column by column to plain
+  Python values and send it with a single executemany on the driver,
+  without SQLAlchemy's per-row parameter processing; the whole load is one
+  transaction
+- Extraction fetches fetch_size rows at a time straight from the DBAPI
+  cursor (server-side where the driver needs one to stream) into frames
+  with the compact ETL dtypes, so client memory follows the fetch size
+  instead of the result size
+"""
+
+import threading
+import urllib.parse
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_FETCH_SIZE = 50000
+DEFAULT_BATCH_ROWS = 10000
+DEFAULT_POOL_SIZE = 5
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+# =============================================================================
+# ENGINES
+# =============================================================================
+def engine_url(connection_string: str) -> str:
+    """SQLAlchemy URL of a connection string: URLs as they are, ODBC strings through mssql+pyodbc"""
+    if '://' in connection_string:
+        return connection_string
+    return 'mssql+pyodbc:///?odbc_connect=' + urllib.parse.quote_plus(connection_string)
+
+
+def get_engine(connection_string: str, pool_size: int = DEFAULT_POOL_SIZE):
+    """The process-wide pooled engine for connection_string, created on first use"""
+    url = engine_url(connection_string)
+    with _engines_lock:
+        engine = _engines.get(url)
+        if engine is None:
+            from sqlalchemy import create_engine
+            from sqlalchemy.engine import make_url
+
+            parsed = make_url(url)
+            options = {'pool_pre_ping': True}
+            if parsed.get_backend_name() != 'sqlite':
+                options.update(pool_size=pool_size, max_overflow=pool_size * 2)
+            if parsed.get_driver_name() == 'pyodbc':
+                options['fast_executemany'] = True
+            elif parsed.get_driver_name() == 'psycopg2':
+                options['executemany_mode'] = 'values_plus_batch'
+            engine = _engines[url] = create_engine(url, **options)
+        return engine
+
+
+def dispose_engines() -> None:
+    """Close the pooled connections of every engine (end of process / tests)"""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+# =============================================================================
+# EXTRACT
+# =============================================================================
+def read_sql_chunks(engine, query: str, fetch_size: int = DEFAULT_FETCH_SIZE,
+                    params=None, dtype: Optional[Dict] = None) -> Iterator[pd.DataFrame]:
+    """
+    Frames of at most fetch_size rows of query's result (driver SQL,
+    driver paramstyle for params), fetched straight from the DBAPI cursor
+    of a pooled connection (a named, server-side cursor on psycopg2).
+    Columns listed in dtype are cast. The connection returns to the pool
+    once the iterator is exhausted or closed.
+    """
+    with engine.connect() as conn:
+        dbapi_connection = conn.connection.dbapi_connection
+        if engine.dialect.driver == 'psycopg2':
+            cursor = dbapi_connection.cursor(name='fraudguard_extract')
+        else:
+            cursor = dbapi_connection.cursor()
+        try:
+            cursor.arraysize = fetch_size
+            if params is None:
+                cursor.execute(query)
+            else:
+                cursor.execute(query, params)
+            rows = cursor.fetchmany(fetch_size)
+            columns = [description[0] for description in cursor.description]
+            while True:
+                if rows and not isinstance(rows[0], tuple):
+                    rows = [tuple(row) for row in rows]
+                chunk = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                if dtype:
+                    chunk = chunk.astype({col: col_dtype for col, col_dtype in dtype.items() if col in chunk.columns})
+                yield chunk
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+        finally:
+            cursor.close()
+
+
+# =============================================================================
+# LOAD
+# =============================================================================
+def _python_values(series: pd.Series) -> list:
+    """Column values as Python objects for the driver, None for missing values"""
+    values = series.to_numpy()
+    if values.dtype.kind in 'biu':
+        return values.tolist()
+    if values.dtype.kind == 'f':
+        nulls = np.isnan(values)
+        if not nulls.any():
+            return values.tolist()
+        values = values.astype(object)
+        values[nulls] = None
+        return values.tolist()
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        series = pd.Series(series.dt.to_pydatetime(), index=series.index, dtype=object).where(series.notna())
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def insert_frame(engine, df: pd.DataFrame, table_name: str, if_exists: str = 'append',
+                 batch_rows: int = DEFAULT_BATCH_ROWS) -> int:
+    """
+    Insert df into table_name in batches of batch_rows rows, in one
+    transaction. The table is created from df's dtypes when missing
+    (if_exists as in DataFrame.to_sql). Returns the number of rows.
+    """
+    from sqlalchemy import bindparam, column, table
+
+    columns = list(df.columns)
+    names = [f'p{i}' for i in range(len(columns))]
+    insert = table(table_name, *(column(col) for col in columns)).insert().values(
+        {col: bindparam(name) for col, name in zip(columns, names)})
+    sql = insert.compile(dialect=engine.dialect).string
+    positional = engine.dialect.positional
+
+    with engine.begin() as conn:
+        df.head(0).to_sql(table_name, conn, if_exists=if_exists, index=False)
+        for start in range(0, len(df), batch_rows):
+            batch = df.iloc[start:start + batch_rows]
+            rows = zip(*(_python_values(batch[col]) for col in columns))
+            if not positional:
+                rows = (dict(zip(names, row)) for row in rows)
+            conn.exec_driver_sql(sql, list(rows))
+    return len(df)
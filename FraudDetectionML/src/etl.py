@@ -4,6 +4,7 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from imblearn.over_sampling import SMOTE
 import joblib
+from etl_pipeline import CSV_DTYPES
 
 class FraudETL:
     def __init__(self, data_path):
@@ -11,8 +12,8 @@ class FraudETL:
         self.scaler = StandardScaler()
         
     def load_data(self):
-        """Charger le dataset"""
-        df = pd.read_csv(self.data_path)
+        """Charger le dataset (V1-V28 en float32, Class en int8)"""
+        df = pd.read_csv(self.data_path, dtype=CSV_DTYPES)
         return df
     
     def clean_data(self, df):
@@ -0,0 +1,240 @@
+"""
+FraudGuard Parallel ETL
+=======================
+Partitioned execution of FraudDetectionETL.run_pipeline on a process pool
+(run_pipeline(..., workers=N)):
+
+- The source CSV is split into byte ranges at line boundaries; each worker
+  parses only its own range, so parsing runs on every core
+- Pass 1: workers validate their partition and hash its rows; the parent
+  folds the results in partition order (cross-partition duplicates,
+  validation counts, DatasetProfile, rolling-window history)
+- Pass 2: workers engineer the valid rows with the exact dataset-wide
+  profile and write them to the Parquet dataset (one file set per
+  partition), or to CSV part files the parent concatenates in order
+
+Every row goes through the same code with the same profile and history as
+a single-core run, so the row-level output is bit for bit identical to
+it. The Power BI summaries merge per-partition sums in partition order:
+identical for any worker count, within float rounding of the in-memory
+sums. Partitions are processed at most a few per worker ahead of the parent,
+which keeps memory proportional to partition_bytes * workers.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from etl_pipeline import (CSV_DTYPES, ROLLING_WINDOW, TRANSFORMED_CSV, DatasetProfile, FraudDetectionETL,
+                          SeenRows, logger)
+
+DEFAULT_PARTITION_BYTES = 32 * 1024 * 1024
+PARTITIONS_AHEAD = 2  # per worker
+
+
+# =============================================================================
+# PARTITIONING
+# =============================================================================
+def csv_partitions(file_path, partition_bytes=DEFAULT_PARTITION_BYTES):
+    """Header line and (start, end) byte ranges of whole lines, about partition_bytes each"""
+    size = os.path.getsize(file_path)
+    partitions = []
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + partition_bytes, size))
+            f.readline()
+            end = f.tell()
+            partitions.append((start, end))
+            start = end
+    return header, partitions
+
+
+def read_partition(file_path, header, start, end):
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return pd.read_csv(io.BytesIO(header + data), dtype=CSV_DTYPES)
+
+
+def _ordered(executor, fn, tasks, ahead):
+    """executor.map with at most `ahead` tasks in flight"""
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(fn, task))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# =============================================================================
+# WORKERS
+# =============================================================================
+_validation_rules = None
+
+
+def _init_validate_worker(validation_rules):
+    global _validation_rules
+    _validation_rules = validation_rules
+
+
+def _validate_partition(task):
+    file_path, header, start, end = task
+    df = read_partition(file_path, header, start, end)
+    etl = FraudDetectionETL({'validation_rules': _validation_rules})
+    df, result = etl.apply_validation_rules(df)
+    columns = {col.lower(): col for col in df.columns}
+    return {
+        'rows': len(df),
+        'columns': list(df.columns),
+        'counts': etl.validation_counts,
+        'valid': result.valid,
+        'hashes': result.hashes,
+        'amount': df[columns['amount']].to_numpy(dtype=np.float64) if 'amount' in columns else None,
+        'time': df[columns['time']].to_numpy(dtype=np.float64) if 'time' in columns else None
+    }
+
+
+_profile = None
+
+
+def _init_transform_worker(profile):
+    global _profile
+    _profile = profile
+
+
+def _transform_partition(task):
+    (file_path, header, start, end, valid_mask, history,
+     output_format, transformed_path, file_prefix, rejected_path) = task
+    df = read_partition(file_path, header, start, end)
+    valid = np.unpackbits(valid_mask, count=len(df)).astype(bool)
+    if rejected_path and not valid.all():
+        df[~valid].to_csv(rejected_path, header=False, index=False)
+
+    etl = FraudDetectionETL({'output_format': output_format})
+    transformed_df = etl.engineer_features(df[valid], _profile, history, copy=False)
+    if output_format == 'parquet':
+        etl.load_to_parquet(transformed_df, transformed_path, file_prefix)
+    else:
+        transformed_df.to_csv(transformed_path, header=False, index=False)
+    partial, totals, has_class = etl.export_partials(transformed_df)
+    return len(transformed_df), list(transformed_df.columns), partial, totals, has_class
+
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+def run_parallel(etl, source_path, output_dir, workers):
+    """Both passes of run_pipeline(..., workers=N), filling etl's counters"""
+    partition_bytes = etl.config.get('partition_bytes', DEFAULT_PARTITION_BYTES)
+    header, partitions = csv_partitions(source_path, partition_bytes)
+    tasks = [(source_path, header, start, end) for start, end in partitions]
+    logger.info(f"📥 Processing {source_path} in {len(partitions)} partitions on {workers} workers")
+    etl.reset_counts()
+
+    # Pass 1: validate + profile, folded in partition order
+    seen_rows = SeenRows()
+    profile = DatasetProfile()
+    valid_masks, histories, rejected = [], [], []
+    rejected_header = b''
+    history = np.empty(0)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_validate_worker,
+                             initargs=(etl.validator.rules,)) as executor:
+        for result in _ordered(executor, _validate_partition, tasks, workers * PARTITIONS_AHEAD):
+            hashes = result['hashes']
+            seen_before = seen_rows.add_hashes(hashes)
+            first_in_partition = np.zeros(len(hashes), dtype=bool)
+            first_in_partition[np.unique(hashes, return_index=True)[1]] = True
+
+            counts = result['counts']
+            counts['Duplicate records'] = counts.get('Duplicate records', 0) + int(np.count_nonzero(seen_before & first_in_partition))
+            for key, count in counts.items():
+                etl.validation_counts[key] = etl.validation_counts.get(key, 0) + count
+
+            valid = result['valid'] & ~seen_before
+            columns = {}
+            if result['amount'] is not None:
+                columns['amount'] = result['amount'][valid]
+            if result['time'] is not None:
+                columns['time'] = result['time'][valid]
+            profile.update(pd.DataFrame(columns, index=pd.RangeIndex(np.count_nonzero(valid))))
+
+            histories.append(history)
+            if 'amount' in columns:
+                history = np.concatenate([history, columns['amount']])[-(ROLLING_WINDOW - 1):]
+            valid_masks.append(np.packbits(valid))
+            rejected.append(result['rows'] - int(np.count_nonzero(valid)))
+            etl.stats['records_extracted'] += result['rows']
+            if not rejected_header:
+                rejected_header = _csv_header(result['columns'])
+    del seen_rows
+    etl.stats['records_rejected'] = sum(rejected)
+    etl.validation_errors = [f"{key}: {count}" for key, count in etl.validation_counts.items() if count]
+    logger.info(f"   ✓ Valid records: {etl.stats['records_extracted'] - etl.stats['records_rejected']:,}")
+    logger.info(f"   ✗ Invalid records: {etl.stats['records_rejected']:,}")
+
+    # Pass 2: engineer + load into the dataset / part files
+    parts_dir = tempfile.mkdtemp(prefix='.parts-', dir=output_dir)
+    if etl.output_format == 'parquet':
+        transformed_path = etl.reset_transformed_dataset(output_dir)
+        targets = [(transformed_path, f'part-{index:06d}') for index in range(len(tasks))]
+    else:
+        transformed_path = os.path.join(output_dir, TRANSFORMED_CSV)
+        targets = [(os.path.join(parts_dir, f'transformed-{index:06d}.csv'), None) for index in range(len(tasks))]
+    transform_tasks = [
+        task + (valid_mask, partition_history, etl.output_format) + target
+        + (os.path.join(parts_dir, f'rejected-{index:06d}.csv') if rejected_rows else None,)
+        for index, (task, valid_mask, partition_history, target, rejected_rows)
+        in enumerate(zip(tasks, valid_masks, histories, targets, rejected))
+    ]
+    hourly_partials = []
+    totals = np.zeros(5)
+    has_class = False
+    columns = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_transform_worker,
+                                 initargs=(profile,)) as executor:
+            for rows, part_columns, partial, part_totals, part_has_class in _ordered(
+                    executor, _transform_partition, transform_tasks, workers * PARTITIONS_AHEAD):
+                etl.stats['records_loaded'] += rows
+                columns = columns or part_columns
+                if partial is not None:
+                    hourly_partials.append(partial)
+                totals += part_totals
+                has_class |= part_has_class
+
+        if etl.output_format == 'csv':
+            _concatenate([target for target, _ in targets], transformed_path, _csv_header(columns))
+        rejected_path = os.path.join(output_dir, 'rejected_records.csv')
+        if os.path.exists(rejected_path):
+            os.remove(rejected_path)
+        if any(rejected):
+            _concatenate([task[-1] for task in transform_tasks if task[-1]], rejected_path, rejected_header)
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    etl.stats['records_transformed'] = etl.stats['records_loaded']
+    logger.info(f"   ✓ Loaded {etl.stats['records_loaded']:,} records to {etl.output_format}")
+
+    etl.generate_streamed_powerbi_export(transformed_path, os.path.join(output_dir, 'powerbi'),
+                                         hourly_partials, totals, has_class)
+
+
+def _csv_header(columns):
+    return pd.DataFrame(columns=columns).to_csv(index=False).encode() if columns else b''
+
+
+def _concatenate(part_paths, output_path, header):
+    with open(output_path, 'wb') as output:
+        output.write(header)
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                with open(part_path, 'rb') as part:
+                    shutil.copyfileobj(part, output)
@@ -6,15 +6,36 @@ Enterprise-grade ETL (Extract, Transform, Load) pipeline for:
 - Transforming and enriching data for ML models
 - Loading data into data warehouse/analytics platforms
 - Generating reports for Power BI and other BI tools
+
+run_pipeline(..., chunksize=N) streams the source in N-row chunks instead
+of loading it whole: a first pass validates each chunk and collects the
+dataset-wide statistics feature engineering needs (DatasetProfile), a
+second pass engineers and writes each chunk. Peak memory follows the
+chunk size, and the output matches the in-memory path.
+
+Transformed records go to a Parquet dataset partitioned by day / hour bin
+(<output_dir>/transformed, see parquet_sink) by default, or to
+transformed_data.csv with config['output_format'] = 'csv'.
+
+run_pipeline(..., incremental=True) keeps that state (ETLState) and a
+watermark under <output_dir>/_state: the next run reads only the rows
+appended to the source since, extends the running aggregates and appends
+to the outputs. A run that fails before saving its state is undone at the
+start of the next one.
 """
 
 import pandas as pd
 import numpy as np
+import io
 import json
 import os
 from datetime import datetime, timedelta
+import shutil
 from typing import Dict, List, Optional, Tuple
 import logging
+from numpy.lib.stride_tricks import sliding_window_view
+
+from validation import ROW_HASH_VERSION, ValidationEngine, ValidationResult, row_hashes
 
 # Configure logging
 logging.basicConfig(
@@ -23,6 +44,347 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Compact dtypes for the transaction extract: float32 PCA components and an
+# int8 label instead of pandas' float64 / int64 defaults. Amount and Time
+# stay float64, the features below are derived from them.
+CSV_DTYPES = {
+    **{f'V{i}': np.float32 for i in range(1, 29)},
+    'Time': np.float64,
+    'Amount': np.float64,
+    'Class': np.int8
+}
+
+ROLLING_WINDOW = 10
+LARGE_AMOUNT_QUANTILE = 0.95
+DEFAULT_CHUNKSIZE = 100000
+STATE_DIR = '_state'
+OUTPUT_FORMATS = ('parquet', 'csv')
+TRANSFORMED_DATASET = 'transformed'
+TRANSFORMED_CSV = 'transformed_data.csv'
+
+
+# =============================================================================
+# DATASET-WIDE STATE FOR CHUNKED RUNS
+# =============================================================================
+class DatasetProfile:
+    """
+    Dataset-wide statistics used by engineer_features: the valid row count,
+    amount mean / std / 95th percentile and transactions per hour bin.
+
+    Amounts are kept as a histogram of distinct values and hour bins as
+    counts, so a profile built chunk by chunk is exactly the profile of the
+    whole frame, in memory proportional to the distinct amounts and hours
+    rather than to the rows.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.amount_counts = pd.Series(dtype=np.int64)
+        self.hour_counts = pd.Series(dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'DatasetProfile':
+        profile = cls()
+        profile.update(df)
+        return profile
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Add the (validated) rows of df"""
+        columns = {col.lower(): col for col in df.columns}
+        self.rows += len(df)
+        if 'amount' in columns:
+            counts = df[columns['amount']].value_counts()
+            self.amount_counts = self.amount_counts.add(counts, fill_value=0).astype(np.int64)
+        if 'time' in columns:
+            counts = (df[columns['time']] // 3600).astype(int).value_counts()
+            self.hour_counts = self.hour_counts.add(counts, fill_value=0).astype(np.int64)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'rows': np.array(self.rows),
+            'amount_values': self.amount_counts.index.to_numpy(dtype=np.float64),
+            'amount_counts': self.amount_counts.to_numpy(dtype=np.int64),
+            'hour_bins': self.hour_counts.index.to_numpy(dtype=np.int64),
+            'hour_counts': self.hour_counts.to_numpy(dtype=np.int64)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> 'DatasetProfile':
+        profile = cls()
+        profile.rows = int(arrays['rows'])
+        profile.amount_counts = pd.Series(arrays['amount_counts'], index=arrays['amount_values'])
+        profile.hour_counts = pd.Series(arrays['hour_counts'], index=arrays['hour_bins'])
+        return profile
+
+    def amount_stats(self) -> Tuple[float, float, float]:
+        """(mean, std with ddof=1, 95th percentile) of the amounts"""
+        histogram = self.amount_counts.sort_index()
+        values = histogram.index.to_numpy(dtype=np.float64)
+        counts = histogram.to_numpy()
+        total = int(counts.sum())
+        if total == 0:
+            return np.nan, np.nan, np.nan
+
+        mean = float(np.dot(values, counts) / total)
+        std = float(np.sqrt(np.dot(counts, (values - mean) ** 2) / (total - 1))) if total > 1 else np.nan
+
+        # Linear interpolation between the two closest ranks (pandas' default)
+        position = (total - 1) * LARGE_AMOUNT_QUANTILE
+        cumulative = np.cumsum(counts)
+        lower = values[np.searchsorted(cumulative, int(np.floor(position)), side='right')]
+        upper = values[np.searchsorted(cumulative, int(np.ceil(position)), side='right')]
+        quantile = float(lower + (upper - lower) * (position - np.floor(position)))
+        return mean, std, quantile
+
+
+class SeenRows:
+    """
+    Row fingerprints (64-bit hashes of all values) of the chunks validated
+    so far, to flag duplicates of rows from earlier chunks.
+
+    Hashes live in sorted arrays merged like a binary counter, so adding a
+    chunk costs O(chunk * log(rows)) and the state is 8 bytes per distinct
+    row.
+    """
+
+    def __init__(self):
+        self._segments = []
+
+    def add(self, df: pd.DataFrame) -> np.ndarray:
+        """Record the rows of df; True for rows already seen in earlier chunks"""
+        return self.add_hashes(row_hashes(df))
+
+    def add_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        seen = np.zeros(len(hashes), dtype=bool)
+        if len(hashes) == 0:
+            return seen
+        for segment in self._segments:
+            positions = np.minimum(np.searchsorted(segment, hashes), len(segment) - 1)
+            seen |= segment[positions] == hashes
+
+        self._segments.append(np.unique(hashes))
+        while len(self._segments) > 1 and len(self._segments[-1]) >= len(self._segments[-2]):
+            newest = self._segments.pop()
+            self._segments[-1] = np.union1d(self._segments[-1], newest)
+        return seen
+
+    def save(self, directory: str, prefix: str) -> List[str]:
+        """
+        Write the segments not on disk yet as <prefix>-<n>.npy files (a
+        segment unchanged since load keeps its file) and return the file
+        names of all segments, in order. No existing file is overwritten or
+        removed: the caller commits the list, then removes the files of
+        merged segments.
+        """
+        os.makedirs(directory, exist_ok=True)
+        names = []
+        for i, segment in enumerate(self._segments):
+            if isinstance(segment, np.memmap) and \
+                    os.path.dirname(os.path.abspath(segment.filename)) == os.path.abspath(directory):
+                names.append(os.path.basename(segment.filename))
+                continue
+            name = f'{prefix}-{i:03d}.npy'
+            with open(os.path.join(directory, name), 'wb') as f:
+                np.save(f, segment)
+            names.append(name)
+        return names
+
+    @classmethod
+    def load(cls, directory: str, names: List[str]) -> 'SeenRows':
+        """
+        Segments saved by save (names as it returned them), memory-mapped:
+        lookups only touch the pages they search
+        """
+        seen_rows = cls()
+        for name in names:
+            seen_rows._segments.append(np.load(os.path.join(directory, name), mmap_mode='r'))
+        return seen_rows
+
+
+def rolling_amount_stats(amounts: np.ndarray,
+                         history: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mean and std (ddof=1) of each amount with the ROLLING_WINDOW - 1 before
+    it (min_periods=1, NaN skipped; std is 0 below two values). history
+    holds the amounts preceding this chunk; every window is reduced on its
+    own, so results do not depend on where a file was split into chunks.
+    """
+    if len(amounts) == 0:
+        return np.empty(0), np.empty(0)
+    if history is None:
+        history = np.empty(0)
+    history = history[-(ROLLING_WINDOW - 1):]
+    padding = np.full(ROLLING_WINDOW - 1 - len(history), np.nan)
+    windows = sliding_window_view(np.concatenate([padding, history, amounts]), ROLLING_WINDOW)
+
+    present = ~np.isnan(windows)
+    counts = present.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(present, windows, 0.0).sum(axis=1) / counts
+        deviations = np.where(present, windows - means[:, None], 0.0)
+        stds = np.sqrt((deviations ** 2).sum(axis=1) / (counts - 1))
+    stds[counts < 2] = 0.0
+    return means, stds
+
+
+class ETLState:
+    """
+    Running state of a streamed run: DatasetProfile, SeenRows, the
+    rolling-window tail, the combined hourly partials and fraud totals.
+
+    Incremental runs persist it with save / load together with the
+    watermark: the source file, its header, the byte offset of the first
+    unprocessed line and the largest Time processed, and with the sizes of
+    the output files the runs append to (outputs). SeenRows grows by 8
+    bytes per distinct row and is memory-mapped on load; everything else
+    is bounded by the distinct amounts and hours.
+    """
+
+    STATE_FILE = 'state.json'
+    SEEN_DIR = 'seen'
+
+    def __init__(self):
+        self.profile = DatasetProfile()
+        self.seen_rows = SeenRows()
+        self.rolling_tail = np.empty(0)
+        self.hourly = None
+        self.fraud_totals = np.zeros(5)
+        self.has_class = False
+        self.watermark = {}
+        self.totals = {}
+        self.outputs = None
+        self.runs = 0
+
+    def pending_range(self, source_path: str) -> Tuple[bytes, int, int, Optional[float]]:
+        """
+        (header, start, end, min_time) of the source still to process.
+
+        The same source grown since the last run resumes at the byte
+        offset; any other file (rotated or rewritten extract) is read whole
+        and only rows with Time > the watermark's max_time are kept. end
+        excludes a trailing line still being written.
+        """
+        size = os.path.getsize(source_path)
+        with open(source_path, 'rb') as f:
+            header = f.readline()
+            end = size
+            while end > len(header):
+                f.seek(end - 1)
+                if f.read(1) == b'\n':
+                    break
+                end -= 1
+            end = max(end, len(header))
+
+            offset = self.watermark.get('offset')
+            resumable = (
+                offset is not None
+                and self.watermark.get('source') == os.path.abspath(source_path)
+                and self.watermark.get('header') == header.decode()
+                and len(header) <= offset <= end
+            )
+            if resumable and offset > len(header):
+                f.seek(offset - 1)
+                resumable = f.read(1) == b'\n'
+        if resumable:
+            return header, offset, end, None
+        return header, len(header), end, self.watermark.get('max_time')
+
+    def save(self, directory: str) -> None:
+        """
+        Write the state. New seen segments, the profile and the hourly
+        aggregate go to files named after the run, which only state.json
+        references: replacing state.json commits them all at once, and a
+        crash before that leaves the previous state whole. Files the new
+        state no longer references are removed afterwards.
+        """
+        os.makedirs(directory, exist_ok=True)
+        run = f'{self.runs:05d}'
+        seen_dir = os.path.join(directory, self.SEEN_DIR)
+        files = {'seen': self.seen_rows.save(seen_dir, f'seen-{run}'), 'profile': f'profile-{run}.npz', 'hourly': None}
+        np.savez(os.path.join(directory, files['profile']), **self.profile.to_arrays())
+        if self.hourly is not None:
+            hourly = self.hourly.reset_index()
+            files['hourly'] = f'hourly-{run}.npz'
+            np.savez(os.path.join(directory, files['hourly']), **{col: hourly[col].to_numpy() for col in hourly.columns})
+
+        state = {
+            'watermark': self.watermark,
+            'rolling_tail': self.rolling_tail.tolist(),
+            'fraud_totals': self.fraud_totals.tolist(),
+            'has_class': self.has_class,
+            'totals': self.totals,
+            'outputs': self.outputs,
+            'runs': self.runs,
+            'files': files,
+            'row_hash_version': ROW_HASH_VERSION,
+            'updated_at': datetime.now().isoformat()
+        }
+        path = os.path.join(directory, self.STATE_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+        for name in os.listdir(seen_dir):
+            if name not in files['seen']:
+                os.remove(os.path.join(seen_dir, name))
+        for name in os.listdir(directory):
+            if name.endswith('.npz') and name not in (files['profile'], files['hourly']):
+                os.remove(os.path.join(directory, name))
+
+    @classmethod
+    def load(cls, directory: str) -> 'ETLState':
+        """State saved by save, or a fresh one"""
+        state = cls()
+        try:
+            with open(os.path.join(directory, cls.STATE_FILE)) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return state
+        if saved['row_hash_version'] != ROW_HASH_VERSION:
+            raise ValueError(f"{directory} holds row fingerprints of another version; "
+                             f"remove it to rebuild the outputs with a full incremental run")
+
+        state.watermark = saved['watermark']
+        state.rolling_tail = np.array(saved['rolling_tail'], dtype=np.float64)
+        state.fraud_totals = np.array(saved['fraud_totals'])
+        state.has_class = saved['has_class']
+        state.totals = saved['totals']
+        state.outputs = saved['outputs']
+        state.runs = saved['runs']
+        files = saved['files']
+        with np.load(os.path.join(directory, files['profile'])) as arrays:
+            state.profile = DatasetProfile.from_arrays(arrays)
+        if files['hourly'] is not None:
+            with np.load(os.path.join(directory, files['hourly'])) as arrays:
+                state.hourly = pd.DataFrame({name: arrays[name] for name in arrays.files}).set_index('hour_bin')
+        state.seen_rows = SeenRows.load(os.path.join(directory, cls.SEEN_DIR), files['seen'])
+        return state
+
+
+class _ByteRange(io.RawIOBase):
+    """The header line followed by bytes [start, end) of a file"""
+
+    def __init__(self, f, header: bytes, start: int, end: int):
+        self._f = f
+        self._pending = header
+        self._f.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._pending:
+            n = min(len(buffer), len(self._pending))
+            buffer[:n] = self._pending[:n]
+            self._pending = self._pending[n:]
+            return n
+        data = self._f.read(min(len(buffer), self._remaining))
+        self._remaining -= len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
 class FraudDetectionETL:
     """
     Enterprise ETL Pipeline for Fraud Detection System
@@ -37,6 +399,9 @@ class FraudDetectionETL:
     
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
+        self.output_format = self.config.get('output_format', 'parquet')
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}, got {self.output_format!r}")
         self.stats = {
             'records_extracted': 0,
             'records_transformed': 0,
@@ -46,6 +411,9 @@ class FraudDetectionETL:
             'end_time': None
         }
         self.validation_errors = []
+        self.validation_counts = {}
+        self.validator = ValidationEngine(self.config.get('validation_rules'))
+        self.watermark = None
         
     # =========================================================================
     # EXTRACT PHASE
@@ -54,7 +422,7 @@ class FraudDetectionETL:
         """Extract data from CSV file"""
         logger.info(f"📥 Extracting data from: {file_path}")
         try:
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(file_path, dtype=CSV_DTYPES)
             self.stats['records_extracted'] = len(df)
             logger.info(f"   ✓ Extracted {len(df):,} records")
             return df
@@ -62,14 +430,38 @@ class FraudDetectionETL:
             logger.error(f"   ✗ Extraction failed: {e}")
             raise
     
-    def extract_from_database(self, connection_string: str, query: str) -> pd.DataFrame:
-        """Extract data from SQL database"""
+    def extract_csv_chunks(self, file_path: str, chunksize: int):
+        """Stream a CSV file as DataFrames of up to chunksize rows"""
+        logger.info(f"📥 Streaming data from: {file_path} ({chunksize:,} rows per chunk)")
+        try:
+            with pd.read_csv(file_path, dtype=CSV_DTYPES, chunksize=chunksize) as reader:
+                yield from reader
+        except Exception as e:
+            logger.error(f"   ✗ Extraction failed: {e}")
+            raise
+    
+    def extract_csv_range(self, file_path: str, header: bytes, start: int, end: int,
+                          chunksize: int, min_time: Optional[float] = None):
+        """extract_csv_chunks over bytes [start, end) of the file, rows with Time > min_time"""
+        logger.info(f"📥 Streaming data from: {file_path} (bytes {start:,}-{end:,})")
+        if end <= start:
+            return
+        try:
+            with open(file_path, 'rb') as f, \
+                    pd.read_csv(io.BufferedReader(_ByteRange(f, header, start, end)),
+                                dtype=CSV_DTYPES, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    yield chunk if min_time is None else chunk[chunk['Time'] > min_time]
+        except Exception as e:
+            logger.error(f"   ✗ Extraction failed: {e}")
+            raise
+    
+    def extract_from_database(self, connection_string: str, query: str, params=None) -> pd.DataFrame:
+        """Extract data from SQL database (streamed in fetch-size chunks, see db_io)"""
         logger.info("📥 Extracting data from database...")
         try:
-            import pyodbc
-            conn = pyodbc.connect(connection_string)
-            df = pd.read_sql(query, conn)
-            conn.close()
+            chunks = list(self.extract_database_chunks(connection_string, query, params))
+            df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
             self.stats['records_extracted'] = len(df)
             logger.info(f"   ✓ Extracted {len(df):,} records from database")
             return df
@@ -77,6 +469,16 @@ class FraudDetectionETL:
             logger.error(f"   ✗ Database extraction failed: {e}")
             raise
     
+    def extract_database_chunks(self, connection_string: str, query: str, params=None):
+        """
+        Yield the result of query in chunks of config['db_fetch_size'] rows,
+        read on a streaming cursor of the pooled engine
+        """
+        from db_io import DEFAULT_FETCH_SIZE, read_sql_chunks
+        engine = self._database_engine(connection_string)
+        fetch_size = self.config.get('db_fetch_size', DEFAULT_FETCH_SIZE)
+        yield from read_sql_chunks(engine, query, fetch_size, params, dtype=CSV_DTYPES)
+    
     def extract_from_api(self, api_url: str, params: Optional[Dict] = None) -> pd.DataFrame:
         """Extract data from REST API"""
         logger.info(f"📥 Extracting data from API: {api_url}")
@@ -125,13 +527,34 @@ class FraudDetectionETL:
     # =========================================================================
     # TRANSFORM PHASE
     # =========================================================================
-    def validate_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Validate data quality and separate valid/invalid records"""
+    def validate_data(self, df: pd.DataFrame,
+                      seen_rows: Optional[SeenRows] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Validate data quality and separate valid/invalid records.
+
+        With seen_rows, df is one chunk of a larger extract: rows repeating
+        earlier chunks count as duplicates, and the error counts and
+        rejected total accumulate across calls.
+        """
         logger.info("🔍 Validating data quality...")
         
-        valid_mask = pd.Series([True] * len(df))
-        errors = []
+        df, result = self.apply_validation_rules(df, seen_rows)
+        valid_df = df.take(np.flatnonzero(result.valid))
+        invalid_df = df.take(result.rejected_rows)
+        
+        logger.info(f"   ✓ Valid records: {len(valid_df):,}")
+        logger.info(f"   ✗ Invalid records: {len(invalid_df):,}")
         
+        return valid_df, invalid_df
+    
+    def apply_validation_rules(self, df: pd.DataFrame,
+                               seen_rows: Optional[SeenRows] = None) -> Tuple[pd.DataFrame, ValidationResult]:
+        """
+        Run the validation rules (config['validation_rules'], see
+        validation.default_rules) over df in one pass and record the
+        counts, without splitting the frame. Returns df with its required
+        columns renamed, and the per-row result.
+        """
         # Check for required columns
         required_columns = ['Amount', 'Time']
         for col in required_columns:
@@ -142,48 +565,34 @@ class FraudDetectionETL:
                 else:
                     logger.warning(f"   ⚠ Missing required column: {col}")
         
-        # Validate Amount (must be positive)
-        if 'Amount' in df.columns:
-            invalid_amount = df['Amount'] < 0
-            if invalid_amount.any():
-                errors.append(f"Negative amounts: {invalid_amount.sum()}")
-                valid_mask &= ~invalid_amount
-        
-        # Validate Time (must be non-negative)
-        if 'Time' in df.columns:
-            invalid_time = df['Time'] < 0
-            if invalid_time.any():
-                errors.append(f"Negative time values: {invalid_time.sum()}")
-                valid_mask &= ~invalid_time
-        
-        # Check for duplicates
-        duplicates = df.duplicated()
-        if duplicates.any():
-            errors.append(f"Duplicate records: {duplicates.sum()}")
-            valid_mask &= ~duplicates
-        
-        # Check for null values in critical columns
-        for col in df.columns:
-            null_count = df[col].isnull().sum()
-            if null_count > 0:
-                errors.append(f"Null values in {col}: {null_count}")
-        
-        valid_df = df[valid_mask].copy()
-        invalid_df = df[~valid_mask].copy()
-        
-        self.validation_errors = errors
-        self.stats['records_rejected'] = len(invalid_df)
-        
-        logger.info(f"   ✓ Valid records: {len(valid_df):,}")
-        logger.info(f"   ✗ Invalid records: {len(invalid_df):,}")
-        
-        return valid_df, invalid_df
+        result = self.validator.evaluate(df, seen_rows)
+        rejected = len(df) - int(np.count_nonzero(result.valid))
+        if seen_rows is None:
+            self.validation_counts = dict(result.counts)
+            self.stats['records_rejected'] = rejected
+        else:
+            for key, count in result.counts.items():
+                self.validation_counts[key] = self.validation_counts.get(key, 0) + count
+            self.stats['records_rejected'] += rejected
+        self.validation_errors = [f"{key}: {count}" for key, count in self.validation_counts.items() if count]
+        return df, result
     
-    def engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Create features for ML model"""
+    def engineer_features(self, df: pd.DataFrame, profile: Optional[DatasetProfile] = None,
+                          history: Optional[np.ndarray] = None, copy: bool = True) -> pd.DataFrame:
+        """
+        Create features for ML model.
+
+        Dataset-wide statistics come from profile (df's own by default);
+        history holds the amounts of the rows preceding df when df is a
+        chunk, for the rolling features. copy=False adds the features to
+        df itself, for frames the caller owns.
+        """
         logger.info("⚙️ Engineering features...")
         
-        df = df.copy()
+        if profile is None:
+            profile = DatasetProfile.from_frame(df)
+        if copy:
+            df = df.copy()
         
         # Standardize column names
         df.columns = df.columns.str.lower()
@@ -197,25 +606,26 @@ class FraudDetectionETL:
         
         # Amount-based features
         if 'amount' in df.columns:
+            amount_mean, amount_std, large_amount = profile.amount_stats()
             df['amount_log'] = np.log1p(df['amount'])
-            df['amount_zscore'] = (df['amount'] - df['amount'].mean()) / df['amount'].std()
-            df['is_large_amount'] = (df['amount'] > df['amount'].quantile(0.95)).astype(int)
+            df['amount_zscore'] = (df['amount'] - amount_mean) / amount_std
+            df['is_large_amount'] = (df['amount'] > large_amount).astype(int)
             
             # Amount-time interaction
             if 'hour' in df.columns:
                 df['amount_hour_interaction'] = df['amount_log'] * df['hour']
         
         # Rolling statistics (if sorted by time)
-        if 'amount' in df.columns and len(df) > 10:
-            df['amount_rolling_mean'] = df['amount'].rolling(window=10, min_periods=1).mean()
-            df['amount_rolling_std'] = df['amount'].rolling(window=10, min_periods=1).std().fillna(0)
+        if 'amount' in df.columns and profile.rows > ROLLING_WINDOW:
+            rolling_mean, rolling_std = rolling_amount_stats(df['amount'].to_numpy(dtype=np.float64), history)
+            df['amount_rolling_mean'] = rolling_mean
+            df['amount_rolling_std'] = rolling_std
             df['amount_deviation'] = df['amount'] - df['amount_rolling_mean']
         
         # Velocity features (transactions per time period)
         if 'time' in df.columns:
             df['hour_bin'] = (df['time'] // 3600).astype(int)
-            hour_counts = df.groupby('hour_bin').size()
-            df['transactions_this_hour'] = df['hour_bin'].map(hour_counts)
+            df['transactions_this_hour'] = df['hour_bin'].map(profile.hour_counts)
         
         self.stats['records_transformed'] = len(df)
         logger.info(f"   ✓ Engineered {len(df.columns)} features")
@@ -264,6 +674,57 @@ class FraudDetectionETL:
         logger.info(f"   ✓ Created {len(aggregated)} aggregated records")
         return aggregated
     
+    def partial_period_aggregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Per-hour partial aggregates of one chunk, for merge_period_aggregates"""
+        agg_funcs = {'amount': ['sum', 'count', 'mean', 'var']}
+        if 'class' in df.columns:
+            agg_funcs['class'] = ['sum', 'count']
+        partial = df.groupby('hour_bin').agg(agg_funcs)
+        partial.columns = ['_'.join(col) for col in partial.columns.values]
+        return partial
+    
+    def combine_period_partials(self, partials: List[pd.DataFrame]) -> pd.DataFrame:
+        """Combine chunk partials into one partial of the same layout"""
+        partials = pd.concat(partials)
+        grouped = partials.groupby(level=0)
+        count = grouped['amount_count'].sum()
+        amount_sum = grouped['amount_sum'].sum()
+        mean = amount_sum / count
+        
+        # Squared deviations within each chunk plus those of the chunk means
+        squared_deviations = (
+            partials['amount_var'].fillna(0) * (partials['amount_count'] - 1)
+            + partials['amount_count'] * (partials['amount_mean'] - mean.reindex(partials.index).values) ** 2
+        )
+        combined = pd.DataFrame({
+            'amount_sum': amount_sum,
+            'amount_count': count,
+            'amount_mean': mean,
+            'amount_var': squared_deviations.groupby(level=0).sum() / (count - 1)
+        })
+        if 'class_sum' in partials.columns:
+            combined['class_sum'] = grouped['class_sum'].sum()
+            combined['class_count'] = grouped['class_count'].sum()
+        combined.index.name = 'hour_bin'
+        return combined
+    
+    def merge_period_aggregates(self, partials: List[pd.DataFrame]) -> pd.DataFrame:
+        """Combine chunk partials into the aggregate_by_period output"""
+        combined = self.combine_period_partials(partials)
+        aggregated = pd.DataFrame({
+            'amount_sum': combined['amount_sum'],
+            'amount_mean': combined['amount_mean'],
+            'amount_std': np.sqrt(combined['amount_var']),
+            'amount_count': combined['amount_count']
+        })
+        if 'class_sum' in combined.columns:
+            aggregated['class_sum'] = combined['class_sum']
+            aggregated['class_mean'] = combined['class_sum'] / combined['class_count']
+        
+        aggregated = aggregated.reset_index()
+        logger.info(f"   ✓ Created {len(aggregated)} aggregated records")
+        return aggregated
+    
     # =========================================================================
     # LOAD PHASE
     # =========================================================================
@@ -279,12 +740,17 @@ class FraudDetectionETL:
             logger.error(f"   ✗ CSV loading failed: {e}")
             raise
     
-    def load_to_parquet(self, df: pd.DataFrame, output_path: str) -> None:
-        """Load data to Parquet file (optimized for analytics)"""
+    def load_to_parquet(self, df: pd.DataFrame, output_path: str, file_prefix: str = 'part') -> None:
+        """
+        Load data to a Parquet dataset directory (optimized for analytics):
+        partitioned by day / hour bin when df has hour_bin, see parquet_sink
+        """
         logger.info(f"📤 Loading data to Parquet: {output_path}")
         try:
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            df.to_parquet(output_path, index=False)
+            from parquet_sink import ParquetSink
+            sink = ParquetSink(output_path, file_prefix)
+            sink.write(df)
+            sink.close()
             self.stats['records_loaded'] = len(df)
             logger.info(f"   ✓ Loaded {len(df):,} records to Parquet")
         except Exception as e:
@@ -293,18 +759,22 @@ class FraudDetectionETL:
     
     def load_to_database(self, df: pd.DataFrame, connection_string: str, 
                         table_name: str, if_exists: str = 'append') -> None:
-        """Load data to SQL database"""
+        """Load data to SQL database (batched executemany on the pooled engine, see db_io)"""
         logger.info(f"📤 Loading data to database table: {table_name}")
         try:
-            from sqlalchemy import create_engine
-            engine = create_engine(connection_string)
-            df.to_sql(table_name, engine, if_exists=if_exists, index=False)
-            self.stats['records_loaded'] = len(df)
+            from db_io import DEFAULT_BATCH_ROWS, insert_frame
+            engine = self._database_engine(connection_string)
+            batch_rows = self.config.get('db_batch_rows', DEFAULT_BATCH_ROWS)
+            self.stats['records_loaded'] = insert_frame(engine, df, table_name, if_exists, batch_rows)
             logger.info(f"   ✓ Loaded {len(df):,} records to {table_name}")
         except Exception as e:
             logger.error(f"   ✗ Database loading failed: {e}")
             raise
     
+    def _database_engine(self, connection_string: str):
+        from db_io import DEFAULT_POOL_SIZE, get_engine
+        return get_engine(connection_string, self.config.get('db_pool_size', DEFAULT_POOL_SIZE))
+    
     def load_to_kafka(self, df: pd.DataFrame, topic: str, 
                      bootstrap_servers: str) -> None:
         """Load data to Kafka topic"""
@@ -327,18 +797,25 @@ class FraudDetectionETL:
             logger.error(f"   ✗ Kafka loading failed: {e}")
             raise
     
-    def generate_powerbi_export(self, df: pd.DataFrame, 
-                               output_dir: str) -> Dict[str, str]:
-        """Generate exports for Power BI integration"""
+    def generate_powerbi_export(self, df: pd.DataFrame, output_dir: str,
+                               transactions_dataset: Optional[str] = None) -> Dict[str, str]:
+        """
+        Generate exports for Power BI integration. With transactions_dataset
+        (the Parquet dataset df was loaded to) Power BI reads the
+        transactions from there instead of a CSV copy.
+        """
         logger.info("📊 Generating Power BI exports...")
         
         os.makedirs(output_dir, exist_ok=True)
         exports = {}
         
         # Main transaction data
-        main_path = os.path.join(output_dir, 'transactions.csv')
-        df.to_csv(main_path, index=False)
-        exports['transactions'] = main_path
+        if transactions_dataset:
+            exports['transactions'] = transactions_dataset
+        else:
+            main_path = os.path.join(output_dir, 'transactions.csv')
+            df.to_csv(main_path, index=False)
+            exports['transactions'] = main_path
         
         # Aggregated hourly data
         if 'hour_bin' in df.columns or 'time' in df.columns:
@@ -349,29 +826,103 @@ class FraudDetectionETL:
         
         # Fraud summary
         if 'class' in df.columns:
-            fraud_summary = pd.DataFrame({
-                'metric': ['total_transactions', 'fraud_count', 'fraud_rate', 
-                          'total_amount', 'fraud_amount'],
-                'value': [
-                    len(df),
-                    df['class'].sum(),
-                    df['class'].mean() * 100,
-                    df['amount'].sum() if 'amount' in df.columns else 0,
-                    df[df['class'] == 1]['amount'].sum() if 'amount' in df.columns else 0
-                ]
-            })
-            summary_path = os.path.join(output_dir, 'fraud_summary.csv')
-            fraud_summary.to_csv(summary_path, index=False)
-            exports['fraud_summary'] = summary_path
+            exports['fraud_summary'] = self._write_fraud_summary(output_dir, [
+                len(df),
+                df['class'].sum(),
+                df['class'].mean() * 100,
+                df['amount'].sum() if 'amount' in df.columns else 0,
+                df[df['class'] == 1]['amount'].sum() if 'amount' in df.columns else 0
+            ])
+        
+        logger.info(f"   ✓ Generated {len(exports)} export files")
+        return exports
+    
+    def export_partials(self, df: pd.DataFrame) -> Tuple[Optional[pd.DataFrame], np.ndarray, bool]:
+        """
+        What the Power BI exports need from one transformed chunk: its
+        hourly partial aggregate, the fraud summary totals (rows, fraud
+        count, labelled rows, total amount, fraud amount) and whether it
+        has labels.
+        """
+        partial = None
+        if 'amount' in df.columns and 'hour_bin' in df.columns:
+            partial = self.partial_period_aggregate(df)
+        totals = np.zeros(5)
+        has_class = 'class' in df.columns
+        if has_class:
+            fraud = df['class'] == 1
+            totals += [
+                len(df),
+                df['class'].sum(),
+                df['class'].count(),
+                df['amount'].sum() if 'amount' in df.columns else 0,
+                df.loc[fraud, 'amount'].sum() if 'amount' in df.columns else 0
+            ]
+        return partial, totals, has_class
+    
+    def generate_streamed_powerbi_export(self, transformed_path: str, output_dir: str,
+                                         hourly_partials: List[pd.DataFrame], totals: np.ndarray,
+                                         has_class: bool, transformed_from: int = 0) -> Dict[str, str]:
+        """
+        generate_powerbi_export for data written chunk by chunk, from
+        export_partials. transformed_from > 0 appends only the bytes of
+        transformed_path past that offset to the transactions export; a
+        Parquet dataset is referenced rather than copied.
+        """
+        logger.info("📊 Generating Power BI exports...")
+        
+        os.makedirs(output_dir, exist_ok=True)
+        exports = {}
+        
+        if os.path.isdir(transformed_path):
+            exports['transactions'] = transformed_path
+        elif os.path.exists(transformed_path):
+            exports['transactions'] = os.path.join(output_dir, 'transactions.csv')
+            if transformed_from and os.path.exists(exports['transactions']):
+                with open(transformed_path, 'rb') as source, open(exports['transactions'], 'ab') as target:
+                    source.seek(transformed_from)
+                    shutil.copyfileobj(source, target)
+            else:
+                shutil.copyfile(transformed_path, exports['transactions'])
+        
+        if hourly_partials:
+            hourly = self.merge_period_aggregates(hourly_partials)
+            exports['hourly_summary'] = os.path.join(output_dir, 'hourly_summary.csv')
+            hourly.to_csv(exports['hourly_summary'], index=False)
+        
+        if has_class:
+            rows, fraud_count, labelled, total_amount, fraud_amount = totals
+            exports['fraud_summary'] = self._write_fraud_summary(output_dir, [
+                int(rows), int(fraud_count), fraud_count / labelled * 100, total_amount, fraud_amount
+            ])
         
         logger.info(f"   ✓ Generated {len(exports)} export files")
         return exports
     
+    def _write_fraud_summary(self, output_dir: str, values: List) -> str:
+        fraud_summary = pd.DataFrame({
+            'metric': ['total_transactions', 'fraud_count', 'fraud_rate', 
+                      'total_amount', 'fraud_amount'],
+            'value': values
+        })
+        summary_path = os.path.join(output_dir, 'fraud_summary.csv')
+        fraud_summary.to_csv(summary_path, index=False)
+        return summary_path
+    
     # =========================================================================
     # PIPELINE ORCHESTRATION
     # =========================================================================
-    def run_pipeline(self, source_path: str, output_dir: str) -> Dict:
-        """Run complete ETL pipeline"""
+    def run_pipeline(self, source_path: str, output_dir: str, chunksize: Optional[int] = None,
+                     workers: Optional[int] = None, incremental: bool = False) -> Dict:
+        """
+        Run complete ETL pipeline: streamed in chunks of chunksize rows if
+        given, or split into byte-range partitions processed by `workers`
+        worker processes (see etl_parallel). incremental=True processes
+        only what the source gained since the previous incremental run into
+        output_dir (streamed in chunks).
+        """
+        if incremental and workers:
+            raise ValueError("Incremental runs are streamed in chunks; workers is not supported")
         logger.info("=" * 60)
         logger.info("  FraudGuard ETL Pipeline")
         logger.info("=" * 60)
@@ -379,6 +930,18 @@ class FraudDetectionETL:
         self.stats['start_time'] = datetime.now()
         
         try:
+            os.makedirs(output_dir, exist_ok=True)
+            if workers:
+                from etl_parallel import run_parallel
+                run_parallel(self, source_path, output_dir, workers)
+                return self._finish_pipeline(output_dir)
+            if incremental:
+                self._run_incremental(source_path, output_dir, chunksize or DEFAULT_CHUNKSIZE)
+                return self._finish_pipeline(output_dir)
+            if chunksize:
+                self._run_chunked(source_path, output_dir, chunksize)
+                return self._finish_pipeline(output_dir)
+            
             # Extract
             df = self.extract_from_csv(source_path)
             
@@ -394,38 +957,201 @@ class FraudDetectionETL:
             transformed_df = self.engineer_features(valid_df)
             
             # Load
-            self.load_to_csv(transformed_df, 
-                           os.path.join(output_dir, 'transformed_data.csv'))
+            if self.output_format == 'parquet':
+                dataset_path = self.reset_transformed_dataset(output_dir)
+                self.load_to_parquet(transformed_df, dataset_path)
+            else:
+                dataset_path = None
+                self.load_to_csv(transformed_df, os.path.join(output_dir, TRANSFORMED_CSV))
             
             # Generate Power BI exports
-            self.generate_powerbi_export(transformed_df, 
-                                        os.path.join(output_dir, 'powerbi'))
+            self.generate_powerbi_export(transformed_df, os.path.join(output_dir, 'powerbi'),
+                                         dataset_path)
             
-            self.stats['end_time'] = datetime.now()
-            
-            # Generate pipeline report
-            report = self.generate_report()
-            report_path = os.path.join(output_dir, 'pipeline_report.json')
-            with open(report_path, 'w') as f:
-                json.dump(report, f, indent=2, default=str)
-            
-            logger.info("=" * 60)
-            logger.info("  Pipeline completed successfully!")
-            logger.info("=" * 60)
-            
-            return report
+            return self._finish_pipeline(output_dir)
             
         except Exception as e:
             self.stats['end_time'] = datetime.now()
             logger.error(f"Pipeline failed: {e}")
             raise
     
+    def _finish_pipeline(self, output_dir: str) -> Dict:
+        self.stats['end_time'] = datetime.now()
+        
+        # Generate pipeline report
+        report = self.generate_report()
+        report_path = os.path.join(output_dir, 'pipeline_report.json')
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        
+        logger.info("=" * 60)
+        logger.info("  Pipeline completed successfully!")
+        logger.info("=" * 60)
+        
+        return report
+    
+    def _run_chunked(self, source_path: str, output_dir: str, chunksize: int) -> None:
+        self._stream(lambda: self.extract_csv_chunks(source_path, chunksize), output_dir, ETLState())
+    
+    def _run_incremental(self, source_path: str, output_dir: str, chunksize: int) -> None:
+        """
+        Streamed run over the part of the source past the watermark,
+        continuing the state of the previous incremental run into
+        output_dir, then move the watermark and save the state.
+        """
+        state_dir = os.path.join(output_dir, STATE_DIR)
+        state = ETLState.load(state_dir)
+        if state.runs > 0:
+            self.rollback_outputs(output_dir, state)
+        header, start, end, min_time = state.pending_range(source_path)
+        logger.info(f"🔖 Run {state.runs + 1}: {source_path} from byte {start:,}"
+                    + (f" (rows with Time > {min_time})" if min_time is not None else ""))
+        
+        max_time = self._stream(
+            lambda: self.extract_csv_range(source_path, header, start, end, chunksize, min_time),
+            output_dir, state
+        )
+        
+        previous_max_time = state.watermark.get('max_time')
+        if previous_max_time is not None:
+            max_time = previous_max_time if max_time is None else max(previous_max_time, max_time)
+        state.watermark = {
+            'source': os.path.abspath(source_path),
+            'header': header.decode(),
+            'offset': end,
+            'max_time': max_time
+        }
+        for key in ('records_extracted', 'records_loaded', 'records_rejected'):
+            state.totals[key] = state.totals.get(key, 0) + self.stats[key]
+        state.outputs = {name: os.path.getsize(os.path.join(output_dir, name))
+                         for name in self.appended_outputs() if os.path.exists(os.path.join(output_dir, name))}
+        state.runs += 1
+        state.save(state_dir)
+        self.watermark = dict(state.watermark, runs=state.runs, totals=state.totals)
+    
+    def _stream(self, chunks, output_dir: str, state: ETLState) -> Optional[float]:
+        """
+        Two-pass streamed run; chunks() returns a fresh iterator over the
+        source chunks. The first pass validates every chunk, writes the
+        rejected records and extends the state's DatasetProfile; the valid
+        rows are remembered as one bit each. The second pass re-reads the
+        chunks and pushes the valid rows through engineer_features into
+        the CSV outputs, carrying the last amounts over for the rolling
+        features. A state from earlier runs (state.runs > 0) is continued
+        and the outputs are appended to. Returns the largest Time read.
+        """
+        self.reset_counts()
+        append = state.runs > 0
+        max_time = None
+        
+        # Pass 1: validate + profile
+        rejected_path = os.path.join(output_dir, 'rejected_records.csv')
+        if not append and os.path.exists(rejected_path):
+            os.remove(rejected_path)
+        valid_masks = []
+        for chunk in chunks():
+            self.stats['records_extracted'] += len(chunk)
+            if 'Time' in chunk.columns and len(chunk) > 0:
+                chunk_max_time = float(chunk['Time'].max())
+                max_time = chunk_max_time if max_time is None else max(max_time, chunk_max_time)
+            valid_df, invalid_df = self.validate_data(chunk, state.seen_rows)
+            state.profile.update(valid_df)
+            valid_masks.append(np.packbits(chunk.index.isin(valid_df.index)))
+            if len(invalid_df) > 0:
+                invalid_df.to_csv(rejected_path, mode='a', header=not os.path.exists(rejected_path), index=False)
+        
+        # Pass 2: engineer + load
+        sink = None
+        transformed_from = 0
+        if self.output_format == 'parquet':
+            from parquet_sink import ParquetSink
+            transformed_path = os.path.join(output_dir, TRANSFORMED_DATASET) if append \
+                else self.reset_transformed_dataset(output_dir)
+            sink = ParquetSink(transformed_path, file_prefix=f'run-{state.runs + 1:05d}')
+        else:
+            transformed_path = os.path.join(output_dir, TRANSFORMED_CSV)
+            if append and os.path.exists(transformed_path):
+                transformed_from = os.path.getsize(transformed_path)
+        hourly_partials = [state.hourly] if state.hourly is not None else []
+        for chunk_number, (chunk, valid_mask) in enumerate(zip(chunks(), valid_masks)):
+            valid_df = chunk[np.unpackbits(valid_mask, count=len(chunk)).astype(bool)]
+            transformed_df = self.engineer_features(valid_df, state.profile, state.rolling_tail, copy=False)
+            if sink is not None:
+                sink.write(transformed_df)
+            else:
+                first = chunk_number == 0 and not transformed_from
+                transformed_df.to_csv(transformed_path, mode='w' if first else 'a', header=first, index=False)
+            self.stats['records_loaded'] += len(transformed_df)
+            
+            if 'amount' in transformed_df.columns:
+                amounts = transformed_df['amount'].to_numpy(dtype=np.float64)
+                state.rolling_tail = np.concatenate([state.rolling_tail, amounts])[-(ROLLING_WINDOW - 1):]
+            partial, chunk_totals, chunk_has_class = self.export_partials(transformed_df)
+            if partial is not None:
+                hourly_partials.append(partial)
+            state.fraud_totals += chunk_totals
+            state.has_class |= chunk_has_class
+        if sink is not None:
+            sink.close()
+        self.stats['records_transformed'] = self.stats['records_loaded']
+        logger.info(f"   ✓ Loaded {self.stats['records_loaded']:,} records to {self.output_format}")
+        
+        if hourly_partials:
+            state.hourly = self.combine_period_partials(hourly_partials)
+        self.generate_streamed_powerbi_export(transformed_path, os.path.join(output_dir, 'powerbi'),
+                                              hourly_partials, state.fraud_totals, state.has_class,
+                                              transformed_from)
+        return max_time
+    
+    def appended_outputs(self) -> List[str]:
+        """Files (relative to output_dir) an incremental run appends to"""
+        outputs = ['rejected_records.csv']
+        if self.output_format == 'csv':
+            outputs += [TRANSFORMED_CSV, os.path.join('powerbi', 'transactions.csv')]
+        return outputs
+    
+    def rollback_outputs(self, output_dir: str, state: ETLState) -> None:
+        """
+        Undo what an incremental run that failed before saving its state
+        appended to the outputs: cut the appended files back to their
+        sizes in state.outputs (removing those it created) and remove the
+        Parquet files of runs after state.runs.
+        """
+        for name in self.appended_outputs():
+            path = os.path.join(output_dir, name)
+            if not os.path.exists(path):
+                continue
+            size = state.outputs.get(name)
+            if size is None:
+                os.remove(path)
+            elif os.path.getsize(path) > size:
+                logger.info(f"↩️ Rolling {name} back to the last saved state")
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+        if self.output_format == 'parquet':
+            from parquet_sink import reset_dataset
+            reset_dataset(os.path.join(output_dir, TRANSFORMED_DATASET),
+                          keep=lambda name: not name.startswith('run-') or int(name[4:9]) <= state.runs)
+    
+    def reset_transformed_dataset(self, output_dir: str) -> str:
+        """Empty the transformed Parquet dataset of output_dir before a full run; returns its path"""
+        from parquet_sink import reset_dataset
+        dataset_path = os.path.join(output_dir, TRANSFORMED_DATASET)
+        reset_dataset(dataset_path)
+        return dataset_path
+    
+    def reset_counts(self) -> None:
+        """Zero the record counters and validation counts before a streamed run"""
+        for key in ('records_extracted', 'records_transformed', 'records_loaded', 'records_rejected'):
+            self.stats[key] = 0
+        self.validation_counts = {}
+    
     def generate_report(self) -> Dict:
         """Generate pipeline execution report"""
         duration = (self.stats['end_time'] - self.stats['start_time']).total_seconds() \
                    if self.stats['end_time'] and self.stats['start_time'] else 0
         
-        return {
+        report = {
             'pipeline_name': 'FraudGuard ETL Pipeline',
             'execution_stats': {
                 'start_time': self.stats['start_time'],
@@ -444,6 +1170,9 @@ class FraudDetectionETL:
             },
             'status': 'SUCCESS'
         }
+        if self.watermark is not None:
+            report['incremental'] = self.watermark
+        return report
 
 
 # =============================================================================
@@ -455,11 +1184,19 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='FraudGuard ETL Pipeline')
     parser.add_argument('--source', type=str, required=True, help='Source data file')
     parser.add_argument('--output', type=str, default='./output', help='Output directory')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Stream the source in chunks of this many rows (default: load it whole)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Process the source in partitions on this many worker processes')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only process what the source gained since the last incremental run')
+    parser.add_argument('--format', type=str, default='parquet', choices=OUTPUT_FORMATS,
+                        help='Format of the transformed records')
     
     args = parser.parse_args()
     
-    etl = FraudDetectionETL()
-    report = etl.run_pipeline(args.source, args.output)
+    etl = FraudDetectionETL({'output_format': args.format})
+    report = etl.run_pipeline(args.source, args.output, args.chunksize, args.workers, args.incremental)
     
     print("\n📋 Pipeline Report:")
     print(json.dumps(report, indent=2, default=str))
@@ -0,0 +1,138 @@
+"""
+FraudGuard Event Publisher
+==========================
+Non-blocking Kafka publishing for the prediction path.
+
+Request threads only enqueue events into a bounded in-memory queue; a
+background thread hands them to the KafkaProducer, which batches sends
+according to its linger_ms / batch_size settings. No per-event flush.
+
+When the queue is full the configured policy applies:
+- drop:  discard the event (counted)
+- block: wait up to block_timeout for space (back-pressure), then drop
+- spill: append the event to a local NDJSON file, replayed on next start
+"""
+
+import json
+import os
+import queue
+import threading
+
+POLICY_DROP = 'drop'
+POLICY_BLOCK = 'block'
+POLICY_SPILL = 'spill'
+
+_STOP = object()
+
+
+class AsyncEventPublisher:
+    """Bounded-queue background publisher on top of a KafkaProducer"""
+
+    def __init__(self, producer, max_queue=10000, policy=POLICY_DROP,
+                 block_timeout=0.05, spill_path=None):
+        if policy not in (POLICY_DROP, POLICY_BLOCK, POLICY_SPILL):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if policy == POLICY_SPILL and not spill_path:
+            raise ValueError("The spill policy requires a spill_path")
+
+        self.producer = producer
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.spill_path = spill_path
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        # dropped / errors are incremented from request threads and the producer's I/O thread
+        self._count_lock = threading.Lock()
+        self._thread = None
+        self.published = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.errors = 0
+
+    def start(self):
+        """Start the publishing thread and replay events spilled by a previous run"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='kafka-publisher', daemon=True)
+        self._thread.start()
+        self._replay_spill()
+
+    def publish(self, topic, event):
+        """Enqueue an event; never waits on the broker. Returns False if not queued."""
+        try:
+            self._queue.put_nowait((topic, event))
+            return True
+        except queue.Full:
+            pass
+
+        if self.policy == POLICY_BLOCK:
+            try:
+                self._queue.put((topic, event), timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                pass
+        elif self.policy == POLICY_SPILL:
+            self._spill(topic, event)
+            return False
+
+        with self._count_lock:
+            self.dropped += 1
+        return False
+
+    def close(self, timeout=10):
+        """Drain queued events, flush the producer and stop the thread"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        try:
+            self.producer.flush(timeout=timeout)
+        except Exception as e:
+            print(f"Failed to flush Kafka producer: {e}")
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'published': self.published,
+            'dropped': self.dropped,
+            'spilled': self.spilled,
+            'errors': self.errors
+        }
+
+    def _on_send_error(self, exc):
+        with self._count_lock:
+            self.errors += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            topic, event = item
+            try:
+                self.producer.send(topic, event).add_errback(self._on_send_error)
+                self.published += 1
+            except Exception as e:
+                with self._count_lock:
+                    self.errors += 1
+                print(f"Failed to publish event: {e}")
+
+    def _spill(self, topic, event):
+        with self._spill_lock:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'topic': topic, 'event': event}) + '\n')
+            self.spilled += 1
+
+    def _replay_spill(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        with self._spill_lock:
+            replay_path = self.spill_path + '.replay'
+            os.replace(self.spill_path, replay_path)
+        with open(replay_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    spilled = json.loads(line)
+                    self.publish(spilled['topic'], spilled['event'])
+        os.remove(replay_path)
@@ -0,0 +1,129 @@
+"""
+FraudGuard ML Service - Production Serving (gunicorn)
+======================================================
+Pre-fork multi-process serving for app_enhanced:
+- The model, scaler and compiled trees are loaded once in the master
+  (preload_app); workers are forked from it and share those pages
+  copy-on-write. The heap is gc.freeze()d before forking so the cyclic
+  garbage collector does not touch (and copy) the shared objects
+- One worker per available core by default (WEB_CONCURRENCY overrides),
+  each with WORKER_THREADS request threads and single-threaded model
+  inference so workers do not oversubscribe the cores
+- A shared-memory block sliced into one scoring buffer per worker, used
+  as the worker's request-coalescer batch buffer
+- Kafka, Redis, coalescer and metrics threads start in each worker
+  (post_fork); metrics are aggregated across workers on scrape, and the
+  counters of a worker that exits are archived by the master (child_exit)
+
+Usage:
+    gunicorn --config src/gunicorn_conf.py
+"""
+
+import gc
+import glob
+import os
+import sys
+import tempfile
+from multiprocessing import shared_memory
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SRC_DIR)
+
+from features import FEATURE_COUNT
+
+
+def _available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Must be set before the app (and the model's OpenMP runtime) is loaded
+os.environ.setdefault('OMP_NUM_THREADS', os.getenv('MODEL_THREADS', '1'))
+os.environ.setdefault('WORKER_THREADS', '4')
+os.environ.setdefault('METRICS_MULTIPROC_DIR', tempfile.mkdtemp(prefix='fraudguard-metrics-'))
+
+# ============================================================================
+# SERVER SETTINGS
+# ============================================================================
+wsgi_app = os.getenv('APP_MODULE', 'app_enhanced:app')
+chdir = SRC_DIR
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', _available_cores()))
+worker_class = 'gthread'
+threads = int(os.environ['WORKER_THREADS'])
+preload_app = True
+timeout = int(os.getenv('WORKER_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('WORKER_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('KEEPALIVE_SECONDS', 5))
+backlog = int(os.getenv('LISTEN_BACKLOG', 2048))
+
+# ============================================================================
+# SHARED SCORING BUFFERS
+# ============================================================================
+SCORING_SLOT_ROWS = int(os.getenv('COALESCER_MAX_BATCH', 64))
+SCORING_SLOT_BYTES = SCORING_SLOT_ROWS * FEATURE_COUNT * 4  # float32
+scoring_memory = None
+
+
+def _app_module():
+    return sys.modules.get(wsgi_app.split(':')[0])
+
+
+def on_starting(server):
+    # Drop metric snapshots and the archive left behind by a previous run in the same directory
+    for path in glob.glob(os.path.join(os.environ['METRICS_MULTIPROC_DIR'], 'metrics-*.json')):
+        os.remove(path)
+
+
+def when_ready(server):
+    """Runs in the master once the app is preloaded, before any worker forks"""
+    global scoring_memory
+    scoring_memory = shared_memory.SharedMemory(create=True,
+                                                size=SCORING_SLOT_BYTES * server.num_workers)
+
+    # Move everything loaded so far out of the collector's reach
+    gc.collect()
+    gc.freeze()
+    server.log.info("Preloaded app frozen for copy-on-write; %d scoring slots of %d bytes",
+                    server.num_workers, SCORING_SLOT_BYTES)
+
+
+def pre_fork(server, worker):
+    """Runs in the master: give the new worker a scoring slot no live worker holds"""
+    used = {getattr(w, 'scoring_slot', None) for w in server.WORKERS.values()}
+    slots = scoring_memory.size // SCORING_SLOT_BYTES
+    worker.scoring_slot = next((slot for slot in range(slots) if slot not in used), None)
+
+
+def post_fork(server, worker):
+    """Runs in the worker: start its threads and connections"""
+    module = _app_module()
+    if module is None or not hasattr(module, 'init_services'):
+        return
+
+    scoring_buffer = None
+    if worker.scoring_slot is not None:
+        import numpy as np
+        scoring_buffer = np.ndarray((SCORING_SLOT_ROWS, FEATURE_COUNT), dtype=np.float32,
+                                    buffer=scoring_memory.buf,
+                                    offset=worker.scoring_slot * SCORING_SLOT_BYTES)
+    module.init_services(scoring_buffer)
+
+
+def child_exit(server, worker):
+    """Runs in the master when a worker exits: fold its metric snapshot into the archive"""
+    module = _app_module()
+    if module is None or not hasattr(module, 'registry'):
+        return
+    try:
+        module.registry.archive_process(os.environ['METRICS_MULTIPROC_DIR'], worker.pid)
+    except OSError as e:
+        server.log.warning("Could not archive the metrics of worker %s: %s", worker.pid, e)
+
+
+def on_exit(server):
+    if scoring_memory is not None:
+        scoring_memory.close()
+        scoring_memory.unlink()
@@ -0,0 +1,438 @@
+"""
+FraudGuard Metrics
+==================
+Low-overhead metrics with Prometheus text exposition:
+- Counters and fixed-bucket histograms recorded into per-thread shards, so
+  request threads never contend on a lock or lose updates; shards are
+  merged when metrics are collected
+- Callback metrics evaluated at collection time (queue sizes, cache stats)
+- Optional aggregation across worker processes (e.g. gunicorn) through
+  per-process snapshot files in a shared directory, named by PID and a
+  per-process start token so a recycled PID never overwrites a dead
+  worker's file; the parent folds the counters of exited workers into an
+  archive file (archive_process)
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Dead-thread shards are folded away once this many shards are registered
+_SHARD_SWEEP_THRESHOLD = 256
+
+# Multiprocess files: metrics-<pid>-<token>.json per process, and the
+# archive of exited processes
+SNAPSHOT_PREFIX = 'metrics-'
+ARCHIVE_FILE = 'metrics-archive.json'
+# Snapshot file names the archive remembers having absorbed
+_ARCHIVE_ABSORBED_NAMES = 1024
+
+
+class _Shard:
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+
+class _BoundCounter:
+    __slots__ = ('_registry', '_local', '_key')
+
+    def __init__(self, registry, key):
+        self._registry = registry
+        self._local = registry._local
+        self._key = key
+
+    def inc(self, amount=1):
+        try:
+            counters = self._local.shard.counters
+        except AttributeError:
+            counters = self._registry._new_shard().counters
+        key = self._key
+        counters[key] = counters.get(key, 0) + amount
+
+
+class _BoundHistogram:
+    __slots__ = ('_registry', '_local', '_key', '_buckets')
+
+    def __init__(self, registry, key, buckets):
+        self._registry = registry
+        self._local = registry._local
+        self._key = key
+        self._buckets = buckets
+
+    def observe(self, value):
+        try:
+            histograms = self._local.shard.histograms
+        except AttributeError:
+            histograms = self._registry._new_shard().histograms
+        series = histograms.get(self._key)
+        if series is None:
+            # One slot per bucket, one for +Inf, then the running sum
+            series = histograms[self._key] = [0] * (len(self._buckets) + 2)
+        series[bisect_left(self._buckets, value)] += 1
+        series[-1] += value
+
+
+class _Metric:
+    def __init__(self, registry, name, kind, help_text, labelnames, buckets=None):
+        self.registry = registry
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+        self._children = {}
+        self._unlabeled = None
+
+    def labels(self, *values):
+        """Return the child series for these label values (cache it on hot paths)"""
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            key = (self.name, values)
+            if self.kind == COUNTER:
+                child = _BoundCounter(self.registry, key)
+            else:
+                child = _BoundHistogram(self.registry, key, self.buckets)
+            self._children[values] = child
+        return child
+
+    def inc(self, amount=1):
+        (self._unlabeled or self._unlabeled_child()).inc(amount)
+
+    def observe(self, value):
+        (self._unlabeled or self._unlabeled_child()).observe(value)
+
+    def _unlabeled_child(self):
+        self._unlabeled = self.labels()
+        return self._unlabeled
+
+
+class MetricsRegistry:
+    """Registry of counters, histograms and callback metrics"""
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self._metrics = {}
+        self._callbacks = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = {'counters': {}, 'histograms': {}}
+        self.multiprocess_dir = None
+        self._snapshot_pid = None
+        self._snapshot_name = None
+
+    # =========================================================================
+    # DEFINITION
+    # =========================================================================
+    def counter(self, name, help_text, labelnames=()):
+        return self._define(_Metric(self, name, COUNTER, help_text, labelnames))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS, labelnames=()):
+        return self._define(_Metric(self, name, HISTOGRAM, help_text, labelnames, buckets))
+
+    def callback(self, name, help_text, fn, kind=GAUGE, labelnames=(), aggregate='sum'):
+        """
+        Metric computed at collection time. fn returns a number, or a
+        {label_values_tuple: number} dict when labelnames are given.
+        aggregate ('sum' or 'max') combines the values of worker processes.
+        """
+        metric = self._define(_Metric(self, name, kind, help_text, labelnames))
+        self._callbacks[name] = (fn, aggregate)
+        return metric
+
+    def _define(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    # =========================================================================
+    # SHARDS
+    # =========================================================================
+    def _new_shard(self):
+        shard = _Shard()
+        self._local.shard = shard
+        with self._lock:
+            self._shards.append((threading.current_thread(), shard))
+            if len(self._shards) > _SHARD_SWEEP_THRESHOLD:
+                self._sweep()
+        return shard
+
+    def _sweep(self):
+        """Fold the shards of finished threads into the retired totals"""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                _merge_into(self._retired, {'counters': dict(shard.counters),
+                                            'histograms': dict(shard.histograms)})
+        self._shards = alive
+
+    # =========================================================================
+    # COLLECTION
+    # =========================================================================
+    def snapshot(self):
+        """Merged values of this process: counters, histograms and callbacks"""
+        with self._lock:
+            self._sweep()
+            merged = {'counters': dict(self._retired['counters']),
+                      'histograms': {k: list(v) for k, v in self._retired['histograms'].items()}}
+            for _, shard in self._shards:
+                _merge_into(merged, {'counters': dict(shard.counters),
+                                     'histograms': dict(shard.histograms)})
+
+        callbacks = {}
+        for name, (fn, _) in self._callbacks.items():
+            try:
+                value = fn()
+            except Exception:
+                continue
+            if isinstance(value, dict):
+                for labels, v in value.items():
+                    callbacks[(name, tuple(str(l) for l in labels))] = v
+            elif value is not None:
+                callbacks[(name, ())] = value
+        merged['callbacks'] = callbacks
+        return merged
+
+    def collect(self):
+        """
+        Snapshot aggregated over all worker processes when multiprocess
+        mode is enabled, otherwise this process's snapshot.
+        """
+        if not self.multiprocess_dir:
+            return self.snapshot()
+
+        self.write_snapshot()
+        snapshots = {}
+        for filename in os.listdir(self.multiprocess_dir):
+            if _snapshot_pid(filename) is None:
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, filename)) as f:
+                    snapshots[filename] = _decode(json.load(f))
+            except (OSError, ValueError):
+                continue
+        # Read after the snapshots: the parent writes the archive before
+        # removing the files it absorbed, so a file is counted either here
+        # or in the archive, never in both or neither
+        absorbed, merged = _read_archive(self.multiprocess_dir)
+        absorbed = set(absorbed)
+        for filename, snapshot in snapshots.items():
+            if filename in absorbed:
+                continue
+            # Counters of exited workers are kept; point-in-time values are not
+            if not _pid_alive(_snapshot_pid(filename)):
+                snapshot['callbacks'] = self._counter_callbacks(snapshot['callbacks'])
+            self._merge_snapshot(merged, snapshot)
+        return merged
+
+    def archive_process(self, directory, pid):
+        """
+        Fold the snapshot files of an exited process into the archive
+        (counters, histograms and counter callbacks; point-in-time values
+        are dropped), then remove them. Runs in the parent process only
+        (gunicorn's child_exit), the archive's single writer.
+        """
+        names = [filename for filename in os.listdir(directory) if _snapshot_pid(filename) == pid]
+        if not names:
+            return
+        absorbed, archive = _read_archive(directory)
+        for filename in names:
+            try:
+                with open(os.path.join(directory, filename)) as f:
+                    snapshot = _decode(json.load(f))
+            except (OSError, ValueError):
+                continue
+            snapshot['callbacks'] = self._counter_callbacks(snapshot['callbacks'])
+            self._merge_snapshot(archive, snapshot)
+            absorbed.append(filename)
+
+        path = os.path.join(directory, ARCHIVE_FILE)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump({'absorbed': absorbed[-_ARCHIVE_ABSORBED_NAMES:], 'snapshot': _encode(archive)}, f)
+        os.replace(f'{path}.tmp', path)
+        for filename in os.listdir(directory):
+            if filename.startswith(f'{SNAPSHOT_PREFIX}{pid}-'):
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except OSError:
+                    pass
+
+    def _counter_callbacks(self, callbacks):
+        return {key: value for key, value in callbacks.items()
+                if key[0] in self._metrics and self._metrics[key[0]].kind == COUNTER}
+
+    def _merge_snapshot(self, merged, snapshot):
+        _merge_into(merged, snapshot)
+        for key, value in snapshot['callbacks'].items():
+            existing = merged['callbacks'].get(key)
+            if existing is None:
+                merged['callbacks'][key] = value
+            elif key[0] in self._callbacks and self._callbacks[key[0]][1] == 'max':
+                merged['callbacks'][key] = max(existing, value)
+            else:
+                merged['callbacks'][key] = existing + value
+
+    def enable_multiprocess(self, directory, interval=5.0):
+        """Publish this process's snapshot to directory every interval seconds"""
+        os.makedirs(directory, exist_ok=True)
+        self.multiprocess_dir = directory
+
+        def flush_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_snapshot()
+                except OSError:
+                    pass
+
+        threading.Thread(target=flush_loop, name='metrics-flusher', daemon=True).start()
+
+    def write_snapshot(self):
+        if self._snapshot_pid != os.getpid():
+            # New process (or forked since): a name no earlier process used
+            self._snapshot_pid = os.getpid()
+            self._snapshot_name = f'{SNAPSHOT_PREFIX}{self._snapshot_pid}-{os.urandom(4).hex()}.json'
+        path = os.path.join(self.multiprocess_dir, self._snapshot_name)
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(_encode(self.snapshot()), f)
+        os.replace(temp_path, path)
+
+    # =========================================================================
+    # EXPOSITION
+    # =========================================================================
+    def render_prometheus(self, snapshot=None):
+        """Prometheus text exposition format (version 0.0.4)"""
+        snapshot = snapshot or self.collect()
+        lines = []
+        for metric in self._metrics.values():
+            full_name = f'{self.namespace}_{metric.name}'
+            lines.append(f'# HELP {full_name} {metric.help}')
+            lines.append(f'# TYPE {full_name} {metric.kind}')
+
+            if metric.name in self._callbacks:
+                source = snapshot['callbacks']
+            elif metric.kind == COUNTER:
+                source = snapshot['counters']
+            else:
+                source = snapshot['histograms']
+            series = sorted((key, value) for key, value in source.items() if key[0] == metric.name)
+            if not series and not metric.labelnames and metric.kind == COUNTER:
+                series = [((metric.name, ()), 0)]
+
+            for (_, label_values), value in series:
+                labels = list(zip(metric.labelnames, label_values))
+                if metric.kind != HISTOGRAM:
+                    lines.append(f'{full_name}{_format_labels(labels)} {_format_value(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + ('+Inf',), value[:-1]):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else _format_value(bound)
+                    lines.append(f'{full_name}_bucket{_format_labels(labels + [("le", le)])} {cumulative}')
+                lines.append(f'{full_name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+                lines.append(f'{full_name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def histogram_quantile(self, snapshot, name, quantile, labels=()):
+        """Estimate a quantile from histogram buckets (linear within a bucket)"""
+        series = snapshot['histograms'].get((name, tuple(labels)))
+        if not series:
+            return None
+        buckets = self._metrics[name].buckets
+        counts = series[:-1]
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank = quantile * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count > 0:
+                if i == len(buckets):
+                    return buckets[-1]
+                lower = buckets[i - 1] if i > 0 else 0.0
+                return lower + (buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return buckets[-1]
+
+
+def _merge_into(target, source):
+    counters = target['counters']
+    for key, value in source['counters'].items():
+        counters[key] = counters.get(key, 0) + value
+    histograms = target['histograms']
+    for key, series in source['histograms'].items():
+        existing = histograms.get(key)
+        if existing is None:
+            histograms[key] = list(series)
+        else:
+            for i, value in enumerate(series):
+                existing[i] += value
+
+
+def _encode(snapshot):
+    return {section: [[name, list(labels), value] for (name, labels), value in values.items()]
+            for section, values in snapshot.items()}
+
+
+def _decode(data):
+    return {section: {(name, tuple(labels)): value for name, labels, value in values}
+            for section, values in data.items()}
+
+
+def _snapshot_pid(filename):
+    """PID of a metrics-<pid>-<token>.json snapshot file name, None for other files"""
+    if not (filename.startswith(SNAPSHOT_PREFIX) and filename.endswith('.json')):
+        return None
+    try:
+        return int(filename[len(SNAPSHOT_PREFIX):-len('.json')].split('-')[0])
+    except ValueError:
+        return None
+
+
+def _read_archive(directory):
+    """(absorbed snapshot file names, merged snapshot) of the archive, empty when there is none"""
+    try:
+        with open(os.path.join(directory, ARCHIVE_FILE)) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return [], {'counters': {}, 'histograms': {}, 'callbacks': {}}
+    return data['absorbed'], _decode(data['snapshot'])
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = ('{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"')
+                                .replace('\n', r'\n')) for name, value in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
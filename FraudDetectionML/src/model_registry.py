@@ -0,0 +1,565 @@
+"""
+FraudGuard Model Registry
+=========================
+Versioned model artifacts and hot reloading:
+- One directory per version under the registry root, holding the model
+  artifacts and manifest.json (version, decision threshold, amount scaler
+  parameters, feature names, evaluation metrics)
+- A lean artifact format: the native booster JSON (or, for non-XGBoost
+  models, the compiled flat arrays) described by manifest.json, loaded
+  without unpickling or importing sklearn (nor xgboost with
+  INFERENCE_BACKEND=compiled)
+- A CURRENT file naming the active version, replaced atomically
+- ModelManager, which loads a version in the background, warms it up and
+  swaps it in with a single reference assignment
+- An optional challenger version (CHALLENGER file) that receives a share of
+  the /predict traffic and shadow-scores a sample of the rest
+
+Layout:
+    registry/
+        CURRENT                     active version, e.g. "2.1.0"
+        CHALLENGER                  {"version", "traffic_percent", "shadow_percent"}
+        2.1.0/
+            manifest.json
+            fraud_model.json           lean artifact (booster JSON)
+            fraud_model.pkl            pickled model and scaler (optional
+            scaler.pkl                 once the lean artifact exists)
+            fraud_model_compiled.npz   (optional, INFERENCE_BACKEND=compiled)
+
+Without a registry the flat model directory (fraud_model.pkl, scaler.pkl,
+fraud_model_threshold.pkl, and manifest.json + fraud_model.json when the
+training scripts wrote a lean artifact) is served as a single legacy
+version.
+
+MODEL_FORMAT picks the artifact: auto (lean when present, else pickle),
+lean or pickle. Lean XGBoost artifacts are loaded into the native
+xgboost booster, the fastest path for batches (/predict/batch, coalesced
+and Kafka batches). INFERENCE_BACKEND=compiled scores the same booster
+JSON with the NumPy compiled tree engine instead: no xgboost import at
+startup and faster single rows, but several times slower on batches.
+
+Usage:
+    python model_registry.py publish --from ../models --version 2.1.0 --activate
+    python model_registry.py activate 2.0.0
+    python model_registry.py challenger 2.2.0 --traffic 10 --shadow 50
+    python model_registry.py challenger --clear
+    python model_registry.py list
+"""
+
+import json
+import os
+import random
+import shutil
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from features import FeatureBuilder, FEATURE_NAMES, FEATURE_COUNT, feature_digest
+from scoring import InferenceEngine, load_threshold, score
+from tree_compiler import CompiledTreeEnsemble, compile_model, compile_xgboost_json
+
+MODEL_FILE = 'fraud_model.pkl'
+SCALER_FILE = 'scaler.pkl'
+COMPILED_FILE = 'fraud_model_compiled.npz'
+BOOSTER_FILE = 'fraud_model.json'
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+CHALLENGER_FILE = 'CHALLENGER'
+ARTIFACT_FILES = (MODEL_FILE, SCALER_FILE, COMPILED_FILE, BOOSTER_FILE)
+
+FORMAT_AUTO = 'auto'
+FORMAT_LEAN = 'lean'
+FORMAT_PICKLE = 'pickle'
+# Lean model files: native booster JSON, or CompiledTreeEnsemble arrays
+LEAN_XGBOOST_JSON = 'xgboost-json'
+LEAN_COMPILED_NPZ = 'compiled-npz'
+
+# Batch sizes scored during warm-up: a single row and a coalesced batch
+WARMUP_BATCH_SIZES = (1, 64)
+WARMUP_ROUNDS = 3
+
+
+class ModelBundle:
+    """Everything needed to score with one model version"""
+
+    def __init__(self, version, feature_builder, threshold, engine, model_type,
+                 feature_names=None, metrics=None, path=None, artifact=FORMAT_PICKLE):
+        feature_names = list(feature_names or FEATURE_NAMES)
+        if feature_names != FEATURE_NAMES:
+            raise ValueError(f"Model {version} expects features {feature_names}, "
+                             f"the service builds {FEATURE_NAMES}")
+        self.version = version
+        self.feature_builder = feature_builder
+        self.threshold = threshold
+        self.engine = engine
+        self.model_type = model_type
+        self.feature_names = feature_names
+        self.metrics = metrics or {}
+        self.path = path
+        self.artifact = artifact
+        self.loaded_at = datetime.utcnow()
+        self.warmup_ms = None
+        # on_score(version, traffic, rows, seconds), set once the bundle serves
+        self.on_score = None
+
+    def score(self, X, traffic='live'):
+        """(probabilities, is_fraud) for a feature matrix"""
+        if self.on_score is None:
+            return score(self.engine, X, self.threshold)
+        started_at = time.perf_counter()
+        result = score(self.engine, X, self.threshold)
+        self.on_score(self.version, traffic, len(X), time.perf_counter() - started_at)
+        return result
+
+    def cache_key(self, X):
+        """Prediction cache key: the feature digest, scoped to this version"""
+        return f"{self.version}:{feature_digest(X)}"
+
+    def warm_up(self):
+        """
+        Score a few synthetic batches so lazy initialisation (booster
+        thread pools, first allocations) happens before the bundle serves
+        traffic, and reject models that do not produce probabilities.
+        """
+        started_at = time.perf_counter()
+        rng = np.random.default_rng(0)
+        for _ in range(WARMUP_ROUNDS):
+            for rows in WARMUP_BATCH_SIZES:
+                X = rng.normal(0, 1, (rows, FEATURE_COUNT)).astype(np.float32)
+                probabilities, _ = self.score(X)
+                if len(probabilities) != rows or not np.all((probabilities >= 0) & (probabilities <= 1)):
+                    raise ValueError(f"Model {self.version} returned invalid probabilities during warm-up")
+        self.warmup_ms = (time.perf_counter() - started_at) * 1000
+        return self.warmup_ms
+
+    def describe(self):
+        return {
+            "model_type": self.model_type,
+            "model_version": self.version,
+            "artifact": self.artifact,
+            "decision_threshold": self.threshold,
+            "inference_path": self.engine.path,
+            "features_expected": FEATURE_COUNT,
+            "feature_names": self.feature_names,
+            "metrics": self.metrics,
+            "source": self.path,
+            "loaded_at": self.loaded_at.isoformat(),
+            "warmup_ms": round(self.warmup_ms, 2) if self.warmup_ms is not None else None
+        }
+
+
+def export_lean_artifact(model, scaler, threshold, output_dir, metrics=None):
+    """
+    Write the lean artifact of a trained model into output_dir: the native
+    booster JSON for XGBoost models (the compiled flat arrays otherwise)
+    and manifest.json with the threshold and the amount scaler's (mean,
+    scale), so the service needs neither pickle nor sklearn to load it.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if hasattr(model, 'get_booster'):
+        model_file, model_format = BOOSTER_FILE, LEAN_XGBOOST_JSON
+        model.get_booster().save_model(os.path.join(output_dir, model_file))
+    else:
+        model_file, model_format = COMPILED_FILE, LEAN_COMPILED_NPZ
+        compile_model(model).save(os.path.join(output_dir, model_file))
+
+    feature_builder = FeatureBuilder.from_scaler(scaler)
+    manifest = {
+        "model_file": model_file,
+        "model_format": model_format,
+        "model_type": type(model).__name__,
+        "threshold": float(threshold),
+        "amount_scaler": {"mean": feature_builder.amount_mean, "scale": feature_builder.amount_scale},
+        "feature_names": FEATURE_NAMES,
+        "metrics": metrics or {},
+        "created_at": datetime.utcnow().isoformat()
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"💾 Lean model artifact saved: {os.path.join(output_dir, model_file)} + {manifest_path}")
+    return manifest_path
+
+
+def read_manifest(path):
+    """manifest.json of a model directory, or None"""
+    try:
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _bucket(digest, offset):
+    """Stable value in [0, 10000) from eight hex digits of a feature digest"""
+    return int(digest[offset:offset + 8], 16) % 10000
+
+
+class Experiment:
+    """
+    A challenger bundle with the percentage of /predict traffic it serves
+    and the percentage of champion-scored rows it shadow-scores.
+
+    Routing hashes the transaction's feature digest, so a transaction is
+    always served by the same model while the split is unchanged.
+    """
+
+    def __init__(self, bundle, traffic_percent=0.0, shadow_percent=0.0):
+        for name, value in (('traffic_percent', traffic_percent), ('shadow_percent', shadow_percent)):
+            if not 0 <= value <= 100:
+                raise ValueError(f"{name} must be between 0 and 100, got {value}")
+        self.bundle = bundle
+        self.traffic_percent = float(traffic_percent)
+        self.shadow_percent = float(shadow_percent)
+        self._traffic_cutoff = self.traffic_percent * 100
+        self._shadow_rate = self.shadow_percent / 100
+
+    def routes(self, digest):
+        """Whether the challenger serves the transaction with this digest"""
+        return _bucket(digest, 0) < self._traffic_cutoff
+
+    def shadow_sample(self, X, probabilities, is_fraud):
+        """
+        Sample the rows of a champion-scored batch to shadow. Returns
+        copies (X, probabilities, is_fraud) of the sampled rows, or None.
+        """
+        if len(X) == 1:
+            if random.random() >= self._shadow_rate:
+                return None
+            return X.copy(), probabilities, is_fraud
+        mask = np.random.random(len(X)) < self._shadow_rate
+        if not mask.any():
+            return None
+        return X[mask], np.asarray(probabilities)[mask], np.asarray(is_fraud)[mask]
+
+    def describe(self):
+        return {
+            "version": self.bundle.version,
+            "traffic_percent": self.traffic_percent,
+            "shadow_percent": self.shadow_percent,
+            "loaded_at": self.bundle.loaded_at.isoformat()
+        }
+
+
+class ModelRegistry:
+    """
+    Versioned model directories under root. legacy_dir/legacy_version
+    describe the flat model directory served while the registry is empty.
+    """
+
+    def __init__(self, root, legacy_dir=None, legacy_version='2.0.0', model_format=FORMAT_AUTO):
+        if model_format not in (FORMAT_AUTO, FORMAT_LEAN, FORMAT_PICKLE):
+            raise ValueError(f"Unknown model format: {model_format}")
+        self.root = root
+        self.legacy_dir = legacy_dir
+        self.legacy_version = legacy_version
+        self.model_format = model_format
+
+    def version_dir(self, version):
+        if not version or os.sep in version or version.startswith('.') or version in (CURRENT_FILE, CHALLENGER_FILE):
+            raise ValueError(f"Invalid model version {version!r}")
+        return os.path.join(self.root, version)
+
+    def list_versions(self):
+        """Published versions, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        versions = [name for name in os.listdir(self.root)
+                    if os.path.exists(os.path.join(self.root, name, MANIFEST_FILE))]
+        return sorted(versions, key=lambda name: os.path.getmtime(os.path.join(self.root, name, MANIFEST_FILE)))
+
+    def active_version(self):
+        """Version named by CURRENT, or the legacy version when there is none"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or self.legacy_version
+        except FileNotFoundError:
+            return self.legacy_version
+
+    def is_published(self, version):
+        return os.path.exists(os.path.join(self.version_dir(version), MANIFEST_FILE))
+
+    def activate(self, version):
+        """Point CURRENT at a published version (atomic rename)"""
+        if not self.is_published(version):
+            raise KeyError(f"Model version {version} is not published in {self.root}")
+        self._write_atomic(CURRENT_FILE, version + '\n')
+
+    def challenger_config(self):
+        """{"version", "traffic_percent", "shadow_percent"} from CHALLENGER, or None"""
+        try:
+            with open(os.path.join(self.root, CHALLENGER_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def set_challenger(self, version, traffic_percent=0.0, shadow_percent=0.0):
+        """Write CHALLENGER (atomic rename); version None removes the challenger"""
+        if version is None:
+            try:
+                os.remove(os.path.join(self.root, CHALLENGER_FILE))
+            except FileNotFoundError:
+                pass
+            return
+        if not self.is_published(version):
+            raise KeyError(f"Model version {version} is not published in {self.root}")
+        for name, value in (('traffic_percent', traffic_percent), ('shadow_percent', shadow_percent)):
+            if not 0 <= value <= 100:
+                raise ValueError(f"{name} must be between 0 and 100, got {value}")
+        self._write_atomic(CHALLENGER_FILE, json.dumps({
+            "version": version,
+            "traffic_percent": float(traffic_percent),
+            "shadow_percent": float(shadow_percent)
+        }))
+
+    def _write_atomic(self, name, text):
+        tmp_path = os.path.join(self.root, f'.{name}.{os.getpid()}')
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, os.path.join(self.root, name))
+
+    def publish(self, version, source_dir, metrics=None, activate=False):
+        """
+        Copy the artifacts of a flat model directory (train_improved.py
+        output) into a new version directory. The source manifest (lean
+        artifact) is kept and extended with the version. The directory is
+        assembled under a temporary name and renamed into place, so
+        watchers never see a partial version.
+        """
+        target = self.version_dir(version)
+        if os.path.exists(target):
+            raise FileExistsError(f"Model version {version} already exists in {self.root}")
+        staging = os.path.join(self.root, f'.staging-{version}-{os.getpid()}')
+        os.makedirs(staging)
+        try:
+            for name in ARTIFACT_FILES:
+                if os.path.exists(os.path.join(source_dir, name)):
+                    shutil.copy2(os.path.join(source_dir, name), os.path.join(staging, name))
+            manifest = read_manifest(source_dir) or {
+                "threshold": load_threshold(os.path.join(source_dir, MODEL_FILE)),
+                "feature_names": FEATURE_NAMES
+            }
+            manifest.update({"version": version, "created_at": datetime.utcnow().isoformat()})
+            if metrics:
+                manifest["metrics"] = metrics
+            with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.rename(staging, target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if activate:
+            self.activate(version)
+        return target
+
+    def load(self, version=None, backend='auto'):
+        """Load a version (default: the active one) into a ModelBundle"""
+        version = version or self.active_version()
+        if version == self.legacy_version and not os.path.exists(
+                os.path.join(self.root, version, MANIFEST_FILE)):
+            return self._load_dir(self.legacy_dir, version, backend, read_manifest(self.legacy_dir))
+
+        path = self.version_dir(version)
+        manifest = read_manifest(path)
+        if manifest is None:
+            raise KeyError(f"Model version {version} is not published in {self.root}")
+        return self._load_dir(path, version, backend, manifest)
+
+    def _load_dir(self, path, version, backend, manifest):
+        lean = (manifest is not None and 'model_file' in manifest
+                and os.path.exists(os.path.join(path, manifest['model_file'])))
+        if self.model_format == FORMAT_LEAN and not lean:
+            raise FileNotFoundError(f"No lean model artifact in {path}")
+        if lean and self.model_format != FORMAT_PICKLE:
+            return self._load_lean(path, version, backend, manifest)
+        return self._load_pickle(path, version, backend, manifest)
+
+    def _load_lean(self, path, version, backend, manifest):
+        model_path = os.path.join(path, manifest['model_file'])
+        if manifest['model_format'] == LEAN_XGBOOST_JSON and backend == 'compiled':
+            with open(model_path) as f:
+                engine = InferenceEngine(None, compile_xgboost_json(json.load(f)))
+        elif manifest['model_format'] == LEAN_XGBOOST_JSON:
+            import xgboost
+            engine = InferenceEngine(xgboost.Booster(model_file=model_path))
+        elif manifest['model_format'] == LEAN_COMPILED_NPZ:
+            engine = InferenceEngine(None, CompiledTreeEnsemble.load(model_path))
+        else:
+            raise ValueError(f"Unknown lean model format: {manifest['model_format']}")
+        scaler = manifest['amount_scaler']
+        return ModelBundle(version, FeatureBuilder(scaler['mean'], scaler['scale']),
+                           float(manifest['threshold']), engine, manifest.get('model_type'),
+                           feature_names=manifest.get('feature_names'),
+                           metrics=manifest.get('metrics'), path=path, artifact=FORMAT_LEAN)
+
+    def _load_pickle(self, path, version, backend, manifest):
+        import joblib
+        model_path = os.path.join(path, MODEL_FILE)
+        model = joblib.load(model_path)
+        scaler = joblib.load(os.path.join(path, SCALER_FILE))
+        compiled = None
+        if backend == 'compiled':
+            compiled = CompiledTreeEnsemble.load(os.path.join(path, COMPILED_FILE))
+        threshold = manifest['threshold'] if manifest else load_threshold(model_path)
+        return ModelBundle(version, FeatureBuilder.from_scaler(scaler), float(threshold),
+                           InferenceEngine(model, compiled), type(model).__name__,
+                           feature_names=(manifest or {}).get('feature_names'),
+                           metrics=(manifest or {}).get('metrics'), path=path)
+
+
+class ModelManager:
+    """
+    Holds the bundles being served and replaces them without a restart.
+
+    Request handlers read `current` (the champion) or the result of
+    route() once and use that bundle for the whole request, so a swap
+    never mixes two models inside one response, and requests already in
+    flight finish on the old version. A new version is loaded and warmed
+    up before the swap; if either step fails the old version keeps
+    serving. `experiment` holds the challenger, if any.
+    """
+
+    def __init__(self, registry, backend='auto', on_swap=None, on_score=None):
+        self.registry = registry
+        self.backend = backend
+        self.on_swap = on_swap
+        self.on_score = on_score
+        self.current = None
+        self.experiment = None
+        self._challenger_config = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_event = threading.Event()
+
+    @property
+    def loaded(self):
+        return self.current is not None
+
+    def _load(self, version):
+        bundle = self.registry.load(version, self.backend)
+        bundle.warm_up()
+        bundle.on_score = self.on_score
+        return bundle
+
+    def reload(self, version=None):
+        """Load, warm up and swap in a version; returns (previous, new) bundles"""
+        with self._reload_lock:
+            bundle = self._load(version)
+            previous, self.current = self.current, bundle
+        if self.on_swap:
+            self.on_swap(previous, bundle)
+        return previous, bundle
+
+    def reload_challenger(self):
+        """Apply the registry's CHALLENGER settings; returns the Experiment or None"""
+        with self._reload_lock:
+            config = self.registry.challenger_config()
+            experiment = None
+            if config is not None:
+                version = config['version']
+                if self.experiment is not None and self.experiment.bundle.version == version:
+                    bundle = self.experiment.bundle
+                elif self.current is not None and self.current.version == version:
+                    bundle = self.current
+                else:
+                    bundle = self._load(version)
+                experiment = Experiment(bundle, config.get('traffic_percent', 0),
+                                        config.get('shadow_percent', 0))
+            self.experiment = experiment
+            self._challenger_config = config
+        return experiment
+
+    def route(self, digest):
+        """Bundle serving the transaction with this (champion) feature digest"""
+        experiment = self.experiment
+        if experiment is not None and experiment.routes(digest):
+            return experiment.bundle
+        return self.current
+
+    def start_watcher(self, interval):
+        """Poll CURRENT every interval seconds and reload when it changes"""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,),
+                                         name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop_event.set()
+
+    def _watch(self, interval):
+        failed_version = None
+        failed_challenger = None
+        while not self._stop_event.wait(interval):
+            version = self.registry.active_version()
+            if (self.current is None or version != self.current.version) and version != failed_version:
+                try:
+                    self.reload(version)
+                    failed_version = None
+                except Exception as e:
+                    # Retried only once CURRENT changes again
+                    failed_version = version
+                    print(f"⚠️ Model reload to {version} failed, keeping "
+                          f"{self.current.version if self.current else 'no model'}: {e}")
+
+            config = self.registry.challenger_config()
+            if config != self._challenger_config and config != failed_challenger:
+                try:
+                    self.reload_challenger()
+                    failed_challenger = None
+                except Exception as e:
+                    failed_challenger = config
+                    print(f"⚠️ Challenger update to {config} failed: {e}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='FraudGuard model registry')
+    parser.add_argument('--registry', type=str,
+                        default=os.getenv('MODEL_REGISTRY_DIR', os.path.join('..', 'models', 'registry')),
+                        help='Registry directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    publish = commands.add_parser('publish', help='Publish a flat model directory as a new version')
+    publish.add_argument('--from', dest='source', type=str, default=os.path.join('..', 'models'),
+                         help='Directory holding fraud_model.pkl and scaler.pkl')
+    publish.add_argument('--version', type=str, required=True, help='Version name')
+    publish.add_argument('--metrics', type=str, default=None, help='JSON file of evaluation metrics')
+    publish.add_argument('--activate', action='store_true', help='Make it the active version')
+    activate = commands.add_parser('activate', help='Make a published version active')
+    activate.add_argument('version', type=str)
+    challenger = commands.add_parser('challenger', help='Set or clear the challenger version')
+    challenger.add_argument('version', type=str, nargs='?')
+    challenger.add_argument('--traffic', type=float, default=0, help='Percent of /predict traffic it serves')
+    challenger.add_argument('--shadow', type=float, default=0, help='Percent of other rows it shadow-scores')
+    challenger.add_argument('--clear', action='store_true', help='Remove the challenger')
+    commands.add_parser('list', help='List published versions')
+    args = parser.parse_args()
+
+    model_registry = ModelRegistry(args.registry)
+    if args.command == 'publish':
+        metrics = None
+        if args.metrics:
+            with open(args.metrics) as f:
+                metrics = json.load(f)
+        os.makedirs(args.registry, exist_ok=True)
+        path = model_registry.publish(args.version, args.source, metrics, args.activate)
+        print(f"💾 Published model {args.version}: {path}" + (" (active)" if args.activate else ""))
+    elif args.command == 'activate':
+        model_registry.activate(args.version)
+        print(f"✅ Active model version: {args.version}")
+    elif args.command == 'challenger':
+        if args.clear or not args.version:
+            model_registry.set_challenger(None)
+            print("✅ Challenger removed")
+        else:
+            model_registry.set_challenger(args.version, args.traffic, args.shadow)
+            print(f"✅ Challenger {args.version}: {args.traffic}% of traffic, {args.shadow}% shadowed")
+    else:
+        active = model_registry.active_version()
+        challenger = (model_registry.challenger_config() or {}).get('version')
+        for version in model_registry.list_versions():
+            marker = '*' if version == active else 'c' if version == challenger else ' '
+            print(f"{marker} {version}")
@@ -0,0 +1,79 @@
+"""
+FraudGuard Sampling Profiler
+============================
+On-demand, whole-process sampling profiler.
+
+While a profile runs, a background thread snapshots the stack of every
+other thread (sys._current_frames) at a fixed interval and counts
+identical stacks. The result is in the collapsed-stack format consumed by
+flamegraph.pl and speedscope:
+
+    thread;module.py:outer;module.py:inner 42
+
+Nothing is installed or sampled when no profile is running.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_PROFILE_SECONDS = 60
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running"""
+
+
+class SamplingProfiler:
+    """Samples all thread stacks for a bounded duration"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds, interval_ms=5.0):
+        """
+        Sample every thread for `seconds` (at most MAX_PROFILE_SECONDS),
+        blocking the caller. Returns (collapsed_stacks_text, sample_count).
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            seconds = min(max(float(seconds), 0.0), MAX_PROFILE_SECONDS)
+            interval = max(float(interval_ms), 0.5) / 1000.0
+            stacks = Counter()
+            samples = [0]
+            done = threading.Event()
+            sampler = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True,
+                                       args=(stacks, samples, interval, time.monotonic() + seconds, done))
+            sampler.start()
+            done.wait()
+            lines = [f'{stack} {count}' for stack, count in stacks.most_common()]
+            return '\n'.join(lines) + ('\n' if lines else ''), samples[0]
+        finally:
+            self._lock.release()
+
+    def _sample(self, stacks, samples, interval, deadline, done):
+        skipped = {threading.get_ident()}
+        try:
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id in skipped:
+                        continue
+                    stacks[_collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+                samples[0] += 1
+                time.sleep(interval)
+        finally:
+            done.set()
+
+
+def _collapse(thread_name, frame):
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+        frame = frame.f_back
+    frames.append(thread_name.replace(' ', '_'))
+    return ';'.join(reversed(frames))
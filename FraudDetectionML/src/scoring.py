@@ -0,0 +1,106 @@
+"""
+FraudGuard Scoring Core
+=======================
+Model-agnostic scoring helpers shared by the prediction services:
+- Loading the decision threshold tuned during training
+- Computing fraud probabilities with a single model inference, through the
+  native XGBoost booster or a compiled flat-array ensemble when available
+- Deriving the fraud verdict and risk level from those probabilities
+"""
+
+import os
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.5
+
+
+def load_threshold(model_path):
+    """
+    Load the decision threshold saved next to the model.
+
+    ImprovedFraudModelTrainer.save_model writes it as
+    <model>_threshold.pkl; models without one use DEFAULT_THRESHOLD.
+    """
+    threshold_path = model_path.replace('.pkl', '_threshold.pkl')
+    if not os.path.exists(threshold_path):
+        return DEFAULT_THRESHOLD
+    import joblib
+    return float(joblib.load(threshold_path)['threshold'])
+
+
+class InferenceEngine:
+    """
+    Fraud probability inference with the lowest-overhead path available.
+
+    For XGBoost classifiers the underlying booster is pulled out of the
+    sklearn wrapper and scored with inplace_predict on a contiguous float32
+    array, skipping the wrapper's input validation and DMatrix
+    construction; a bare Booster (lean artifact) is scored the same way. Any other model (e.g.
+    the RandomForestClassifier from train.py) goes through the generic
+    predict_proba path. When a CompiledTreeEnsemble (see tree_compiler.py)
+    is given, it is used instead.
+    """
+
+    PATH_NATIVE = 'xgboost-inplace'
+    PATH_COMPILED = 'compiled-trees'
+    PATH_GENERIC = 'predict_proba'
+
+    def __init__(self, model, compiled=None):
+        self.model = model
+        self.compiled = compiled
+        self.booster = None
+        self.iteration_range = (0, 0)
+
+        if compiled is None and hasattr(model, 'inplace_predict'):
+            self.booster = model
+            best_iteration = model.attr('best_iteration')
+            if best_iteration is not None:
+                self.iteration_range = (0, int(best_iteration) + 1)
+        elif compiled is None and getattr(model, 'objective', None) == 'binary:logistic':
+            try:
+                self.booster = model.get_booster()
+            except Exception:
+                self.booster = None
+            else:
+                # Honour early stopping the same way XGBClassifier.predict_proba does
+                best_iteration = getattr(model, 'best_iteration', None)
+                if best_iteration is not None:
+                    self.iteration_range = (0, int(best_iteration) + 1)
+
+        if compiled is not None:
+            self.path = self.PATH_COMPILED
+        elif self.booster is not None:
+            self.path = self.PATH_NATIVE
+        else:
+            self.path = self.PATH_GENERIC
+
+    def predict_proba(self, X):
+        """Return the fraud probability for each row of X"""
+        if self.compiled is not None:
+            return self.compiled.predict_proba(X)
+        if self.booster is not None:
+            X = np.ascontiguousarray(X, dtype=np.float32)
+            return self.booster.inplace_predict(
+                X, iteration_range=self.iteration_range, validate_features=False
+            )
+        return self.model.predict_proba(X)[:, 1]
+
+
+def score(engine, X, threshold=DEFAULT_THRESHOLD):
+    """
+    Score a feature matrix with one inference pass.
+
+    Returns (probabilities, is_fraud) as arrays; the verdict uses the same
+    rule as training (probability >= threshold).
+    """
+    probabilities = engine.predict_proba(X)
+    return probabilities, probabilities >= threshold
+
+
+def get_risk_level(probability):
+    """Map a fraud probability to a risk level"""
+    if probability >= 0.8:
+        return "HIGH"
+    elif probability >= 0.5:
+        return "MEDIUM"
+    return "LOW"
@@ -0,0 +1,111 @@
+"""
+FraudGuard Shadow Scorer
+========================
+Scores a sample of live traffic with a challenger model, off the request
+path.
+
+Request threads hand over rows the champion has already scored together
+with its probabilities; enqueueing never blocks, and rows are dropped
+(counted) when the queue is full. A single background thread collects
+rows for up to max_wait_ms (or max_batch_size rows), scores them with one
+challenger call and reports the per-row score deltas and verdict
+disagreements. Lingering keeps the thread asleep between batches, so it
+competes for CPU with the request threads once per batch rather than
+once per request.
+"""
+
+import queue
+import threading
+import time
+import numpy as np
+
+
+class ShadowScorer:
+    """
+    Background challenger scoring.
+
+    on_result, if given, is called after each batch with the champion and
+    challenger versions, the absolute probability deltas and the number
+    of rows whose fraud verdict differs.
+    """
+
+    def __init__(self, max_queue=1000, max_batch_size=256, max_wait_ms=50.0, on_result=None):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.on_result = on_result
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        # dropped is incremented from request threads
+        self._dropped_lock = threading.Lock()
+        self.scored = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self):
+        """Start the scoring thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='shadow-scorer', daemon=True)
+            self._thread.start()
+
+    def submit(self, champion, challenger, X, probabilities, is_fraud):
+        """
+        Queue champion-scored rows (X must not be reused by the caller) for
+        the challenger. Never waits; returns False if the rows were dropped.
+        """
+        try:
+            self._queue.put_nowait((champion.version, challenger, X, probabilities, is_fraud))
+            return True
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += len(X)
+            return False
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        rows = len(batch[0][2])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[2])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Rows queued around a model swap may target different versions
+            groups = {}
+            for champion_version, challenger, X, probabilities, is_fraud in batch:
+                groups.setdefault((champion_version, challenger), []).append((X, probabilities, is_fraud))
+
+            for (champion_version, challenger), items in groups.items():
+                try:
+                    X = np.concatenate([item[0] for item in items])
+                    probabilities = np.concatenate([np.asarray(item[1], dtype=np.float64) for item in items])
+                    is_fraud = np.concatenate([np.asarray(item[2], dtype=bool) for item in items])
+                    shadow_probabilities, shadow_fraud = challenger.score(X, traffic='shadow')
+                except Exception as e:
+                    self.errors += 1
+                    print(f"⚠️ Shadow scoring with {challenger.version} failed: {e}")
+                    continue
+
+                self.scored += len(X)
+                if self.on_result is not None:
+                    self.on_result(champion_version, challenger.version,
+                                   np.abs(shadow_probabilities - probabilities),
+                                   int(np.count_nonzero(shadow_fraud != is_fraud)))
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'scored': self.scored,
+            'dropped': self.dropped,
+            'errors': self.errors
+        }
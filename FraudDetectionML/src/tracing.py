@@ -0,0 +1,60 @@
+"""
+FraudGuard Request Tracing
+==========================
+Per-stage timing of the hot path with monotonic perf_counter_ns spans:
+- Each request (or Kafka batch) gets a Trace; stages are timed with
+  `with trace.span('model'):` blocks
+- Every finished span is reported to a callback (the stage latency
+  histograms) and kept on the trace for a Server-Timing header or a
+  slow-request log line
+"""
+
+from time import perf_counter_ns
+
+
+class _Span:
+    __slots__ = ('trace', 'stage', 'started_ns')
+
+    def __init__(self, trace, stage):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.started_ns = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.add(self.stage, perf_counter_ns() - self.started_ns)
+        return False
+
+
+class Trace:
+    """Stage timings of one request"""
+
+    __slots__ = ('on_stage', 'started_ns', 'stages')
+
+    def __init__(self, on_stage=None):
+        self.on_stage = on_stage
+        self.started_ns = perf_counter_ns()
+        self.stages = []
+
+    def span(self, stage):
+        """Context manager timing one stage"""
+        return _Span(self, stage)
+
+    def add(self, stage, elapsed_ns):
+        """Record a stage timed elsewhere"""
+        self.stages.append((stage, elapsed_ns))
+        if self.on_stage is not None:
+            self.on_stage(stage, elapsed_ns / 1e9)
+
+    @property
+    def elapsed_ms(self):
+        return (perf_counter_ns() - self.started_ns) / 1e6
+
+    def server_timing(self):
+        """Server-Timing header value, e.g. 'features;dur=0.021, model;dur=0.310'"""
+        return ', '.join(f'{stage};dur={elapsed_ns / 1e6:.3f}' for stage, elapsed_ns in self.stages)
+
+    def summary(self):
+        return ' '.join(f'{stage}={elapsed_ns / 1e6:.3f}ms' for stage, elapsed_ns in self.stages)
@@ -4,7 +4,11 @@ from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
 import joblib
+import os
 from etl import FraudETL
+from tree_compiler import export_compiled_model
+from model_registry import SCALER_FILE, export_lean_artifact
+from scoring import DEFAULT_THRESHOLD
 
 class FraudModelTrainer:
     def __init__(self):
@@ -65,10 +69,18 @@ class FraudModelTrainer:
         
         return roc_auc
     
-    def save_model(self, path='../models/fraud_model.pkl'):
-        """Sauvegarder le modèle"""
+    def save_model(self, path='../models/fraud_model.pkl', X_check=None):
+        """Sauvegarder le modèle (et sa version compilée en tableaux plats)"""
         joblib.dump(self.model, path)
         print(f"\n💾 Modèle sauvegardé : {path}")
+        
+        # Export pour le moteur de scoring NumPy (parité vérifiée sur X_check)
+        export_compiled_model(self.model, path, X_check)
+        
+        # Artefact léger (JSON du booster + manifeste) chargé sans sklearn par le service
+        model_dir = os.path.dirname(path)
+        scaler = joblib.load(os.path.join(model_dir, SCALER_FILE))
+        export_lean_artifact(self.model, scaler, DEFAULT_THRESHOLD, model_dir)
 
 if __name__ == "__main__":
     # 1. ETL
@@ -84,6 +96,6 @@ if __name__ == "__main__":
     
     # 4. Sauvegarde
     if roc_auc > 0.95:  # Seulement si performant
-        trainer.save_model()
+        trainer.save_model(X_check=X_test)
     else:
         print("⚠️ Performance insuffisante, modèle non sauvegardé")
\ No newline at end of file
@@ -5,7 +5,10 @@ from xgboost import XGBClassifier
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, f1_score, precision_recall_curve
 from sklearn.model_selection import cross_val_score, StratifiedKFold
 import joblib
+import os
 from etl import FraudETL
+from tree_compiler import export_compiled_model
+from model_registry import MODEL_FILE, SCALER_FILE, export_lean_artifact
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -127,15 +130,25 @@ class ImprovedFraudModelTrainer:
         
         return indices
     
-    def save_model(self, model_path='models/fraud_model.pkl'):
+    def save_model(self, model_path='models/fraud_model.pkl', X_check=None, metrics=None):
         """Save the trained model"""
         joblib.dump(self.model, model_path)
         print(f"\n💾 Model saved: {model_path}")
         
+        # Flat-array export for the NumPy scoring engine (parity checked on X_check)
+        export_compiled_model(self.model, model_path, X_check)
+        
         # Also save threshold
         threshold_path = model_path.replace('.pkl', '_threshold.pkl')
         joblib.dump({'threshold': self.best_threshold}, threshold_path)
         print(f"💾 Threshold saved: {threshold_path}")
+        
+        # Lean artifact (booster JSON + manifest) the service loads without sklearn;
+        # a model saved under another name gets its own directory
+        model_dir = os.path.dirname(model_path)
+        scaler = joblib.load(os.path.join(model_dir, SCALER_FILE))
+        lean_dir = model_dir if os.path.basename(model_path) == MODEL_FILE else model_path.replace('.pkl', '')
+        export_lean_artifact(self.model, scaler, self.best_threshold, lean_dir, metrics)
 
 if __name__ == "__main__":
     # 1. ETL Pipeline
@@ -169,9 +182,10 @@ if __name__ == "__main__":
     
     # 7. Save model
     if roc_auc > 0.92:  # Improved threshold from 0.95
-        trainer.save_model()
+        trainer.save_model(X_check=X_test, metrics={'roc_auc': float(roc_auc), 'f1': float(f1)})
         print("\n✅ Model meets performance requirements and has been saved")
     else:
         print(f"\n⚠️  Model ROC AUC ({roc_auc:.4f}) below 0.92 threshold")
         print("   Attempting to save anyway for review...")
-        trainer.save_model('models/fraud_model_review.pkl')
+        trainer.save_model('models/fraud_model_review.pkl', X_check=X_test,
+                           metrics={'roc_auc': float(roc_auc), 'f1': float(f1)})
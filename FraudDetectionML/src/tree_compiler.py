@@ -0,0 +1,277 @@
+"""
+FraudGuard Tree Compiler
+========================
+Flattens trained tree ensembles into contiguous arrays and scores them with
+NumPy only:
+- XGBoost binary:logistic models (from the sklearn wrapper, a Booster or
+  the booster's saved JSON document)
+- scikit-learn RandomForestClassifier models
+
+Every node of every tree is stored in flat arrays (feature index,
+threshold, left/right child, default direction for missing values, leaf
+value). Leaves point to themselves, so a batch is scored by moving all
+(tree, row) cursors one level down per step, in lock-step, for max_depth
+steps.
+"""
+
+import json
+import numpy as np
+
+KIND_XGBOOST = 'xgboost'
+KIND_RANDOM_FOREST = 'random_forest'
+
+# Rows scored per lock-step pass; bounds the (trees x rows) cursor arrays
+SCORING_BLOCK_ROWS = 8192
+
+
+class CompiledTreeEnsemble:
+    """Flat-array tree ensemble evaluator"""
+
+    def __init__(self, kind, feature, threshold, left, right, default_left,
+                 value, roots, max_depth, n_features, base_margin=0.0):
+        self.kind = kind
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        # XGBoost splits on float32 thresholds, sklearn trees on float64 ones
+        threshold_dtype = np.float32 if kind == KIND_XGBOOST else np.float64
+        self.threshold = np.ascontiguousarray(threshold, dtype=threshold_dtype)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=threshold_dtype)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.base_margin = np.float32(base_margin)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def predict_proba(self, X):
+        """Return the fraud probability for each row of X"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected a (n, {self.n_features}) matrix, got {X.shape}")
+
+        if len(X) <= SCORING_BLOCK_ROWS:
+            return self._predict_block(X)
+        return np.concatenate([
+            self._predict_block(X[start:start + SCORING_BLOCK_ROWS])
+            for start in range(0, len(X), SCORING_BLOCK_ROWS)
+        ])
+
+    def _predict_block(self, X):
+        n = len(X)
+        flat = X.ravel()
+        row_offsets = np.arange(n, dtype=np.int64) * self.n_features
+        node = np.repeat(self.roots[:, None], n, axis=1)
+
+        for _ in range(self.max_depth):
+            x = flat.take(self.feature.take(node) + row_offsets)
+            if self.kind == KIND_XGBOOST:
+                go_left = x < self.threshold.take(node)
+            else:
+                go_left = x <= self.threshold.take(node)
+            missing = np.isnan(x)
+            if missing.any():
+                go_left = np.where(missing, self.default_left.take(node), go_left)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+
+        leaves = self.value.take(node)
+        if self.kind == KIND_XGBOOST:
+            # Accumulate tree by tree in float32 from the base margin, as XGBoost does
+            base = np.full((1, n), self.base_margin, dtype=np.float32)
+            margin = np.cumsum(np.vstack([base, leaves]), axis=0, dtype=np.float32)[-1]
+            return np.float32(1) / (np.float32(1) + np.exp(-margin))
+        return leaves.sum(axis=0) / self.n_trees
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+    def save(self, path):
+        """Save the flat arrays to an .npz file"""
+        meta = {
+            'kind': self.kind,
+            'max_depth': self.max_depth,
+            'n_features': self.n_features,
+            'base_margin': float(self.base_margin)
+        }
+        with open(path, 'wb') as f:
+            np.savez(f, feature=self.feature, threshold=self.threshold,
+                     left=self.left, right=self.right, default_left=self.default_left,
+                     value=self.value, roots=self.roots, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path):
+        """Load an ensemble saved with save()"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(meta['kind'], data['feature'], data['threshold'], data['left'],
+                       data['right'], data['default_left'], data['value'], data['roots'],
+                       meta['max_depth'], meta['n_features'], meta['base_margin'])
+
+
+# =============================================================================
+# COMPILERS
+# =============================================================================
+class _FlatTreeBuilder:
+    """Accumulates trees into shared flat arrays"""
+
+    def __init__(self):
+        self.feature, self.threshold, self.left, self.right = [], [], [], []
+        self.default_left, self.value, self.roots = [], [], []
+        self.n_nodes = 0
+        self.max_depth = 0
+
+    def add_tree(self, feature, threshold, left, right, default_left, value):
+        offset = self.n_nodes
+        n = len(feature)
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        is_leaf = left < 0
+        nodes = np.arange(n)
+
+        # Leaves loop onto themselves so extra lock-step iterations are no-ops
+        self.feature.append(np.where(is_leaf, 0, feature))
+        self.threshold.append(np.where(is_leaf, 0, threshold))
+        self.left.append(np.where(is_leaf, nodes, left) + offset)
+        self.right.append(np.where(is_leaf, nodes, right) + offset)
+        self.default_left.append(np.asarray(default_left, dtype=bool))
+        self.value.append(np.where(is_leaf, value, 0))
+        self.roots.append(offset)
+        self.n_nodes += n
+        self.max_depth = max(self.max_depth, _tree_depth(left, right))
+
+    def build(self, kind, n_features, base_margin=0.0):
+        return CompiledTreeEnsemble(
+            kind, np.concatenate(self.feature), np.concatenate(self.threshold),
+            np.concatenate(self.left), np.concatenate(self.right),
+            np.concatenate(self.default_left), np.concatenate(self.value),
+            np.array(self.roots), self.max_depth, n_features, base_margin
+        )
+
+
+def _tree_depth(left, right):
+    depth = 0
+    frontier = [0]
+    while True:
+        children = [child for node in frontier for child in (left[node], right[node]) if child >= 0]
+        if not children:
+            return depth
+        depth += 1
+        frontier = children
+
+
+def compile_xgboost_json(model_json):
+    """Compile a parsed XGBoost JSON model document (Booster.save_model format)"""
+    learner = model_json['learner']
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+
+    booster = learner['gradient_booster']
+    if booster['name'] != 'gbtree':
+        raise ValueError(f"Unsupported XGBoost booster: {booster['name']}")
+
+    trees = booster['model']['trees']
+    trees_per_round = int(booster['model']['gbtree_model_param'].get('num_parallel_tree', 1))
+    best_iteration = learner.get('attributes', {}).get('best_iteration')
+    if best_iteration is not None:
+        trees = trees[:(int(best_iteration) + 1) * trees_per_round]
+
+    builder = _FlatTreeBuilder()
+    for tree in trees:
+        split_conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        builder.add_tree(tree['split_indices'], split_conditions,
+                         tree['left_children'], tree['right_children'],
+                         tree['default_left'], split_conditions)
+
+    # base_score is stored in probability space ("5E-1" or "[5E-1]")
+    base_score = np.float32(learner['learner_model_param']['base_score'].strip('[]'))
+    base_margin = -np.log(np.float32(1) / base_score - np.float32(1))
+    n_features = int(learner['learner_model_param']['num_feature'])
+    return builder.build(KIND_XGBOOST, n_features, base_margin)
+
+
+def compile_random_forest(model):
+    """Compile a fitted binary RandomForestClassifier"""
+    classes = list(model.classes_)
+    if len(classes) != 2:
+        raise ValueError(f"Expected a binary classifier, got classes {classes}")
+    fraud_column = classes.index(1) if 1 in classes else 1
+
+    builder = _FlatTreeBuilder()
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        counts = tree.value[:, 0, :]
+        totals = counts.sum(axis=1)
+        totals[totals == 0] = 1
+        missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=bool))
+        builder.add_tree(tree.feature, tree.threshold, tree.children_left,
+                         tree.children_right, missing_left, counts[:, fraud_column] / totals)
+    return builder.build(KIND_RANDOM_FOREST, model.n_features_in_)
+
+
+def compile_model(model):
+    """Compile a trained model (XGBClassifier, Booster or RandomForestClassifier)"""
+    if hasattr(model, 'get_booster') or hasattr(model, 'save_raw'):
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        return compile_xgboost_json(json.loads(bytes(booster.save_raw('json'))))
+    if hasattr(model, 'estimators_') and hasattr(model, 'classes_'):
+        return compile_random_forest(model)
+    raise ValueError(f"Cannot compile model of type {type(model).__name__}")
+
+
+def verify_parity(model, compiled, X, tolerance=1e-6):
+    """Return the max |compiled - predict_proba| over X; raise if above tolerance"""
+    expected = model.predict_proba(X)[:, 1]
+    deviation = float(np.max(np.abs(compiled.predict_proba(X) - expected))) if len(X) else 0.0
+    if deviation > tolerance:
+        raise AssertionError(f"Compiled model deviates by {deviation:.3e} (> {tolerance:.0e})")
+    return deviation
+
+
+def export_compiled_model(model, model_path, X_check=None):
+    """
+    Compile the model and save it next to the pickle as <model>_compiled.npz.
+
+    When X_check is given, parity with predict_proba is verified first.
+    """
+    compiled = compile_model(model)
+    if X_check is not None:
+        deviation = verify_parity(model, compiled, np.asarray(X_check, dtype=np.float32))
+        print(f"   ✅ Compiled model parity: max deviation {deviation:.2e}")
+
+    compiled_path = model_path.replace('.pkl', '_compiled.npz')
+    compiled.save(compiled_path)
+    print(f"💾 Compiled model saved: {compiled_path} "
+          f"({compiled.n_trees} trees, {compiled.n_nodes} nodes, depth {compiled.max_depth})")
+    return compiled_path
+
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+if __name__ == '__main__':
+    import argparse
+    import joblib
+
+    parser = argparse.ArgumentParser(description='Compile a trained tree ensemble to flat arrays')
+    parser.add_argument('model', type=str, help='Path to the pickled model')
+    parser.add_argument('--rows', type=int, default=20000, help='Random rows used for the parity check')
+    parser.add_argument('--tolerance', type=float, default=1e-6, help='Max allowed probability deviation')
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    rng = np.random.default_rng(42)
+    X_check = rng.normal(0, 3, (args.rows, model.n_features_in_)).astype(np.float32)
+    X_check[rng.random(X_check.shape) < 0.01] = np.nan
+
+    compiled = compile_model(model)
+    deviation = verify_parity(model, compiled, X_check, args.tolerance)
+    print(f"✅ Parity on {args.rows:,} rows: max deviation {deviation:.2e}")
+    export_compiled_model(model, args.model)
@@ -0,0 +1,76 @@
+"""
+FraudGuard Binary Wire Format
+=============================
+Compact alternative to JSON for bulk scoring on /predict/batch.
+
+Request (Content-Type: application/x-fraudguard-f32):
+    16-byte header: magic b'FGB1', uint32 rows, uint32 cols (= 30),
+                    uint32 reserved (0), all little-endian
+    body:           rows x cols float32 little-endian, row-major, columns
+                    v1..v28, amount, time (features.RAW_INPUT_NAMES)
+
+Response (same Content-Type):
+    16-byte header: magic b'FGR1', uint32 rows, float32 decision
+                    threshold, uint32 reserved (0)
+    body:           rows float32 fraud probabilities, in request order
+
+The server wraps the request body with np.frombuffer, so the transactions
+are never copied or converted before feature construction. A row is
+fraud when its probability >= the threshold in the response header.
+"""
+
+import struct
+import numpy as np
+
+from features import RAW_INPUT_NAMES
+
+CONTENT_TYPE = 'application/x-fraudguard-f32'
+REQUEST_MAGIC = b'FGB1'
+RESPONSE_MAGIC = b'FGR1'
+HEADER = struct.Struct('<4sIII')
+RESPONSE_HEADER = struct.Struct('<4sIfI')
+RAW_COLUMNS = len(RAW_INPUT_NAMES)
+FLOAT32_LE = np.dtype('<f4')
+
+
+class WireFormatError(ValueError):
+    """Raised for a malformed binary request or response"""
+
+
+def decode_matrix(body):
+    """Return a read-only (rows, 30) float32 view over the request body"""
+    if len(body) < HEADER.size:
+        raise WireFormatError("Body shorter than the binary header")
+    magic, rows, cols, _ = HEADER.unpack_from(body)
+    if magic != REQUEST_MAGIC:
+        raise WireFormatError(f"Bad magic {magic!r}, expected {REQUEST_MAGIC!r}")
+    if cols != RAW_COLUMNS:
+        raise WireFormatError(f"Expected {RAW_COLUMNS} columns ({', '.join(RAW_INPUT_NAMES)}), got {cols}")
+    expected = HEADER.size + rows * cols * FLOAT32_LE.itemsize
+    if len(body) != expected:
+        raise WireFormatError(f"Body is {len(body)} bytes, expected {expected} for {rows} rows")
+    return np.frombuffer(body, dtype=FLOAT32_LE, count=rows * cols, offset=HEADER.size).reshape(rows, cols)
+
+
+def encode_matrix(raw):
+    """Encode an (n, 30) matrix of raw inputs as a binary request body"""
+    raw = np.ascontiguousarray(raw, dtype=FLOAT32_LE)
+    if raw.ndim != 2 or raw.shape[1] != RAW_COLUMNS:
+        raise WireFormatError(f"Expected an (n, {RAW_COLUMNS}) matrix, got {raw.shape}")
+    return HEADER.pack(REQUEST_MAGIC, raw.shape[0], RAW_COLUMNS, 0) + raw.tobytes()
+
+
+def encode_scores(probabilities, threshold):
+    """Encode fraud probabilities as a binary response body"""
+    probabilities = np.ascontiguousarray(probabilities, dtype=FLOAT32_LE)
+    return RESPONSE_HEADER.pack(RESPONSE_MAGIC, len(probabilities), threshold, 0) + probabilities.tobytes()
+
+
+def decode_scores(body):
+    """Return (probabilities, threshold) from a binary response body"""
+    if len(body) < RESPONSE_HEADER.size:
+        raise WireFormatError("Body shorter than the binary header")
+    magic, rows, threshold, _ = RESPONSE_HEADER.unpack_from(body)
+    if magic != RESPONSE_MAGIC:
+        raise WireFormatError(f"Bad magic {magic!r}, expected {RESPONSE_MAGIC!r}")
+    return np.frombuffer(body, dtype=FLOAT32_LE, count=rows, offset=RESPONSE_HEADER.size), threshold
@@ -0,0 +1,98 @@
+"""
+Parity of the compiled tree engine (tree_compiler) with predict_proba:
+every compiled model must stay within TOLERANCE of the model it was
+compiled from, including the lean artifact path (compile_xgboost_json on
+the booster JSON saved by export_lean_artifact).
+"""
+
+import json
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+
+from tree_compiler import compile_model, compile_xgboost_json
+
+TOLERANCE = 1e-6
+N_FEATURES = 8
+
+
+def make_data(rows, seed, missing_rate=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0, 2, (rows, N_FEATURES)).astype(np.float32)
+    logit = X[:, 0] * X[:, 1] - 1.5 * X[:, 2] + np.sin(X[:, 3]) + rng.normal(0, 1, rows)
+    y = (logit > 1.0).astype(np.int8)
+    if missing_rate:
+        X[rng.random(X.shape) < missing_rate] = np.nan
+    return X, y
+
+
+def max_deviation(model, compiled, X):
+    return float(np.max(np.abs(compiled.predict_proba(X) - model.predict_proba(X)[:, 1])))
+
+
+def saved_json(model, tmp_path):
+    path = tmp_path / 'fraud_model.json'
+    model.get_booster().save_model(str(path))
+    with open(path) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='module')
+def xgboost_model():
+    X, y = make_data(4000, seed=0, missing_rate=0.05)
+    return XGBClassifier(n_estimators=60, max_depth=5, learning_rate=0.2).fit(X, y)
+
+
+@pytest.fixture(scope='module')
+def X_test():
+    return make_data(5000, seed=1)[0]
+
+
+@pytest.fixture(scope='module')
+def X_missing():
+    return make_data(5000, seed=2, missing_rate=0.2)[0]
+
+
+def test_xgboost_in_memory(xgboost_model, X_test):
+    assert max_deviation(xgboost_model, compile_model(xgboost_model), X_test) <= TOLERANCE
+
+
+def test_xgboost_saved_json(xgboost_model, X_test, tmp_path):
+    compiled = compile_xgboost_json(saved_json(xgboost_model, tmp_path))
+    assert max_deviation(xgboost_model, compiled, X_test) <= TOLERANCE
+
+
+def test_xgboost_missing_values(xgboost_model, X_missing, tmp_path):
+    assert max_deviation(xgboost_model, compile_model(xgboost_model), X_missing) <= TOLERANCE
+    compiled = compile_xgboost_json(saved_json(xgboost_model, tmp_path))
+    assert max_deviation(xgboost_model, compiled, X_missing) <= TOLERANCE
+
+
+def test_xgboost_early_stopping(X_test, tmp_path):
+    X, y = make_data(4000, seed=3)
+    X_eval, y_eval = make_data(1000, seed=4)
+    model = XGBClassifier(n_estimators=300, max_depth=5, learning_rate=0.5, early_stopping_rounds=5)
+    model.fit(X, y, eval_set=[(X_eval, y_eval)], verbose=False)
+    assert model.best_iteration < 299
+
+    compiled = compile_model(model)
+    assert compiled.n_trees == model.best_iteration + 1
+    assert max_deviation(model, compiled, X_test) <= TOLERANCE
+    assert max_deviation(model, compile_xgboost_json(saved_json(model, tmp_path)), X_test) <= TOLERANCE
+
+
+def test_random_forest(X_test):
+    X, y = make_data(4000, seed=5)
+    model = RandomForestClassifier(n_estimators=30, max_depth=8, random_state=0).fit(X, y)
+    assert max_deviation(model, compile_model(model), X_test) <= TOLERANCE
+
+
+def test_random_forest_missing_values(X_missing):
+    X, y = make_data(4000, seed=6, missing_rate=0.05)
+    try:
+        model = RandomForestClassifier(n_estimators=30, max_depth=8, random_state=0).fit(X, y)
+    except ValueError:
+        pytest.skip('This scikit-learn version does not support missing values in random forests')
+    assert max_deviation(model, compile_model(model), X_missing) <= TOLERANCE